@@ -0,0 +1,62 @@
+"""Measure the import time of the package and of its submodules.
+
+Every import runs in a fresh interpreter, reporting the best and the
+median wall time over the repeats and whether NumPy was executed.
+
+Usage:
+    python benchmarks/import_time.py [--repeat N] [module ...]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+MODULES = [
+    "orchestral_tutti_chord_database",
+    "orchestral_tutti_chord_database.parser",
+    "orchestral_tutti_chord_database.pitch",
+    "orchestral_tutti_chord_database.color",
+    "orchestral_tutti_chord_database.lilypond",
+    "orchestral_tutti_chord_database.analysis",
+]
+SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+numpy = type(sys.modules.get("numpy")).__name__ == "module"
+print(elapsed, numpy)
+"""
+
+
+def measure(module: str, repeat: int) -> tuple:
+    """Returns the import times in seconds and whether NumPy was loaded."""
+    times = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", SCRIPT.format(module=module)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()
+        times.append(float(output[0]))
+    return times, output[1] == "True"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+    print(f"{'module':<44}{'best ms':>9}{'median ms':>11}  numpy")
+    for module in args.modules:
+        times, numpy = measure(module, args.repeat)
+        print(
+            f"{module:<44}{min(times) * 1000:>9.2f}"
+            f"{statistics.median(times) * 1000:>11.2f}  {'yes' if numpy else 'no'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
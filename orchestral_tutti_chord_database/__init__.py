@@ -1,5 +1,50 @@
 """orchestral_tutti_chord_database - A database of sustained tutti chords in orchestral music"""
 
+import importlib
+
+
 __version__ = "0.1.0"
 __author__ = "RCJacH <RCJacH@outlook.com>"
-__all__ = []
+
+# The public API by the submodule defining it. Submodules are imported on
+# first access, so e.g. parsing never pays for importing NumPy.
+_API = {
+    "parser": ["ChordInfo"],
+    "database": ["Database"],
+    "catalog": ["Catalog"],
+    "pitch": ["Interval", "Pitch"],
+    "color": ["hex_colors", "make_swatch_grid", "make_swatches", "note_colors"],
+    "analysis": ["NoteTable", "analyze_spacing"],
+    "consonance": ["analyze_consonance", "analyze_roughness"],
+    "settheory": ["forte_name", "get_masks"],
+    "lilypond": ["render"],
+    "cache": ["RenderCache"],
+    "svg": ["render_svg", "write_svg"],
+    "profiling": ["Profile"],
+    "watch": ["Watcher"],
+    "server": ["ChordStore", "QueryServer"],
+    "synthetic": ["generate_entry", "write_corpus"],
+    "benchmark": ["compare", "run_benchmark"],
+    "spelling": ["parse_key", "spell", "spell_chords"],
+    "midi": ["read_midi"],
+    "musicxml": ["read_musicxml", "read_mxl"],
+    "voicing": ["find_duplicates", "get_normal_form", "normal_hash", "voicing_hash"],
+}
+_SOURCES = {name: module for module, names in _API.items() for name in names}
+
+__all__ = sorted(_SOURCES)
+
+
+def __getattr__(name):
+    if name in _API:
+        return importlib.import_module(f"{__name__}.{name}")
+    if name in _SOURCES:
+        module = importlib.import_module(f"{__name__}.{_SOURCES[name]}")
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_API) + __all__)
@@ -0,0 +1,6 @@
+import sys
+
+from orchestral_tutti_chord_database.cli import main
+
+
+sys.exit(main())
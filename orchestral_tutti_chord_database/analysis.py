@@ -0,0 +1,183 @@
+import numpy as np
+
+from orchestral_tutti_chord_database.balance import BALANCE
+from orchestral_tutti_chord_database.balance import SECTIONS
+from orchestral_tutti_chord_database.balance import get_section
+from orchestral_tutti_chord_database.balance import is_forte
+from orchestral_tutti_chord_database.pitch import get_pitch
+
+
+MIDDLE_REGISTER = (36, 72)
+
+
+class NoteTable(object):
+    """The sounding notes of a batch of chords, stored column by column.
+
+    Attributes:
+        chord: The index of the chord within the batch of each note.
+        midinum: The sounding midi number of each note.
+        section: The index in SECTIONS of the section of each note.
+        letter: The pitch class index, C=0 to B=6, of the spelling of
+            each note, or None if the notes are not spelled.
+        forte: Whether each note is balanced as forte, see is_forte.
+        size: The number of chords in the batch.
+    """
+
+    __slots__ = ["chord", "midinum", "section", "letter", "forte", "size"]
+
+    def __init__(
+        self, chord, midinum, section, size: int = None, letter=None, forte=None
+    ):
+        self.chord = np.asarray(chord, dtype=np.int64)
+        self.midinum = np.asarray(midinum, dtype=np.int64)
+        self.section = np.asarray(section, dtype=np.int64)
+        self.letter = None if letter is None else np.asarray(letter, dtype=np.int64)
+        if forte is None:
+            forte = np.ones(len(self.midinum), dtype=bool)
+        self.forte = np.asarray(forte, dtype=bool)
+        if size is None:
+            size = int(self.chord.max()) + 1 if len(self.chord) else 0
+        self.size: int = size
+
+    def __len__(self):
+        return len(self.midinum)
+
+    @classmethod
+    def from_chords(cls, chords: list) -> "NoteTable":
+        """Collect the notes of ChordInfo objects into one table.
+
+        Args:
+            chords: A list of ChordInfo objects, or of their instrument
+                lists as returned by ChordInfo.parse_instrument. Rests,
+                i.e. empty note strings, are skipped.
+        """
+        columns = ([], [], [], [], [])
+        size = 0
+        for size, chord in enumerate(chords, 1):
+            for instrument in getattr(chord, "instruments", chord):
+                pitches = [get_pitch(x) for x in instrument[2] if x]
+                count = len(pitches)
+                columns[0].extend([size - 1] * count)
+                columns[1].extend(x.midinum for x in pitches)
+                columns[2].extend([get_section(instrument[0])] * count)
+                columns[3].extend(x.pitch_class_index for x in pitches)
+                columns[4].extend([is_forte(instrument[3])] * count)
+        chord, midinum, section, letter, forte = columns
+        return cls(chord, midinum, section, size, letter, forte)
+
+    def weights(self) -> np.ndarray:
+        """Returns the balance weight of each note, see BALANCE."""
+        balance = np.array([BALANCE["piano"], BALANCE["forte"]], dtype=np.float64)
+        return balance[self.forte.astype(np.int64), self.section]
+
+    def offsets(self) -> np.ndarray:
+        """Returns the start of each chord in chord-sorted note order."""
+        counts = np.bincount(self.chord, minlength=self.size)
+        return np.concatenate(([0], np.cumsum(counts)))
+
+    def iter_pairs(self, chunk_size: int = 256):
+        """Yields every pair of notes within each chord, chunk by chunk.
+
+        Pairs are enumerated with one np.triu_indices per chord size,
+        and at most chunk_size chords at a time to bound memory, as the
+        number of pairs grows with the square of the number of notes.
+
+        Yields:
+            Two arrays of row indices of the lower and the upper note
+            of each pair, where midinum[lower] <= midinum[upper].
+        """
+        order = np.lexsort((self.midinum, self.chord))
+        offsets = self.offsets()
+        for first in range(0, self.size, chunk_size):
+            last = min(first + chunk_size, self.size)
+            starts = offsets[first:last]
+            counts = offsets[first + 1 : last + 1] - starts
+            lower, upper = [], []
+            for count in np.unique(counts[counts > 1]):
+                i, j = np.triu_indices(count, 1)
+                chord_starts = starts[counts == count][:, None]
+                lower.append((chord_starts + i).ravel())
+                upper.append((chord_starts + j).ravel())
+            if lower:
+                yield order[np.concatenate(lower)], order[np.concatenate(upper)]
+
+
+class Spacing(object):
+    """The spacing and doubling analysis of a batch of chords.
+
+    Notes and spacings of all chords are stored back to back, with
+    chord i spanning [offsets[i], offsets[i + 1]) of midinum and
+    [spacing_offsets[i], spacing_offsets[i + 1]) of spacing and wide.
+
+    Attributes:
+        midinum: The sounding midi numbers, sorted within each chord.
+        offsets: The start of each chord in midinum.
+        spacing: The semitones between adjacent notes of each chord.
+        spacing_offsets: The start of each chord in spacing.
+        wide: Whether each spacing is a gap larger than an octave
+            within the middle register.
+        wide_count: The number of such wide gaps in each chord.
+        doubling: The number of notes of each pitch class played by
+            each section, shaped (chords, len(SECTIONS), 12).
+    """
+
+    __slots__ = [
+        "midinum",
+        "offsets",
+        "spacing",
+        "spacing_offsets",
+        "wide",
+        "wide_count",
+        "doubling",
+    ]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def chord(self, i: int) -> dict:
+        """Returns the analysis of a single chord of the batch."""
+        start, end = self.offsets[i], self.offsets[i + 1]
+        spacing_start, spacing_end = self.spacing_offsets[i : i + 2]
+        return {
+            "midinum": self.midinum[start:end],
+            "spacing": self.spacing[spacing_start:spacing_end],
+            "wide": self.wide[spacing_start:spacing_end],
+            "doubling": self.doubling[i],
+        }
+
+
+def analyze_spacing(table: NoteTable, register: tuple = MIDDLE_REGISTER) -> Spacing:
+    """Analyze the spacing and doubling of every chord in a table.
+
+    Args:
+        table: The NoteTable of the batch of chords.
+        register: The lowest and highest midi number of the middle
+            register, in which a gap larger than an octave is wide.
+    """
+    order = np.lexsort((table.midinum, table.chord))
+    chord = table.chord[order]
+    midinum = table.midinum[order]
+
+    adjacent = chord[1:] == chord[:-1]
+    spacing = np.diff(midinum)[adjacent]
+    lower, upper = midinum[:-1][adjacent], midinum[1:][adjacent]
+    wide = (spacing > 12) & (lower >= register[0]) & (upper <= register[1])
+    spacing_chord = chord[:-1][adjacent]
+    spacing_counts = np.bincount(spacing_chord, minlength=table.size)
+
+    doubling = np.bincount(
+        (table.chord * len(SECTIONS) + table.section) * 12 + table.midinum % 12,
+        minlength=table.size * len(SECTIONS) * 12,
+    ).reshape(table.size, len(SECTIONS), 12)
+
+    result = Spacing()
+    result.midinum = midinum
+    result.offsets = table.offsets()
+    result.spacing = spacing
+    result.spacing_offsets = np.concatenate(([0], np.cumsum(spacing_counts)))
+    result.wide = wide
+    result.wide_count = np.bincount(
+        spacing_chord, weights=wide, minlength=table.size
+    ).astype(np.int64)
+    result.doubling = doubling
+    return result
@@ -0,0 +1,55 @@
+import re
+from functools import lru_cache
+
+
+SECTIONS = ("woodwind", "horn", "brass", "string", "other")
+SECTION_KEYWORDS = (
+    (
+        "brass",
+        ("tp", "trump", "tromb", "tb", "trb", "cornet", "cnt", "flug", "tuba", "euph"),
+    ),
+    (
+        "woodwind",
+        ("picc", "fl", "ob", "eng", "angl", "cl", "bassoon", "bsn", "fag", "sax"),
+    ),
+    ("horn", ("hn", "horn", "cor")),
+    (
+        "string",
+        ("vl", "violin", "viola", "vc", "cello", "violon", "cb", "doub", "bass"),
+    ),
+)
+BALANCE = {
+    # Rimsky-Korsakov: a woodwind = 1, a horn or a string section = 2,
+    # a brass instrument = 4 in forte; all equal in piano.
+    "forte": (1, 2, 4, 2, 1),
+    "piano": (1, 1, 1, 1, 1),
+}
+
+
+@lru_cache(maxsize=None)
+def get_section(instrument: str) -> int:
+    """Returns the index in SECTIONS of the section of an instrument.
+
+    The instrument name is split into words, and each section is
+    checked in the order of SECTION_KEYWORDS for a word starting with
+    any of its keywords, e.g. 'bass clarinet' is a woodwind while
+    'bass' alone is a string instrument. Unknown instruments, such as
+    harp or timpani, fall into 'other'.
+    """
+    words = re.findall(r"[a-z]+", instrument.lower())
+    for section, keywords in SECTION_KEYWORDS:
+        for word in words:
+            # 'bass' only names a section on its own, e.g. not 'bass clarinet'.
+            if word in ("bass", "basses") and len(words) > 1:
+                continue
+            if word.startswith(keywords):
+                return SECTIONS.index(section)
+    return SECTIONS.index("other")
+
+
+def is_forte(dynamic: str) -> bool:
+    """Returns whether a dynamic is balanced as forte.
+
+    Unmarked notes are taken as forte, as tutti chords usually are.
+    """
+    return not dynamic or not dynamic.lstrip("m").startswith("p")
@@ -0,0 +1,320 @@
+"""Benchmark the whole pipeline over synthetic corpora of growing size.
+
+Every size runs in a fresh process through every stage: generate the
+text of a synthetic corpus, parse it, normalize the voicings, analyze
+their balance, label their set classes, store them in an SQLite
+database, query its catalog and render SVG previews. A report records
+the time and throughput of every stage, the peak resident memory of
+every size and how the time of every stage scales with the size, and
+can be compared with a baseline report:
+
+    otcd benchmark --sizes 1000 10000 100000 -o baseline.json
+    otcd benchmark --sizes 1000 10000 100000 --baseline baseline.json
+"""
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import get_context
+
+try:
+    import resource
+except ImportError:  # Windows.
+    resource = None
+
+from orchestral_tutti_chord_database.database import get_name
+from orchestral_tutti_chord_database.database import get_summary
+from orchestral_tutti_chord_database.timing import Stage
+from orchestral_tutti_chord_database.timing import Timings
+
+
+SIZES = (1000, 10000)
+STAGES = (
+    "generate",
+    "parse",
+    "normalize",
+    "balance",
+    "label",
+    "store",
+    "query",
+    "render",
+)
+PREVIEWS = 100
+THRESHOLD = 0.2
+# Stages faster than this in both reports are too noisy to compare.
+MIN_WALL = 0.05
+REPORT_VERSION = 1
+QUERIES = (
+    {"composer": "mahler"},
+    {"since": 1850, "until": 1900},
+    {"forte": "3-11"},
+    {"chord": "D", "composer": "b"},
+)
+
+
+def get_peak_rss() -> int:
+    """Returns the peak resident memory in bytes of this process or of
+    its largest reaped child, or None where unknown."""
+    if resource is None:
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    # Kilobytes on Linux, bytes on macOS.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def get_metrics(stage: Stage) -> dict:
+    """Returns the times and throughput of a stage as a JSON dict."""
+    return {
+        "wall": round(stage.wall, 6),
+        "cpu": round(stage.cpu, 6),
+        "chords": stage.chords,
+        "notes": stage.notes,
+        "rate": round(stage.rate(stage.chords), 3),
+    }
+
+
+def run_pipeline(
+    size: int, seed: int = 0, jobs: int = 1, previews: int = PREVIEWS
+) -> dict:
+    """Run every stage of the pipeline over a synthetic corpus.
+
+    Args:
+        size: The number of chords of the corpus.
+        seed: The seed of the corpus, see synthetic.generate_entry.
+        jobs: The number of processes generating and parsing.
+        previews: The most chords to render.
+
+    Returns:
+        The size, the metrics of every stage and of their total, see
+        get_metrics, and the peak resident memory in bytes.
+    """
+    import numpy as np
+
+    from orchestral_tutti_chord_database import analysis
+    from orchestral_tutti_chord_database import settheory
+    from orchestral_tutti_chord_database import voicing
+    from orchestral_tutti_chord_database.catalog import Catalog
+    from orchestral_tutti_chord_database.cli import chunked
+    from orchestral_tutti_chord_database.cli import generate_chunk
+    from orchestral_tutti_chord_database.cli import imap
+    from orchestral_tutti_chord_database.cli import parse_chunk
+    from orchestral_tutti_chord_database.parser import ChordInfo
+    from orchestral_tutti_chord_database.sqlitedb import SQLiteDatabase
+    from orchestral_tutti_chord_database.svg import write_svg
+
+    timings = Timings()
+    with tempfile.TemporaryDirectory() as directory:
+        with timings.stage("generate") as stage:
+            function = partial(generate_chunk, seed=seed)
+            texts = [x for y in imap(function, chunked(range(size)), jobs) for x in y]
+            stage.chords = len(texts)
+        with timings.stage("parse") as stage:
+            blocks = (
+                (get_name("synthetic", i), x.splitlines()) for i, x in enumerate(texts)
+            )
+            records = [x for y in imap(parse_chunk, chunked(blocks), jobs) for x in y]
+            del texts
+        with timings.stage("normalize") as stage:
+            chords = [ChordInfo.from_dict(x) for x in records]
+            table = analysis.NoteTable.from_chords(chords)
+            roots = [voicing.get_root(x) for x in chords]
+            voicing.table_hashes(table, roots)
+            unique, _ = voicing.unique_voicings(table)
+            voicing.table_hashes(unique)
+        with timings.stage("balance") as stage:
+            analysis.analyze_spacing(unique)
+            np.bincount(unique.chord, unique.weights(), unique.size)
+        with timings.stage("label") as stage:
+            masks = settheory.get_masks(unique)
+            settheory.forte_name(masks)
+            for mask in set(masks.tolist()):
+                settheory.prime_form(mask)
+        with timings.stage("store") as stage:
+            database = SQLiteDatabase(os.path.join(directory, "chords.sqlite"))
+            items = [(x.pop("id"), x) for x in records]
+            database.save_many(items)
+            database.update_index({k: get_summary(x) for k, x in items})
+        with timings.stage("query") as stage:
+            catalog = Catalog(database)
+            for query in QUERIES:
+                for name in catalog.query(**query)[:previews]:
+                    catalog.load(name)
+            database.close()
+        with timings.stage("render") as stage:
+            write_svg(chords[:previews], os.path.join(directory, "previews"))
+    for stage in timings.stages:
+        stage.chords, stage.notes = size, len(table)
+    # Only the previews are rendered.
+    render = timings.stages[-1]
+    render.chords = min(size, previews)
+    render.notes = int(table.offsets()[render.chords])
+    return {
+        "size": size,
+        "stages": {x.name: get_metrics(x) for x in timings.stages},
+        "total": get_metrics(timings.total()),
+        "peak_rss": get_peak_rss(),
+    }
+
+
+def get_scaling(runs: list) -> dict:
+    """Returns how the wall time of every stage grows with the size.
+
+    The exponent of a stage is the slope of the log of its wall time
+    against the log of the size, fitted by least squares: 1 for a
+    linear stage, 2 for a quadratic one. Stages measured at fewer than
+    two sizes or with a zero time are left out.
+    """
+    scaling = {}
+    for name in STAGES + ("total",):
+        points = [
+            (math.log(x["size"]), math.log(metrics["wall"]))
+            for x in runs
+            for metrics in [x["total"] if name == "total" else x["stages"].get(name)]
+            if metrics and x["size"] > 0 and metrics["wall"] > 0
+        ]
+        if len({x for x, _ in points}) < 2:
+            continue
+        mean_x = sum(x for x, _ in points) / len(points)
+        mean_y = sum(y for _, y in points) / len(points)
+        covariance = sum((x - mean_x) * (y - mean_y) for x, y in points)
+        variance = sum((x - mean_x) ** 2 for x, _ in points)
+        scaling[name] = round(covariance / variance, 3)
+    return scaling
+
+
+def run_benchmark(
+    sizes: list = SIZES,
+    seed: int = 0,
+    jobs: int = 1,
+    previews: int = PREVIEWS,
+    isolate: bool = True,
+) -> dict:
+    """Run the pipeline over corpora of every size, see run_pipeline.
+
+    Args:
+        sizes: The numbers of chords of the corpora, in increasing order.
+        seed: The seed of the corpora.
+        jobs: The number of processes generating and parsing.
+        previews: The most chords to render.
+        isolate: Whether to run every size in a fresh process, so that
+            neither the peak memory nor the caches of a size carry
+            over to the next.
+
+    Returns:
+        The JSON report: its version, the Python version, platform and
+        date, the seed and jobs, a run of every size, see run_pipeline,
+        and the scaling exponent of every stage, see get_scaling.
+    """
+    runs = []
+    for size in sorted(sizes):
+        if isolate:
+            context = get_context("spawn")
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                run = executor.submit(run_pipeline, size, seed, jobs, previews)
+                runs.append(run.result())
+        else:
+            runs.append(run_pipeline(size, seed, jobs, previews))
+    return {
+        "version": REPORT_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": seed,
+        "jobs": jobs,
+        "runs": runs,
+        "scaling": get_scaling(runs),
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float = THRESHOLD) -> list:
+    """Compare a report with a baseline report.
+
+    The throughput of every stage and of the total, and the peak
+    memory, are compared at every size both reports ran, and the
+    scaling exponent of every stage measured by both. Stages faster
+    than MIN_WALL, in both reports or at the largest size for the
+    scaling, are skipped as too noisy.
+
+    Args:
+        report: The report, see run_benchmark.
+        baseline: The baseline report.
+        threshold: The largest relative loss of throughput or gain of
+            memory, and the largest increase of a scaling exponent,
+            which still passes.
+
+    Returns:
+        A (size or None for the scaling, metric, baseline value, value,
+        relative change, whether it passed) tuple of every comparison.
+    """
+    if baseline.get("version") != report.get("version"):
+        raise ValueError(
+            f"Expected a version {report.get('version')} baseline report, "
+            f"got {baseline.get('version')}."
+        )
+    rows = []
+    runs = {x["size"]: x for x in baseline["runs"]}
+    for run in report["runs"]:
+        before = runs.get(run["size"])
+        if before is None:
+            continue
+        stages = [(x, run["stages"][x], before["stages"].get(x)) for x in run["stages"]]
+        for name, metrics, old in stages + [("total", run["total"], before["total"])]:
+            if old is None or max(metrics["wall"], old["wall"]) < MIN_WALL:
+                continue
+            change = metrics["rate"] / old["rate"] - 1 if old["rate"] else 0.0
+            rows.append(
+                (run["size"], name, old["rate"], metrics["rate"], change)
+                + (change >= -threshold,)
+            )
+        if run["peak_rss"] and before["peak_rss"]:
+            change = run["peak_rss"] / before["peak_rss"] - 1
+            rows.append(
+                (run["size"], "peak_rss", before["peak_rss"], run["peak_rss"], change)
+                + (change <= threshold,)
+            )
+    last = report["runs"][-1] if report["runs"] else None
+    for name, exponent in report["scaling"].items():
+        old = baseline["scaling"].get(name)
+        metrics = last["total"] if name == "total" else last["stages"][name]
+        if old is None or metrics["wall"] < MIN_WALL:
+            continue
+        change = exponent - old
+        rows.append(
+            (None, f"scaling {name}", old, exponent, change, change <= threshold)
+        )
+    return rows
+
+
+def format_report(report: dict) -> str:
+    """Returns a table of the wall time and throughput of every run."""
+    lines = [f"{'size':>8}{'wall s':>9}{'chords/s':>11}{'peak MB':>9}  slowest stage"]
+    for run in report["runs"]:
+        name = max(run["stages"], key=lambda x: run["stages"][x]["wall"])
+        peak = run["peak_rss"] / 2**20 if run["peak_rss"] else math.nan
+        lines.append(
+            f"{run['size']:>8}{run['total']['wall']:>9.3f}"
+            f"{run['total']['rate']:>11.1f}{peak:>9.1f}  {name}"
+        )
+    if report["scaling"]:
+        exponents = ", ".join(f"{k} {v:.2f}" for k, v in report["scaling"].items())
+        lines.append(f"scaling: {exponents}")
+    return "\n".join(lines)
+
+
+def format_comparison(rows: list) -> str:
+    """Returns a table of comparisons, see compare."""
+    lines = [f"{'size':>8}  {'metric':<18}{'baseline':>14}{'current':>14}{'change':>9}"]
+    for size, metric, old, new, change, passed in rows:
+        change = f"{change:+.2f}" if size is None else f"{change:+.1%}"
+        lines.append(
+            f"{'' if size is None else size:>8}  {metric:<18}{old:>14.6g}{new:>14.6g}"
+            f"{change:>9}{'' if passed else '  FAIL'}"
+        )
+    return "\n".join(lines)
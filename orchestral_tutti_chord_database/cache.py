@@ -0,0 +1,106 @@
+import hashlib
+import json
+import os
+import shutil
+
+
+CACHE_SIZE = 1 << 30
+
+
+class RenderCache(object):
+    """A content-addressed store of rendered scores on the local disk.
+
+    Every artifact is saved as <key>.<extension> in a subdirectory of
+    the first two characters of the key, where the key hashes all that
+    changes the output, so a chord is only rendered again when its
+    content, the options or the renderer changed. The least recently
+    used artifacts are evicted when the cache grows over max_size.
+
+    Attributes:
+        directory: The root directory of the cache.
+        max_size: The maximum total size in bytes of all artifacts.
+    """
+
+    def __init__(self, directory: str, max_size: int = CACHE_SIZE):
+        self.directory: str = directory
+        self.max_size: int = max_size
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def get_key(content: str, options: dict = None, version: str = "") -> str:
+        """Returns the hex digest of normalized content, options and version."""
+        payload = json.dumps(
+            {"content": content, "options": options or {}, "version": version},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_path(self, key: str, extension: str) -> str:
+        """Returns the path of the artifact of a key."""
+        return os.path.join(self.directory, key[:2], f"{key}.{extension}")
+
+    def has(self, key: str, extensions) -> bool:
+        """Returns whether all artifacts of a key are cached."""
+        return all(os.path.exists(self.get_path(key, x)) for x in extensions)
+
+    def fetch(self, key: str, extensions, output_dir: str, name: str) -> bool:
+        """Copy the cached artifacts of a key to output_dir/name.<extension>.
+
+        Returns:
+            Whether every artifact was found and copied.
+        """
+        if not self.has(key, extensions):
+            return False
+        for extension in extensions:
+            path = self.get_path(key, extension)
+            shutil.copyfile(path, os.path.join(output_dir, f"{name}.{extension}"))
+            # The modification time orders artifacts for eviction.
+            os.utime(path)
+        return True
+
+    def store(self, key: str, extensions, output_dir: str, name: str):
+        """Save the artifacts output_dir/name.<extension> under a key.
+
+        Call evict once a batch has been stored to bound the size.
+        """
+        os.makedirs(os.path.dirname(self.get_path(key, "")), exist_ok=True)
+        for extension in extensions:
+            source = os.path.join(output_dir, f"{name}.{extension}")
+            if os.path.exists(source):
+                shutil.copyfile(source, self.get_path(key, extension))
+
+    def store_text(self, key: str, extension: str, text: str):
+        """Save an artifact given as text under a key."""
+        path = self.get_path(key, extension)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fd:
+            fd.write(text)
+
+    def entries(self) -> list:
+        """List the (modification time, size, path) of every artifact."""
+        entries = []
+        for subdirectory in os.scandir(self.directory):
+            if subdirectory.is_dir():
+                for entry in os.scandir(subdirectory.path):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+        return entries
+
+    def size(self) -> int:
+        """Returns the total size in bytes of all artifacts."""
+        return sum(x[1] for x in self.entries())
+
+    def evict(self):
+        """Delete the least recently used artifacts over max_size."""
+        entries = sorted(self.entries())
+        total = sum(x[1] for x in entries)
+        for _, size, path in entries:
+            if total <= self.max_size:
+                break
+            os.remove(path)
+            total -= size
+
+    def clear(self):
+        """Delete every artifact of the cache."""
+        for _, _, path in self.entries():
+            os.remove(path)
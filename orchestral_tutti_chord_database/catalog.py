@@ -0,0 +1,107 @@
+from itertools import compress
+
+from orchestral_tutti_chord_database.lazy import lazy_import
+from orchestral_tutti_chord_database.parser import ChordInfo
+
+
+settheory = lazy_import("orchestral_tutti_chord_database.settheory")
+
+FIELDS = tuple(ChordInfo.long) + ("notes", "mask")
+
+
+class Catalog(object):
+    """The metadata of the chords of a database, with notes on demand.
+
+    Only the piece and chord information of ChordInfo.long, the number
+    of sounding notes and the pitch-class bitmask of every chord are
+    loaded, one list per field, from the index of a Database or from
+    the chord and piece tables of an SQLiteDatabase. Listing and
+    filtering chords therefore neither parses nor holds their notes,
+    which are only loaded by load and iter_dicts.
+
+    Attributes:
+        database: The Database or SQLiteDatabase of the chords.
+        names: The sorted names of the chords.
+        positions: The index in names of every name.
+        columns: The list of the values of every chord by field, see
+            FIELDS, None where unknown.
+    """
+
+    __slots__ = ["database", "names", "positions", "columns"]
+
+    def __init__(self, database):
+        self.database = database
+        metadata = database.load_metadata()
+        self.names: list = sorted(metadata)
+        self.positions: dict = {x: i for i, x in enumerate(self.names)}
+        self.columns: dict = {
+            k: [metadata[x].get(k) for x in self.names] for k in FIELDS
+        }
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name: str):
+        return name in self.positions
+
+    def get(self, name: str) -> dict:
+        """Returns the metadata of a chord, raising KeyError if unknown."""
+        i = self.positions[name]
+        return {k: v[i] for k, v in self.columns.items()}
+
+    def load(self, name: str) -> dict:
+        """Returns the full dict of a chord, read from the database."""
+        if name not in self.positions:
+            raise KeyError(name)
+        return self.database.load_dict(name)
+
+    def iter_dicts(self, names: list = None):
+        """Yields the name and the full dict of chords, read on demand.
+
+        Args:
+            names: The names of the chords to load, defaults to all.
+        """
+        return self.database.iter_dicts(self.names if names is None else names)
+
+    def query(
+        self,
+        composer: str = None,
+        name: str = None,
+        chord: str = None,
+        since: int = None,
+        until: int = None,
+        forte: str = None,
+    ) -> list:
+        """Returns the names of the chords which match every filter.
+
+        Args:
+            composer: A part of the composer, case insensitive.
+            name: A part of the piece name, case insensitive.
+            chord: The chord symbol.
+            since: The earliest year.
+            until: The latest year.
+            forte: The Forte name of the set class, e.g. '3-11'.
+        """
+        selected = [True] * len(self)
+
+        def keep(column, predicate):
+            for i, value in enumerate(self.columns[column]):
+                selected[i] = selected[i] and predicate(value)
+
+        def year(value):
+            return value if isinstance(value, int) else None
+
+        for field, text in (("composer", composer), ("name", name)):
+            if text is not None:
+                text = text.lower()
+                keep(field, lambda x: text in str(x or "").lower())
+        if chord is not None:
+            keep("chord", lambda x: x == chord)
+        if since is not None:
+            keep("year", lambda x: year(x) is not None and x >= since)
+        if until is not None:
+            keep("year", lambda x: year(x) is not None and x <= until)
+        if forte is not None:
+            names = settheory.forte_name([x or 0 for x in self.columns["mask"]])
+            selected = [x and y == forte for x, y in zip(selected, names)]
+        return list(compress(self.names, selected))
@@ -0,0 +1,786 @@
+"""Parse, store, analyze, render and query tutti chords.
+
+Entries are plain text blocks of 'key: value' lines separated by blank
+lines, see ChordInfo.parse_line. Commands read entries or JSON lines
+from files, or from stdin when no file or '-' is given, and stream
+their results, so they can be piped into each other:
+
+    otcd parse scores/*.txt | otcd analyze --jobs 4 --timings
+    otcd build db scores/*.txt
+    otcd generate 100000 --seed 1 --jobs 0 | otcd build big.sqlite
+    otcd import scores/*.mxl --bar 1 --info "Composer: Gustav Mahler" | otcd build db
+    otcd build chords.sqlite --from db
+    otcd query --db db --composer britten | otcd render -o out
+    otcd watch scores db --previews previews
+    otcd serve db --port 8000
+    otcd benchmark --sizes 1000 10000 --baseline baseline.json
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+
+from orchestral_tutti_chord_database.catalog import Catalog
+from orchestral_tutti_chord_database.database import get_name
+from orchestral_tutti_chord_database.database import get_summary
+from orchestral_tutti_chord_database.database import open_database
+from orchestral_tutti_chord_database.lazy import lazy_import
+from orchestral_tutti_chord_database.parser import ChordInfo
+from orchestral_tutti_chord_database.parser import iter_entries
+from orchestral_tutti_chord_database.timing import Timings
+
+
+# Imported on first use, so parsing never pays for NumPy.
+analysis = lazy_import("orchestral_tutti_chord_database.analysis")
+benchmark = lazy_import("orchestral_tutti_chord_database.benchmark")
+consonance = lazy_import("orchestral_tutti_chord_database.consonance")
+settheory = lazy_import("orchestral_tutti_chord_database.settheory")
+synthetic = lazy_import("orchestral_tutti_chord_database.synthetic")
+voicing = lazy_import("orchestral_tutti_chord_database.voicing")
+
+CHUNK_SIZE = 256
+DATABASE_HELP = "the database directory, or an .sqlite, .sqlite3 or .db file"
+
+
+def chunked(iterable, size: int = CHUNK_SIZE):
+    """Yields lists of up to size consecutive items of an iterable."""
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def imap(function, chunks, jobs: int = 1):
+    """Yields function(chunk) for every chunk, in order.
+
+    With more than one job, chunks are processed by a pool of jobs
+    processes, with at most twice as many chunks in flight so that an
+    endless input such as stdin streams through in bounded memory.
+    """
+    if jobs <= 1:
+        yield from map(function, chunks)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(function, chunk))
+            if len(pending) >= 2 * jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def open_inputs(paths: list):
+    """Yields the name and the open text file of every input path.
+
+    An empty list of paths or the path '-' reads stdin.
+    """
+    for path in paths or ["-"]:
+        if path == "-":
+            yield "stdin", sys.stdin
+        else:
+            with open(path, encoding="utf-8") as fd:
+                yield path, fd
+
+
+def check_names(paths: list):
+    """Raise ValueError if two inputs would give their chords the same names.
+
+    Chords are named after the stem of their file, see get_name, so
+    a/x.txt and b/x.txt would overwrite each other's chords.
+    """
+    seen = {}
+    for path in paths or []:
+        first = seen.setdefault(get_name(path, 0), path)
+        if os.path.abspath(first) != os.path.abspath(path):
+            raise ValueError(
+                f"{first} and {path} would name their chords alike, rename one."
+            )
+
+
+def iter_blocks(paths: list):
+    """Yields the name and the lines of every entry of text inputs."""
+    check_names(paths)
+    for source, fd in open_inputs(paths):
+        for i, lines in enumerate(iter_entries(fd)):
+            yield get_name(source, i), lines
+
+
+def iter_records(args):
+    """Yields the records, a chord dict with its 'id', of the inputs.
+
+    Records are read from the database of args.db if given,
+    otherwise from JSON lines as written by the parse command.
+    """
+    if args.db:
+        for name, data in open_database(args.db):
+            yield dict(data, id=name)
+        return
+    for source, fd in open_inputs(args.files):
+        for line in fd:
+            if line.strip():
+                yield json.loads(line)
+
+
+def count_notes(record: dict) -> int:
+    """Returns the number of sounding notes of a record, rests excluded."""
+    return sum(
+        len([x for x in instrument["notes"] if x])
+        for instruments in record.get("sections", {}).values()
+        for instrument in instruments
+    )
+
+
+def parse_chunk(blocks: list) -> list:
+    """Returns the records of a list of (name, lines) entries."""
+    records = []
+    for name, lines in blocks:
+        try:
+            chord = ChordInfo.parse_lines(lines)
+        except ValueError as e:
+            raise ValueError(f"{name}: {e}") from e
+        records.append(dict(chord.to_dict(), id=name))
+    return records
+
+
+def analyze_chunk(records: list) -> list:
+    """Returns the spacing, set class, consonance and root of records.
+
+    All but the spelled consonance and root only depend on the voicing,
+    and are computed once per distinct voicing of the chunk.
+    """
+    chords = [ChordInfo.from_dict(x) for x in records]
+    table = analysis.NoteTable.from_chords(chords)
+    result = consonance.analyze_consonance(table)
+    roots = [voicing.get_root(x) for x in chords]
+    normal = voicing.table_hashes(table, roots)
+    unique, inverse = voicing.unique_voicings(table)
+    hashes = voicing.table_hashes(unique)
+    spacing = analysis.analyze_spacing(unique)
+    roughness = consonance.analyze_roughness(unique)
+    masks = settheory.get_masks(unique)
+    names = settheory.forte_name(masks)
+
+    def number(x):
+        return None if math.isnan(x) else round(float(x), 6)
+
+    return [
+        {
+            "id": record.get("id"),
+            "chord": record.get("chord"),
+            "voicing": hashes[j],
+            "root": roots[i],
+            "normal": normal[i],
+            "notes": int(spacing.offsets[j + 1] - spacing.offsets[j]),
+            "forte": str(names[j]),
+            "prime_form": settheory.prime_form(int(masks[j])),
+            "wide_gaps": int(spacing.wide_count[j]),
+            "harmonicity": number(result.harmonicity[i]),
+            "deviation": number(result.deviation[i]),
+            "roughness": number(roughness[j]),
+        }
+        for i, (record, j) in enumerate(zip(records, inverse))
+    ]
+
+
+def render_chunk(records: list, output_dir: str) -> list:
+    """Draw the SVG balance view of records, returning the paths."""
+    from orchestral_tutti_chord_database.svg import write_svg
+
+    chords = [ChordInfo.from_dict(x) for x in records]
+    return write_svg(chords, output_dir, [x["id"] for x in records])
+
+
+def get_forte_name(record: dict) -> str:
+    """Returns the Forte name of the pitch-class set of a record."""
+    from orchestral_tutti_chord_database.pitch import get_pitch
+
+    midinums = [
+        get_pitch(x).midinum
+        for instruments in record.get("sections", {}).values()
+        for instrument in instruments
+        for x in instrument["notes"]
+        if x
+    ]
+    return str(settheory.forte_name(settheory.get_mask(midinums)))
+
+
+def query_chunk(records: list, filters: dict) -> list:
+    """Returns the records which match every given filter."""
+
+    def contains(value, text):
+        return text is None or text.lower() in str(value or "").lower()
+
+    def matches(record):
+        year = record.get("year")
+        instruments = [
+            instrument["instrument"]
+            for instruments in record.get("sections", {}).values()
+            for instrument in instruments
+        ]
+        return (
+            contains(record.get("composer"), filters["composer"])
+            and contains(record.get("name"), filters["name"])
+            and (filters["chord"] is None or record.get("chord") == filters["chord"])
+            and (filters["since"] is None or (year or -1) >= filters["since"])
+            and (filters["until"] is None or (year or 1e9) <= filters["until"])
+            and (
+                filters["instrument"] is None
+                or any(contains(x, filters["instrument"]) for x in instruments)
+            )
+            and (filters["forte"] is None or get_forte_name(record) == filters["forte"])
+        )
+
+    return [x for x in records if matches(x)]
+
+
+def generate_chunk(indices: list, seed: int) -> list:
+    """Returns the text of synthetic entries, see synthetic.generate_entry."""
+    return ["\n".join(synthetic.generate_entry(seed, i)) + "\n" for i in indices]
+
+
+def import_file(path: str, bars: list = None, info: dict = None) -> list:
+    """Returns the chords of bars, or the final chord, of a score file.
+
+    Standard MIDI Files are read by midi.read_midi, MusicXML scores by
+    musicxml.read_musicxml, bars being their measure numbers.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        if extension in (".mid", ".midi", ".smf"):
+            from orchestral_tutti_chord_database.midi import read_midi
+
+            with open(path, "rb") as fd:
+                return read_midi(fd, bars, info)
+        if extension in (".xml", ".musicxml"):
+            from orchestral_tutti_chord_database.musicxml import read_musicxml
+
+            with open(path, "rb") as fd:
+                return read_musicxml(fd, bars, info)
+        if extension == ".mxl":
+            from orchestral_tutti_chord_database.musicxml import read_mxl
+
+            return read_mxl(path, bars, info)
+    except (ValueError, SyntaxError, zipfile.BadZipFile) as e:
+        raise ValueError(f"{path}: {e}") from e
+    raise ValueError(f"{path}: Expected a .mid, .midi, .musicxml or .mxl file.")
+
+
+def import_chunk(paths: list, bars: list = None, info: dict = None) -> list:
+    """Returns the text of the entries imported from score files."""
+    return [
+        "\n".join([f"# {path}"] + chord.to_lines()) + "\n"
+        for path in paths
+        for chord in import_file(path, bars, info)
+    ]
+
+
+def write_lines(records, stage, output=None):
+    """Write records as JSON lines, counting them in a stage."""
+    output = output or sys.stdout
+    for record in records:
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        stage.chords += 1
+        stage.notes += record["notes"] if "notes" in record else count_notes(record)
+
+
+def run_parse(args, timings: Timings):
+    with timings.stage("parse") as stage:
+        chunks = imap(parse_chunk, chunked(iter_blocks(args.files)), args.jobs)
+        for records in chunks:
+            write_lines(records, stage)
+
+
+def run_generate(args, timings: Timings):
+    with timings.stage("generate") as stage:
+        indices = range(args.start, args.start + args.count)
+        chunks = imap(
+            partial(generate_chunk, seed=args.seed), chunked(indices), args.jobs
+        )
+        for entries in chunks:
+            for entry in entries:
+                sys.stdout.write(("\n" if stage.chords else "") + entry)
+                stage.chords += 1
+
+
+def run_import(args, timings: Timings):
+    info = {}
+    for line in args.info or []:
+        k, _, v = line.partition(":")
+        k = k.strip().lower()
+        if k not in ChordInfo.long + ChordInfo.short or not v.strip():
+            raise ValueError(f"Expected 'key: value' information, got {line!r}.")
+        info[k] = v.strip()
+    with timings.stage("import") as stage:
+        function = partial(import_chunk, bars=args.bar, info=info)
+        for entries in imap(function, chunked(args.files, 1), args.jobs):
+            for entry in entries:
+                sys.stdout.write(("\n" if stage.chords else "") + entry)
+                stage.chords += 1
+
+
+def check_duplicate(name: str, data: dict, seen: dict) -> bool:
+    """Warn of a duplicate or near-duplicate voicing among ingested chords.
+
+    Args:
+        name: The name of the chord.
+        data: The dict of the chord.
+        seen: The name and piece information of the first chord of
+            every voicing and pitch hash, updated in place.
+
+    Returns:
+        Whether the chord repeats both the voicing and the piece
+        information of an earlier chord, i.e. was entered twice.
+    """
+    info = {k: v for k, v in data.items() if k != "sections"}
+    first = seen.setdefault(voicing.voicing_hash(data), (name, info))
+    if first[0] != name:
+        print(f"otcd: duplicate voicing: {name} of {first[0]}", file=sys.stderr)
+        return first[1] == info
+    first = seen.setdefault("pitches:" + voicing.pitch_hash(data), (name, info))
+    if first[0] != name:
+        print(f"otcd: near-duplicate pitches: {name} of {first[0]}", file=sys.stderr)
+    return False
+
+
+def run_build(args, timings: Timings):
+    database = open_database(args.directory)
+    summaries, seen = {}, {}
+    with timings.stage("build") as stage:
+        if args.source:
+            chunks = chunked(dict(x, id=k) for k, x in open_database(args.source))
+        else:
+            blocks = chunked(iter_blocks(args.files))
+            chunks = imap(parse_chunk, blocks, args.jobs)
+        for records in chunks:
+            items = [(x.pop("id"), x) for x in records]
+            if args.duplicates != "keep":
+                repeated = {x for x, data in items if check_duplicate(x, data, seen)}
+                if args.duplicates == "skip":
+                    items = [x for x in items if x[0] not in repeated]
+            database.save_many(items, index=False)
+            for name, data in items:
+                summaries[name] = get_summary(data)
+                stage.chords += 1
+                stage.notes += summaries[name]["notes"]
+        database.update_index(summaries)
+
+
+def run_analyze(args, timings: Timings):
+    with timings.stage("analyze") as stage:
+        chunks = imap(analyze_chunk, chunked(iter_records(args)), args.jobs)
+        for results in chunks:
+            write_lines(results, stage)
+
+
+def run_render(args, timings: Timings):
+    if args.engine == "svg":
+        with timings.stage("render") as stage:
+            # The notes of the chunks submitted, in order, as imap yields.
+            notes = deque()
+
+            def counted(chunks):
+                for records in chunks:
+                    notes.append(sum(count_notes(x) for x in records))
+                    yield records
+
+            function = partial(render_chunk, output_dir=args.output)
+            chunks = counted(chunked(iter_records(args)))
+            for paths in imap(function, chunks, args.jobs):
+                stage.chords += len(paths)
+                stage.notes += notes.popleft()
+        return
+
+    from orchestral_tutti_chord_database.cache import RenderCache
+    from orchestral_tutti_chord_database.lilypond import render
+
+    with timings.stage("load") as stage:
+        records = list(iter_records(args))
+        chords = [ChordInfo.from_dict(x) for x in records]
+        stage.chords = len(records)
+        stage.notes = sum(count_notes(x) for x in records)
+    with timings.stage("render") as stage:
+        render(
+            chords,
+            args.output,
+            [x["id"] for x in records],
+            formats=args.format or ["pdf"],
+            jobs=args.jobs,
+            lilypond=args.lilypond,
+            cache=RenderCache(args.cache) if args.cache else None,
+        )
+        stage.chords = len(records)
+        stage.notes = sum(count_notes(x) for x in records)
+
+
+def run_query(args, timings: Timings):
+    filters = {
+        "composer": args.composer,
+        "name": args.name,
+        "chord": args.chord,
+        "since": args.since,
+        "until": args.until,
+        "instrument": args.instrument,
+        "forte": args.forte,
+    }
+    with timings.stage("query") as stage:
+        if args.db:
+            # Filter by the metadata first, and only load the notes of the
+            # chords found, if at all.
+            catalog = Catalog(open_database(args.db))
+            metadata = {k: v for k, v in filters.items() if k != "instrument"}
+            names = catalog.query(**metadata)
+            if args.ids and filters["instrument"] is None:
+                for name in names:
+                    sys.stdout.write(name + "\n")
+                    stage.chords += 1
+                    stage.notes += catalog.get(name)["notes"] or 0
+                return
+            records = (dict(x, id=k) for k, x in catalog.iter_dicts(names))
+        else:
+            records = iter_records(args)
+        chunks = imap(
+            partial(query_chunk, filters=filters), chunked(records), args.jobs
+        )
+        for records in chunks:
+            if args.ids:
+                for record in records:
+                    sys.stdout.write(record["id"] + "\n")
+                    stage.chords += 1
+                    stage.notes += count_notes(record)
+            else:
+                write_lines(records, stage)
+
+
+def run_watch(args, timings: Timings):
+    import asyncio
+
+    from orchestral_tutti_chord_database.watch import Watcher
+
+    def report(update):
+        print(
+            f"{update.elapsed * 1000:.0f} ms: {', '.join(update.sources)}: "
+            f"{len(update.saved)} saved, {len(update.removed)} removed",
+            file=sys.stderr,
+        )
+        for source, error in update.errors.items():
+            print(f"otcd: error: {source}: {error}", file=sys.stderr)
+
+    watcher = Watcher(
+        args.sources,
+        open_database(args.directory),
+        previews=args.previews,
+        debounce=args.debounce,
+        poll_interval=args.interval,
+        inotify=not args.poll,
+        jobs=args.jobs,
+        on_update=report,
+    )
+    try:
+        asyncio.run(watcher.run())
+    except KeyboardInterrupt:
+        pass
+
+
+def run_serve(args, timings: Timings):
+    from orchestral_tutti_chord_database.server import ChordStore
+    from orchestral_tutti_chord_database.server import QueryServer
+
+    with timings.stage("load") as stage:
+        store = ChordStore.from_database(open_database(args.directory))
+        stage.chords = len(store)
+        stage.notes = sum(x["notes"] for x in store.summaries)
+    server = QueryServer(
+        store, (args.host, args.port), args.cache_size, verbose=args.verbose
+    )
+    host, port = server.server_address[:2]
+    print(f"Serving {len(store)} chords on http://{host}:{port}/", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def run_benchmark(args, timings: Timings):
+    sizes = args.sizes or benchmark.SIZES
+    previews = benchmark.PREVIEWS if args.previews is None else args.previews
+    threshold = benchmark.THRESHOLD if args.threshold is None else args.threshold
+    report = benchmark.run_benchmark(sizes, args.seed, args.jobs, previews)
+    print(benchmark.format_report(report), file=sys.stderr)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fd:
+            json.dump(report, fd, indent=2)
+    else:
+        sys.stdout.write(json.dumps(report, indent=2) + "\n")
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fd:
+            rows = benchmark.compare(report, json.load(fd), threshold)
+        print(benchmark.format_comparison(rows), file=sys.stderr)
+        failed = [x for x in rows if not x[-1]]
+        if failed:
+            raise ValueError(
+                f"{len(failed)} of {len(rows)} metrics regressed by more than "
+                f"{threshold:.0%} of the baseline."
+            )
+
+
+def get_jobs(value: str) -> int:
+    """Returns the number of processes of a --jobs value, 0 for all cores."""
+    jobs = int(value)
+    if jobs < 0:
+        raise argparse.ArgumentTypeError(f"Expected 0 or more jobs, got {jobs}.")
+    return jobs or os.cpu_count() or 1
+
+
+def get_bar(value: str) -> int:
+    """Returns the bar of a --bar value, counted from 1."""
+    bar = int(value)
+    if bar < 1:
+        raise argparse.ArgumentTypeError(f"Expected a bar from 1, got {bar}.")
+    return bar
+
+
+def make_parser() -> argparse.ArgumentParser:
+    """Returns the argument parser of every command."""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "-j",
+        "--jobs",
+        type=get_jobs,
+        default=1,
+        help="number of worker processes, 0 for one per core (default: 1)",
+    )
+    common.add_argument(
+        "--timings",
+        action="store_true",
+        help="print the wall and CPU time and throughput of each stage to stderr",
+    )
+    common.add_argument(
+        "--profile",
+        action="store_true",
+        help="print the calls and cache hits of the hot paths of this process, "
+        "i.e. not of --jobs workers, to stderr",
+    )
+    common.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="with --profile, also trace allocations with tracemalloc",
+    )
+    records = argparse.ArgumentParser(add_help=False)
+    records.add_argument("files", nargs="*", help="JSON lines files, default stdin")
+    records.add_argument("--db", help="read the chords of a database")
+
+    parser = argparse.ArgumentParser(
+        prog="otcd",
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="\n".join(__doc__.splitlines()[1:]),
+    )
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+
+    command = commands.add_parser(
+        "parse", parents=[common], help="parse text entries into JSON lines"
+    )
+    command.add_argument("files", nargs="*", help="text files, default stdin")
+    command.set_defaults(run=run_parse)
+
+    command = commands.add_parser(
+        "generate", parents=[common], help="write a synthetic corpus of text entries"
+    )
+    command.add_argument("count", type=int, help="number of entries")
+    command.add_argument(
+        "--seed", type=int, default=0, help="seed of the corpus (default: 0)"
+    )
+    command.add_argument(
+        "--start",
+        type=int,
+        default=0,
+        help="index of the first entry, to write a corpus in parts (default: 0)",
+    )
+    command.set_defaults(run=run_generate)
+
+    command = commands.add_parser(
+        "import", parents=[common], help="write text entries of chords of scores"
+    )
+    command.add_argument(
+        "files", nargs="+", help="Standard MIDI Files or MusicXML scores"
+    )
+    command.add_argument(
+        "--bar",
+        type=get_bar,
+        action="append",
+        help="import the chord sounding on the first beat of this bar, counted "
+        "from 1 in MIDI files, as numbered in MusicXML scores, repeatable "
+        "(default: the final chord)",
+    )
+    command.add_argument(
+        "--info",
+        action="append",
+        help="an information line of every entry, e.g. 'Composer: Gustav Mahler', "
+        "repeatable",
+    )
+    command.set_defaults(run=run_import)
+
+    command = commands.add_parser(
+        "build", parents=[common], help="parse text entries into a database"
+    )
+    command.add_argument("directory", help=DATABASE_HELP)
+    command.add_argument("files", nargs="*", help="text files, default stdin")
+    command.add_argument(
+        "--from",
+        dest="source",
+        help="copy the chords of another database instead of parsing text",
+    )
+    command.add_argument(
+        "--duplicates",
+        choices=["keep", "warn", "skip"],
+        default="warn",
+        help="warn of repeated voicings, and with skip, do not save chords "
+        "repeating the voicing and piece information of another (default: warn)",
+    )
+    command.set_defaults(run=run_build)
+
+    command = commands.add_parser(
+        "analyze",
+        parents=[common, records],
+        help="analyze spacing, set class and consonance",
+    )
+    command.set_defaults(run=run_analyze)
+
+    command = commands.add_parser(
+        "render", parents=[common, records], help="draw or engrave chords"
+    )
+    command.add_argument("-o", "--output", required=True, help="output directory")
+    command.add_argument(
+        "--engine",
+        choices=["svg", "lilypond"],
+        default="svg",
+        help="draw the balance view as SVG, or engrave with lilypond",
+    )
+    command.add_argument(
+        "--format",
+        action="append",
+        choices=["pdf", "svg", "png"],
+        help="lilypond output format, repeatable (default: pdf)",
+    )
+    command.add_argument("--cache", help="lilypond render cache directory")
+    command.add_argument("--lilypond", default="lilypond", help="lilypond binary")
+    command.set_defaults(run=run_render)
+
+    command = commands.add_parser(
+        "query", parents=[common, records], help="filter chords"
+    )
+    command.add_argument("--composer", help="composer containing this text")
+    command.add_argument("--name", help="piece name containing this text")
+    command.add_argument("--chord", help="chord symbol")
+    command.add_argument("--since", type=int, help="composed in or after this year")
+    command.add_argument("--until", type=int, help="composed in or before this year")
+    command.add_argument("--instrument", help="an instrument containing this text")
+    command.add_argument("--forte", help="Forte name of the set class, e.g. 3-11")
+    command.add_argument("--ids", action="store_true", help="print ids only")
+    command.set_defaults(run=run_query)
+
+    command = commands.add_parser(
+        "watch",
+        parents=[common],
+        help="keep a database in sync with a directory of text files",
+    )
+    command.add_argument("sources", help="the directory of the text files")
+    command.add_argument("directory", help=DATABASE_HELP)
+    command.add_argument("--previews", help="keep SVG previews in this directory")
+    command.add_argument(
+        "--debounce",
+        type=float,
+        default=0.05,
+        help="seconds without changes which end a burst of saves (default: 0.05)",
+    )
+    command.add_argument(
+        "--poll", action="store_true", help="poll instead of using inotify"
+    )
+    command.add_argument(
+        "--interval",
+        type=float,
+        default=0.25,
+        help="seconds between two polls (default: 0.25)",
+    )
+    command.set_defaults(run=run_watch)
+
+    command = commands.add_parser(
+        "serve", parents=[common], help="answer JSON queries of a database over HTTP"
+    )
+    command.add_argument("directory", help=DATABASE_HELP)
+    command.add_argument("--host", default="127.0.0.1", help="default: 127.0.0.1")
+    command.add_argument("--port", type=int, default=8000, help="default: 8000")
+    command.add_argument(
+        "--cache-size",
+        type=int,
+        default=1024,
+        help="number of responses cached (default: 1024)",
+    )
+    command.add_argument("--verbose", action="store_true", help="log every request")
+    command.set_defaults(run=run_serve)
+
+    command = commands.add_parser(
+        "benchmark",
+        parents=[common],
+        help="time the whole pipeline over synthetic corpora of growing size",
+    )
+    # Defaults are those of the benchmark module, not imported until run.
+    command.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        help="numbers of chords of the corpora (default: 1000 10000)",
+    )
+    command.add_argument(
+        "--seed", type=int, default=0, help="seed of the corpora (default: 0)"
+    )
+    command.add_argument(
+        "--previews",
+        type=int,
+        help="most chords to render (default: 100)",
+    )
+    command.add_argument("-o", "--output", help="JSON report file, default stdout")
+    command.add_argument("--baseline", help="compare with this JSON report")
+    command.add_argument(
+        "--threshold",
+        type=float,
+        help="largest relative regression of the baseline which passes "
+        "(default: 0.2)",
+    )
+    command.set_defaults(run=run_benchmark)
+    return parser
+
+
+def main(argv: list = None) -> int:
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    timings = Timings()
+    profile = None
+    if args.profile:
+        from orchestral_tutti_chord_database.profiling import Profile
+
+        profile = Profile(memory=args.trace_memory)
+        profile.enable()
+    try:
+        args.run(args, timings)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"otcd: error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if profile is not None:
+            profile.disable()
+            print(profile.report(), file=sys.stderr)
+        if args.timings:
+            print(timings.report(), file=sys.stderr)
+    return 0
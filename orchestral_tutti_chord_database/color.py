@@ -1,6 +1,18 @@
-import numpy as np
+from __future__ import annotations
+
+from functools import lru_cache
 from math import pi
 
+from orchestral_tutti_chord_database.lazy import lazy_import
+
+
+np = lazy_import("numpy")
+
+SWATCH_CACHE_SIZE = 512
+WEIGHT_BUCKETS = 16
+
+_note_color_tables = {}
+
 
 def make_swatches(
     start=0.5,
@@ -36,21 +48,157 @@ def make_swatches(
         reverse: Return color list reversed.
         float: Convert return values to float rather than 8-bit int.
         hex: Convert none-float values to #xxxxxx format.
+
+    Palettes are cached by their clipped parameters, hence the returned
+    arrays are read-only and shared between calls; copy one before
+    modifying it. Hex lists are returned as new lists on each call.
+    """
+    color_list = _make_swatches(
+        *normalize_swatch_params(
+            start,
+            rotations,
+            min_sat,
+            max_sat,
+            min_light,
+            max_light,
+            gamma,
+            numbers,
+            reverse,
+            float,
+            hex,
+        )
+    )
+    if isinstance(color_list, tuple):
+        return list(color_list)
+    return color_list
+
+
+def normalize_swatch_params(
+    start, rotations, min_sat, max_sat, min_light, max_light, gamma, numbers, *flags
+) -> tuple:
+    """Clip the parameters of make_swatches into ranges that make sense.
+
+    Returns a hashable tuple of builtin numbers in the order of the
+    arguments, so equal palettes share the same key in the cache.
     """
-    # Clip some of the passed values into ranges that make sense.
-    start = np.clip(start, 0.0, 3.0)
-    min_sat = np.clip(min_sat, 0, 2)
-    max_sat = np.clip(max_sat, 0, 2)
-    min_light = np.clip(min_light, 0, 2)
-    max_light = np.clip(max_light, 0, 2)
-    numbers = np.clip(numbers, 1, 1024)
+    return (
+        min(max(float(start), 0.0), 3.0),
+        float(rotations),
+        min(max(float(min_sat), 0.0), 2.0),
+        min(max(float(max_sat), 0.0), 2.0),
+        min(max(float(min_light), 0.0), 2.0),
+        min(max(float(max_light), 0.0), 2.0),
+        float(gamma),
+        min(max(int(numbers), 1), 1024),
+    ) + tuple(bool(x) for x in flags)
+
+
+@lru_cache(maxsize=SWATCH_CACHE_SIZE)
+def _make_swatches(
+    start,
+    rotations,
+    min_sat,
+    max_sat,
+    min_light,
+    max_light,
+    gamma,
+    numbers,
+    reverse,
+    float,
+    hex,
+):
+    """Compute a palette from normalized parameters of make_swatches."""
+    params = [start, rotations, min_sat, max_sat, min_light, max_light, gamma]
+    color_list = _cubehelix(
+        *np.array([params]).T,
+        numbers,
+        reverse,
+        float,
+    )[0]
+
+    # Freeze the result as it is shared by every hit of the cache
+    if hex and not float:
+        return tuple(hex_colors(color_list).tolist())
+    color_list.setflags(write=False)
+    return color_list
+
+
+def make_swatch_grid(
+    start=0.5,
+    rotations=0,
+    min_sat=1.2,
+    max_sat=1.2,
+    min_light=0.0,
+    max_light=1.0,
+    gamma=1.0,
+    numbers=256,
+    reverse=False,
+    float=False,
+    hex=False,
+) -> np.ndarray:
+    """Generates many cubehelix color schemes in one vectorized pass.
+
+    Takes the same arguments as make_swatches, except that start,
+    rotations, min_sat, max_sat, min_light, max_light and gamma can be
+    arrays, which are broadcast against each other into one palette per
+    element, e.g. the twelve pitch class hues at three lightness ranges
+    with start of shape (12, 1) and max_light of shape (3,).
+
+    Returns:
+        An array shaped (*palettes, numbers, 3) of 8-bit int or float
+        values, or (*palettes, numbers) of strings if hex is set.
+    """
+    params = np.broadcast_arrays(
+        *(
+            np.asarray(x, dtype=np.float64)
+            for x in (start, rotations, min_sat, max_sat, min_light, max_light, gamma)
+        )
+    )
+    shape = params[0].shape
+    start, rotations, min_sat, max_sat, min_light, max_light, gamma = (
+        x.ravel() for x in params
+    )
+    color_grid = _cubehelix(
+        np.clip(start, 0.0, 3.0),
+        rotations,
+        np.clip(min_sat, 0, 2),
+        np.clip(max_sat, 0, 2),
+        np.clip(min_light, 0, 2),
+        np.clip(max_light, 0, 2),
+        gamma,
+        min(max(int(numbers), 1), 1024),
+        reverse,
+        float,
+    )
+    color_grid = color_grid.reshape(shape + color_grid.shape[1:])
+    if hex and not float:
+        return hex_colors(color_grid)
+    return color_grid
 
+
+def _cubehelix(
+    start,
+    rotations,
+    min_sat,
+    max_sat,
+    min_light,
+    max_light,
+    gamma,
+    numbers,
+    reverse,
+    float,
+) -> np.ndarray:
+    """Compute palettes from 1-D arrays of clipped parameters.
+
+    Returns:
+        An array shaped (len(start), numbers, 3).
+    """
     # Define transform scalars
-    fract = np.linspace(min_light, max_light, numbers)
-    phi = 2.0 * pi * ((start + 1) / 3.0 + rotations * fract)
-    fract **= gamma
+    fract = np.linspace(min_light, max_light, numbers, axis=-1)
+    phi = 2.0 * pi * ((start[:, None] + 1) / 3.0 + rotations[:, None] * fract)
+    fract **= gamma[:, None]
 
-    satar = np.linspace(min_sat, max_sat, numbers)
+    satar = np.linspace(min_sat, max_sat, numbers, axis=-1)
     amp = satar * fract * (1.0 - fract) / 2.0
 
     # Define transform vectors/matrices
@@ -60,34 +208,124 @@ def make_swatches(
     rotation_vector = np.array([np.cos(phi), np.sin(phi)])
 
     # Perform transformation
-    transformed_color = (
-        fract + amp * np.einsum("jk, ij->ik", rotation_vector, transform_matrix)
-    ).T
+    transformed_color = fract[..., None] + amp[..., None] * np.einsum(
+        "jnk, ij->nki", rotation_vector, transform_matrix
+    )
 
     # Clip and normalize to 8bit
     if not float:
         color_list = (255 * np.clip(transformed_color, 0.0, 1.0)).astype(np.uint8)
-        if hex:
-            color_list = [
-                "#" + "".join(map(lambda i: "{0:#0{1}X}".format(i, 4)[2:], x))
-                for x in color_list
-            ]
     else:
         color_list = np.clip(transformed_color, 0.0, 1.0)
 
     # Reverse the color list if requested
     if reverse:
-        color_list = color_list[::-1]
+        color_list = color_list[:, ::-1]
 
     return color_list
 
 
+@lru_cache(maxsize=None)
+def get_hex_digits() -> np.ndarray:
+    """Returns the two hex digit bytes of every 8-bit value, shaped (256, 2)."""
+    return np.frombuffer(
+        "".join(f"{i:02X}" for i in range(256)).encode("ascii"), dtype=np.uint8
+    ).reshape(256, 2)
+
+
+def hex_colors(color_list) -> np.ndarray:
+    """Convert 8-bit RGB values to #xxxxxx strings in bulk.
+
+    Each channel is looked up in get_hex_digits and written into a buffer
+    of seven bytes per color, which is then viewed as strings at once.
+
+    Args:
+        color_list: An array-like of 8-bit int values shaped (..., 3).
+
+    Returns:
+        An array of strings shaped as color_list without its last axis.
+    """
+    color_list = np.asarray(color_list, dtype=np.uint8)
+    if color_list.shape[-1:] != (3,):
+        raise ValueError(f"Expected RGB values, got shape {color_list.shape}.")
+    shape = color_list.shape[:-1]
+    buffer = np.empty((color_list.size // 3, 7), dtype=np.uint8)
+    buffer[:, 0] = ord("#")
+    buffer[:, 1:] = get_hex_digits()[color_list.reshape(-1, 3)].reshape(-1, 6)
+    return buffer.view("S7").astype("U7").reshape(shape)
+
+
+def swatch_cache_info():
+    """Returns the hits, misses, maxsize and currsize of the cache."""
+    return _make_swatches.cache_info()
+
+
+def clear_swatch_cache():
+    """Empty the cache of palettes computed by make_swatches."""
+    _make_swatches.cache_clear()
+
+
 def pitch_class_index_to_hue(midinum):
     """Returns a handpicked hue value of the pitch class index."""
     hue_range = [0, 24, 48, 65, 85, 120, 185, 214, 240, 264, 284, 315]
     return hue_range[midinum % 12] / 120
 
 
+def get_note_color_table(buckets: int = WEIGHT_BUCKETS, hex=False) -> np.ndarray:
+    """Returns the colors of every pitch class at every weight bucket.
+
+    The table is built on first use from one cubehelix palette per
+    pitch class hue, running from light for the lightest weight to dark
+    for the heaviest, and kept for later calls.
+
+    Args:
+        buckets: The number of weight levels of each pitch class.
+        hex: Return #xxxxxx strings rather than 8-bit RGB values.
+
+    Returns:
+        An array shaped (12, buckets, 3), or (12, buckets) if hex.
+    """
+    key = (buckets, bool(hex))
+    if key not in _note_color_tables:
+        table = np.stack(
+            [
+                make_swatches(
+                    start=pitch_class_index_to_hue(i),
+                    rotations=0,
+                    numbers=buckets,
+                    min_sat=1,
+                    max_sat=2,
+                    min_light=0.2,
+                    max_light=0.9,
+                    reverse=True,
+                )
+                for i in range(12)
+            ]
+        )
+        if hex:
+            table = hex_colors(table)
+        table.setflags(write=False)
+        _note_color_tables[key] = table
+    return _note_color_tables[key]
+
+
+def note_colors(midinums, weights, buckets: int = WEIGHT_BUCKETS, hex=False):
+    """Color an array of notes by pitch class and weight.
+
+    Args:
+        midinums: The midi numbers, or pitch class indices, of notes.
+        weights: The weight of each note, from 0.0 to 1.0.
+        buckets: The number of weight levels to quantize weights to.
+        hex: Return #xxxxxx strings rather than 8-bit RGB values.
+
+    Returns:
+        An array shaped (*midinums.shape, 3), or midinums.shape if hex.
+    """
+    table = get_note_color_table(buckets, hex)
+    bucket = (np.asarray(weights, dtype=np.float64) * buckets).astype(np.int64)
+    return table[np.asarray(midinums) % 12, np.clip(bucket, 0, buckets - 1)]
+
+
 ratios = [
     36 / 25,
     16 / 15,
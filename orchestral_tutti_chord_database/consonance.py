@@ -0,0 +1,209 @@
+from fractions import Fraction
+
+import numpy as np
+
+from orchestral_tutti_chord_database.analysis import NoteTable
+from orchestral_tutti_chord_database.color import intervals
+from orchestral_tutti_chord_database.color import ratios
+from orchestral_tutti_chord_database.pitch import Interval
+
+
+def build_ratio_tables() -> tuple:
+    """Arrange the just intonation ratios by interval for lookup.
+
+    Every scale degree of color.intervals is placed at its quantity
+    (unison=0 to seventh=6) and semitones. Spellings absent from the
+    list, e.g. a diminished seventh, take the simplest ratio among the
+    degrees of the same semitones, e.g. the major sixth.
+
+    Returns:
+        The ratio and Tenney height, log2 of numerator times
+        denominator, shaped (7, 12), and the simplest ratio and its
+        height of each semitone, shaped (12,).
+    """
+    ratio_table = np.full((7, 12), np.nan)
+    height_table = np.full((7, 12), np.nan)
+    semitone_ratio = np.full(12, np.nan)
+    semitone_height = np.full(12, np.inf)
+    for degree, ratio in zip(intervals, ratios):
+        interval = Interval(degree)
+        fraction = Fraction(ratio).limit_denominator(1024)
+        height = np.log2(fraction.numerator * fraction.denominator)
+        semitones = abs(interval) % 12
+        ratio_table[interval.quantity - 1, semitones] = ratio
+        height_table[interval.quantity - 1, semitones] = height
+        if height < semitone_height[semitones]:
+            semitone_ratio[semitones] = ratio
+            semitone_height[semitones] = height
+    missing = np.isnan(ratio_table)
+    ratio_table[missing] = np.broadcast_to(semitone_ratio, (7, 12))[missing]
+    height_table[missing] = np.broadcast_to(semitone_height, (7, 12))[missing]
+    return ratio_table, height_table, semitone_ratio, semitone_height
+
+
+RATIO_TABLE, HEIGHT_TABLE, SEMITONE_RATIO, SEMITONE_HEIGHT = build_ratio_tables()
+
+# Sethares' parametrization of the Plomp-Levelt dissonance curve.
+DISSONANCE_MAX = 0.24
+DISSONANCE_SLOPE = (0.0207, 18.96)
+DISSONANCE_DECAY = (3.5, 5.75)
+PARTIALS = 6
+PARTIAL_DECAY = 0.88
+
+
+def interval_ratios(lower, upper, lower_letter=None, upper_letter=None) -> tuple:
+    """Tune arrays of intervals in just intonation by table lookup.
+
+    Intervals are reduced to within an octave. When the letters of
+    the spelling are given, the ratio of the spelled degree is used,
+    e.g. 25/18 for C-F# but 36/25 for C-Gb, otherwise the simplest
+    ratio of the semitones.
+
+    Args:
+        lower: The midi numbers of the lower notes.
+        upper: The midi numbers of the upper notes.
+        lower_letter: The pitch class indices, C=0 to B=6, of lower.
+        upper_letter: The pitch class indices of upper.
+
+    Returns:
+        The ratio, the deviation in cents of the ratio from equal
+        temperament, and the harmonicity, 1 / (1 + Tenney height), of
+        each interval.
+    """
+    semitones = (np.asarray(upper) - np.asarray(lower)) % 12
+    if lower_letter is None or upper_letter is None:
+        ratio, height = SEMITONE_RATIO[semitones], SEMITONE_HEIGHT[semitones]
+    else:
+        quantity = (np.asarray(upper_letter) - np.asarray(lower_letter)) % 7
+        ratio = RATIO_TABLE[quantity, semitones]
+        height = HEIGHT_TABLE[quantity, semitones]
+    cents = 1200 * np.log2(ratio) - 100 * semitones
+    return ratio, cents, 1 / (1 + height)
+
+
+class Consonance(object):
+    """The just intonation consonance of a batch of chords.
+
+    Attributes:
+        pairs: The number of pairs of notes in each chord.
+        harmonicity: The mean harmonicity of all pairs of each chord,
+            NaN for chords with fewer than two notes.
+        deviation: The mean absolute deviation in cents of all pairs
+            of each chord from equal temperament.
+    """
+
+    __slots__ = ["pairs", "harmonicity", "deviation"]
+
+    def __init__(self, pairs, harmonicity, deviation):
+        self.pairs = pairs
+        self.harmonicity = harmonicity
+        self.deviation = deviation
+
+    def __len__(self):
+        return len(self.pairs)
+
+
+def analyze_consonance(table: NoteTable, chunk_size: int = 256) -> Consonance:
+    """Score every pair of sounding notes of every chord in a table.
+
+    Args:
+        table: The NoteTable of the batch of chords.
+        chunk_size: The number of chords whose pairs are computed at
+            once.
+    """
+    pairs = np.zeros(table.size)
+    harmonicity = np.zeros(table.size)
+    deviation = np.zeros(table.size)
+    letter = table.letter
+    for lower, upper in table.iter_pairs(chunk_size):
+        _, cents, pair_harmonicity = interval_ratios(
+            table.midinum[lower],
+            table.midinum[upper],
+            None if letter is None else letter[lower],
+            None if letter is None else letter[upper],
+        )
+        chord = table.chord[lower]
+        pairs += np.bincount(chord, minlength=table.size)
+        harmonicity += np.bincount(
+            chord, weights=pair_harmonicity, minlength=table.size
+        )
+        deviation += np.bincount(chord, weights=np.abs(cents), minlength=table.size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return Consonance(
+            pairs.astype(np.int64), harmonicity / pairs, deviation / pairs
+        )
+
+
+def get_frequency(midinum) -> np.ndarray:
+    """Returns the frequency in Hz of midi numbers, with A4=57=440Hz."""
+    return 440.0 * 2 ** ((np.asarray(midinum) - 57) / 12)
+
+
+def pair_roughness(
+    lower, upper, lower_weight=1.0, upper_weight=1.0, partials: int = PARTIALS
+) -> np.ndarray:
+    """Sum the dissonance between the partials of pairs of notes.
+
+    Every partial of the lower note is compared with every partial of
+    the upper note with the Plomp-Levelt curve, the amplitude of the
+    k-th partial being weight * PARTIAL_DECAY ** (k - 1).
+
+    Args:
+        lower: The midi numbers of the lower notes.
+        upper: The midi numbers of the upper notes.
+        lower_weight: The balance weights of the lower notes.
+        upper_weight: The balance weights of the upper notes.
+        partials: The number of harmonic partials of each note.
+
+    Returns:
+        The roughness of each pair.
+    """
+    harmonics = np.arange(1, partials + 1)
+    amplitude = PARTIAL_DECAY ** (harmonics - 1)
+    lower_frequency = get_frequency(lower)[..., None, None] * harmonics[:, None]
+    upper_frequency = get_frequency(upper)[..., None, None] * harmonics
+    lower_amplitude = np.asarray(lower_weight, dtype=np.float64)[..., None, None]
+    upper_amplitude = np.asarray(upper_weight, dtype=np.float64)[..., None, None]
+    amplitude = lower_amplitude * upper_amplitude * np.outer(amplitude, amplitude)
+
+    low = np.minimum(lower_frequency, upper_frequency)
+    distance = np.abs(upper_frequency - lower_frequency)
+    distance *= DISSONANCE_MAX / (DISSONANCE_SLOPE[0] * low + DISSONANCE_SLOPE[1])
+    dissonance = np.exp(-DISSONANCE_DECAY[0] * distance)
+    dissonance -= np.exp(-DISSONANCE_DECAY[1] * distance)
+    return (amplitude * dissonance).sum(axis=(-2, -1))
+
+
+def analyze_roughness(
+    table: NoteTable, weights=None, partials: int = PARTIALS, chunk_size: int = 32
+) -> np.ndarray:
+    """Sum the roughness of every pair of notes of every chord in a table.
+
+    Args:
+        table: The NoteTable of the batch of chords.
+        weights: The amplitude of each note, defaults to the balance
+            weights of the table.
+        partials: The number of harmonic partials of each note.
+        chunk_size: The number of chords whose pairs are computed at
+            once, each pair holding partials ** 2 values in memory.
+
+    Returns:
+        The roughness of each chord.
+    """
+    if weights is None:
+        weights = table.weights()
+    weights = np.asarray(weights, dtype=np.float64)
+    roughness = np.zeros(table.size)
+    for lower, upper in table.iter_pairs(chunk_size):
+        roughness += np.bincount(
+            table.chord[lower],
+            weights=pair_roughness(
+                table.midinum[lower],
+                table.midinum[upper],
+                weights[lower],
+                weights[upper],
+                partials,
+            ),
+            minlength=table.size,
+        )
+    return roughness
@@ -0,0 +1,205 @@
+import json
+import os
+
+from orchestral_tutti_chord_database.parser import ChordInfo
+from orchestral_tutti_chord_database.pitch import get_pitch
+from orchestral_tutti_chord_database.voicing import get_normal_form
+from orchestral_tutti_chord_database.voicing import get_voicing
+from orchestral_tutti_chord_database.voicing import pack_hash
+
+
+EXTENSION = ".json"
+INDEX = ".index.json"
+SUMMARY_FIELDS = tuple(ChordInfo.long)
+
+
+def get_name(source: str, index: int) -> str:
+    """Returns the name of the index-th entry of a source text file."""
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return f"{stem}.{index}"
+
+
+def get_source(name: str) -> str:
+    """Returns the stem of the source text file of a chord name."""
+    return name.rpartition(".")[0]
+
+
+def get_summary(data: dict) -> dict:
+    """Returns the indexed fields of a chord dict.
+
+    Besides the piece information of SUMMARY_FIELDS, the summary holds
+    the number of sounding notes, the pitch-class bitmask, bit i set
+    for pitch class i, see settheory, the voicing hash, see
+    voicing.voicing_hash, and the root and the hash of the root-relative
+    normal form, see voicing.get_normal_form, shared by transpositions.
+    """
+    notes = [
+        get_pitch(x).midinum
+        for instruments in data.get("sections", {}).values()
+        for instrument in instruments
+        for x in instrument["notes"]
+        if x
+    ]
+    summary = {k: data.get(k) for k in SUMMARY_FIELDS}
+    summary["notes"] = len(notes)
+    summary["mask"] = sum(1 << x for x in {x % 12 for x in notes})
+    voicing = get_voicing(data)
+    summary["voicing"] = pack_hash(voicing)
+    summary["root"], form = get_normal_form(data, voicing)
+    summary["normal"] = pack_hash(form)
+    return summary
+
+
+def open_database(path: str):
+    """Returns the database at a path.
+
+    Paths with an SQLite extension, see sqlitedb.EXTENSIONS, open an
+    SQLiteDatabase, and any other path the Database of a directory.
+    """
+    from orchestral_tutti_chord_database.sqlitedb import SQLiteDatabase
+    from orchestral_tutti_chord_database.sqlitedb import is_sqlite
+
+    return SQLiteDatabase(path) if is_sqlite(path) else Database(path)
+
+
+class Database(object):
+    """A directory of chords saved as one <name>.json file each.
+
+    Every file holds the dict of ChordInfo.to_dict, so a chord can be
+    read, diffed and rewritten on its own. The hidden INDEX file holds
+    the summary of every chord, see get_summary, and the modification
+    time of every source text file the chords were parsed from, and is
+    kept in sync as chords are saved and removed.
+
+    Attributes:
+        directory: The directory of the JSON files.
+    """
+
+    __slots__ = ["directory"]
+
+    def __init__(self, directory: str):
+        self.directory: str = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self.names())
+
+    def __contains__(self, name: str):
+        return os.path.exists(self.get_path(name))
+
+    def __iter__(self):
+        """Yields the name and the dict of every chord, in name order."""
+        return self.iter_dicts()
+
+    def iter_dicts(self, names: list = None):
+        """Yields the name and the dict of chords, one file at a time.
+
+        Args:
+            names: The names of the chords to load, defaults to all.
+        """
+        for name in self.names() if names is None else names:
+            yield name, self.load_dict(name)
+
+    def get_path(self, name: str) -> str:
+        """Returns the path of the file of a chord."""
+        return os.path.join(self.directory, name + EXTENSION)
+
+    def names(self) -> list:
+        """Returns the sorted names of all chords."""
+        return sorted(
+            x.name[: -len(EXTENSION)]
+            for x in os.scandir(self.directory)
+            if x.name.endswith(EXTENSION) and not x.name.startswith(".")
+        )
+
+    def load_dict(self, name: str) -> dict:
+        """Returns the dict of a chord as saved."""
+        with open(self.get_path(name), encoding="utf-8") as fd:
+            return json.load(fd)
+
+    def load(self, name: str) -> ChordInfo:
+        """Returns a chord as a ChordInfo object."""
+        return ChordInfo.from_dict(self.load_dict(name))
+
+    def save_dict(self, name: str, data: dict):
+        """Save the dict of a chord, replacing the file atomically."""
+        self.save_many([(name, data)])
+
+    @staticmethod
+    def write(path: str, data: dict):
+        """Write JSON to a temporary file first, then rename it over path."""
+        with open(path + ".tmp", "w", encoding="utf-8") as fd:
+            json.dump(data, fd, ensure_ascii=False, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def save(self, name: str, chord: ChordInfo):
+        """Save a ChordInfo object."""
+        self.save_dict(name, chord.to_dict())
+
+    def save_many(self, items, index: bool = True):
+        """Save many (name, dict) chords.
+
+        Args:
+            items: The (name, dict) chords.
+            index: Whether to update the index, if saved, with their
+                summaries. False when the caller updates the index once
+                for many batches, see update_index.
+        """
+        summaries = {}
+        for name, data in items:
+            self.write(self.get_path(name), data)
+            if index:
+                summaries[name] = get_summary(data)
+        if summaries and os.path.exists(self.get_index_path()):
+            self.update_index(summaries)
+
+    def remove(self, name: str):
+        """Delete a chord if it exists."""
+        self.remove_many([name])
+
+    def remove_many(self, names, index: bool = True):
+        """Delete the chords that exist of many names, see save_many."""
+        removed = [x for x in names if x in self]
+        for name in removed:
+            os.remove(self.get_path(name))
+        if index and removed and os.path.exists(self.get_index_path()):
+            saved = self.load_index()
+            for name in removed:
+                saved["chords"].pop(name, None)
+            self.save_index(saved)
+
+    def get_index_path(self) -> str:
+        """Returns the path of the index."""
+        return os.path.join(self.directory, INDEX)
+
+    def load_index(self) -> dict:
+        """Returns the index, rebuilt from the chord files if missing.
+
+        Returns:
+            A dict of the summary of every chord under 'chords', and of
+            the modification time in nanoseconds of every source file
+            under 'sources'.
+        """
+        path = self.get_index_path()
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as fd:
+                return json.load(fd)
+        return {"chords": {k: get_summary(v) for k, v in self}, "sources": {}}
+
+    def load_metadata(self) -> dict:
+        """Returns the summary of every chord by name, read from the index.
+
+        No chord file is read unless the index is missing, see
+        load_index.
+        """
+        return self.load_index()["chords"]
+
+    def save_index(self, index: dict):
+        """Save the index atomically."""
+        self.write(self.get_index_path(), index)
+
+    def update_index(self, summaries: dict):
+        """Add or replace the summaries of chords in the index."""
+        index = self.load_index()
+        index["chords"].update(summaries)
+        self.save_index(index)
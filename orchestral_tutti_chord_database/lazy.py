@@ -0,0 +1,21 @@
+import importlib.util
+import sys
+
+
+def lazy_import(name: str):
+    """Returns a module which is only executed on its first attribute access.
+
+    Modules already imported are returned as is, so a lazy module costs
+    nothing when the package is used by code that needs it anyway.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ImportError(f"No module named {name!r}.")
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
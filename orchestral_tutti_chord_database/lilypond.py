@@ -0,0 +1,195 @@
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from orchestral_tutti_chord_database.pitch import get_pitch
+
+
+LILYPOND_VERSION = "2.20.0"
+FORMATS = {"pdf": ["--pdf"], "svg": ["-dbackend=svg"], "png": ["--png"]}
+BATCH_SIZE = 200
+MIDDLE_C = 48
+
+
+def get_note_name(note: str) -> str:
+    """Returns the absolute LilyPond name of a pitch string, e.g. F#5->fis''."""
+    pitch = get_pitch(note)
+    accidental = "is" * pitch.accidental_index if pitch.accidental_index > 0 else ""
+    accidental += "es" * -pitch.accidental_index
+    octave = pitch.octave - 3
+    return pitch.pitch_class.lower() + accidental + ("'" * octave or "," * -octave)
+
+
+def get_staves(chord) -> tuple:
+    """Split the sounding notes of a chord onto a grand staff.
+
+    Args:
+        chord: A ChordInfo object, or its list of instruments.
+
+    Returns:
+        The sorted distinct notes from middle C upwards for the treble
+        staff, and the notes below it for the bass staff.
+    """
+    notes = {
+        note
+        for instrument in getattr(chord, "instruments", chord)
+        for note in instrument[2]
+        if note
+    }
+    notes = sorted(notes, key=lambda x: (get_pitch(x).midinum, x))
+    treble = [x for x in notes if get_pitch(x).midinum >= MIDDLE_C]
+    bass = [x for x in notes if get_pitch(x).midinum < MIDDLE_C]
+    return treble, bass
+
+
+def make_chord(notes: list, duration: str = "1") -> str:
+    """Returns a LilyPond chord of pitch strings, or a spacer if empty."""
+    if not notes:
+        return "s" + duration
+    return "<" + " ".join(get_note_name(x) for x in notes) + ">" + duration
+
+
+def quote(v) -> str:
+    """Returns a value as a LilyPond string, escaping backslashes and quotes."""
+    return '"' + str(v).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def make_header(chord) -> str:
+    """Returns a LilyPond header block from the information of a chord."""
+    fields = []
+    if getattr(chord, "name", None):
+        fields.append(("title", chord.name))
+    if getattr(chord, "movement", None):
+        fields.append(("subtitle", chord.movement))
+    if getattr(chord, "composer", None):
+        fields.append(("composer", " ".join(chord.composer.split(",_")[::-1])))
+    if getattr(chord, "opus", None):
+        fields.append(("opus", chord.opus))
+    if getattr(chord, "measure", None) is not None:
+        fields.append(("piece", f"m. {chord.measure}"))
+    lines = [f"    {k} = {quote(v)}" for k, v in fields] + ["    tagline = ##f"]
+    return "  \\header {\n" + "\n".join(lines) + "\n  }\n"
+
+
+def make_book(chord, name: str) -> str:
+    """Returns a LilyPond book of the grand staff reduction of a chord.
+
+    Args:
+        chord: A ChordInfo object, or its list of instruments.
+        name: The output file name of the book, without extension.
+    """
+    treble, bass = get_staves(chord)
+    symbol = getattr(chord, "chord", None)
+    mark = f"^\\markup {{ {quote(symbol)} }}" if symbol else ""
+    return (
+        "\\book {\n"
+        f"  \\bookOutputName {quote(name)}\n"
+        + make_header(chord)
+        + "  \\score {\n"
+        "    \\new PianoStaff <<\n"
+        f"      \\new Staff {{ \\clef treble {make_chord(treble)}{mark} }}\n"
+        f"      \\new Staff {{ \\clef bass {make_chord(bass)} }}\n"
+        "    >>\n"
+        "    \\layout { }\n"
+        "  }\n"
+        "}\n"
+    )
+
+
+def make_file(chords: list, names: list) -> str:
+    """Returns the content of a .ly file with one book per chord."""
+    return f'\\version "{LILYPOND_VERSION}"\n\n' + "\n".join(
+        make_book(chord, name) for chord, name in zip(chords, names)
+    )
+
+
+@lru_cache(maxsize=None)
+def get_lilypond_version(lilypond: str = "lilypond") -> str:
+    """Returns the first line of the version of the lilypond binary."""
+    result = subprocess.run(
+        [lilypond, "--version"], check=True, capture_output=True, text=True
+    )
+    return result.stdout.splitlines()[0].strip()
+
+
+def run_lilypond(path: str, output_dir: str, formats=("pdf",), lilypond="lilypond"):
+    """Engrave a .ly file with one process of the lilypond binary."""
+    command = [lilypond, "--silent", "-o", output_dir]
+    for output_format in formats:
+        command += FORMATS[output_format]
+    subprocess.run(command + [path], check=True, capture_output=True)
+
+
+def render(
+    chords: list,
+    output_dir: str,
+    names: list = None,
+    formats=("pdf",),
+    batch_size: int = BATCH_SIZE,
+    jobs: int = None,
+    lilypond: str = "lilypond",
+    cache=None,
+) -> list:
+    """Engrave the grand staff reduction of many chords.
+
+    Chords are written in batches of batch_size books into one .ly
+    file each, so lilypond starts once per batch rather than once per
+    chord, and batches are engraved in parallel by up to jobs
+    processes, defaulting to the number of cores.
+
+    Args:
+        chords: A list of ChordInfo objects, or of instrument lists.
+        output_dir: The directory of the .ly and the engraved files.
+        names: The output file name of each chord, defaults to
+            chord-0, chord-1 and so on.
+        formats: The output formats, any of FORMATS.
+        batch_size: The number of chords engraved by one process.
+        jobs: The number of lilypond processes run at once.
+        lilypond: The path of the lilypond binary.
+        cache: A RenderCache, from which chords whose content, formats
+            and lilypond version are unchanged are copied instead of
+            engraved again.
+
+    Returns:
+        The paths of the .ly file of each engraved batch.
+    """
+    for output_format in formats:
+        if output_format not in FORMATS:
+            raise ValueError(f"Unknown output format {output_format}.")
+    if names is None:
+        names = [f"chord-{i}" for i in range(len(chords))]
+    os.makedirs(output_dir, exist_ok=True)
+    if cache is not None:
+        version = get_lilypond_version(lilypond)
+        options = {"formats": sorted(formats)}
+        keys = [
+            cache.get_key(make_book(chord, ""), options, version) for chord in chords
+        ]
+        pending = [
+            i
+            for i, (key, name) in enumerate(zip(keys, names))
+            if not cache.fetch(key, formats, output_dir, name)
+        ]
+    else:
+        pending = range(len(chords))
+    chords = [chords[i] for i in pending]
+    names = [names[i] for i in pending]
+    paths = []
+    for i in range(0, len(chords), batch_size):
+        path = os.path.join(output_dir, f"batch-{i // batch_size}.ly")
+        with open(path, "w", encoding="utf-8") as fd:
+            fd.write(make_file(chords[i : i + batch_size], names[i : i + batch_size]))
+        paths.append(path)
+    with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+        list(
+            executor.map(
+                lambda x: run_lilypond(x, output_dir, formats, lilypond), paths
+            )
+        )
+    if cache is not None:
+        for i, chord, name in zip(pending, chords, names):
+            cache.store(keys[i], formats, output_dir, name)
+            cache.store_text(keys[i], "ly", make_file([chord], [""]))
+        cache.evict()
+    return paths
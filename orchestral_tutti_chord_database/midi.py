@@ -0,0 +1,373 @@
+"""Import tutti chords from Standard MIDI Files.
+
+Files are read one chunk at a time and the events of every track are
+decoded one at a time from its bytes, keeping only the notes sounding
+at the moment, so that neither a file nor a track becomes a tree of
+Python objects. The chord of a bar is the notes sounding on its first
+beat, and without a bar, the final chord of every track.
+
+Instruments are named after their track if get_section recognizes the
+track name, otherwise after the General MIDI program of their channel.
+Notes are spelled in the key of the key signature, see spelling, and
+velocities become dynamics.
+"""
+import re
+import struct
+
+from orchestral_tutti_chord_database.balance import SECTIONS
+from orchestral_tutti_chord_database.balance import get_section
+from orchestral_tutti_chord_database.parser import ChordInfo
+from orchestral_tutti_chord_database.spelling import format_key
+from orchestral_tutti_chord_database.spelling import spell_notes
+
+
+CHUNK_HEADER = struct.Struct(">4sI")
+FILE_HEADER = struct.Struct(">HHh")
+PERCUSSION_CHANNEL = 9
+# General MIDI programs, counted from 0, of orchestral instruments.
+PROGRAMS = {
+    6: "harpsichord",
+    8: "celesta",
+    9: "glockenspiel",
+    12: "marimba",
+    13: "xylophone",
+    14: "tubular bells",
+    19: "organ",
+    40: "violin",
+    41: "viola",
+    42: "cello",
+    43: "contrabass",
+    44: "strings",
+    45: "strings pizz.",
+    46: "harp",
+    47: "timpani",
+    48: "strings",
+    49: "strings",
+    52: "choir",
+    53: "choir",
+    56: "trumpet",
+    57: "trombone",
+    58: "tuba",
+    59: "trumpet",
+    60: "horn",
+    61: "brass",
+    64: "soprano sax",
+    65: "alto sax",
+    66: "tenor sax",
+    67: "baritone sax",
+    68: "oboe",
+    69: "english horn",
+    70: "bassoon",
+    71: "clarinet",
+    72: "piccolo",
+    73: "flute",
+    74: "recorder",
+}
+# The lowest velocity of every dynamic.
+DYNAMICS = (
+    (0, "ppp"),
+    (16, "pp"),
+    (33, "p"),
+    (49, "mp"),
+    (64, "mf"),
+    (80, "f"),
+    (96, "ff"),
+    (112, "fff"),
+)
+
+
+def read_variable(data: bytes, i: int) -> tuple:
+    """Returns a variable-length quantity at i and the index after it."""
+    value = 0
+    while i < len(data):
+        byte = data[i]
+        i += 1
+        value = value << 7 | byte & 0x7F
+        if byte < 0x80:
+            return value, i
+    raise ValueError("Truncated track: unterminated variable-length quantity.")
+
+
+def check_length(data: bytes, i: int, size: int, tick: int):
+    """Raise ValueError if fewer than size bytes of a track are left at i."""
+    if i + size > len(data):
+        raise ValueError(f"Truncated track at tick {tick}.")
+
+
+def iter_chunks(fd):
+    """Yields the type and the bytes of every chunk of a binary file."""
+    while True:
+        header = fd.read(CHUNK_HEADER.size)
+        if not header:
+            return
+        if len(header) < CHUNK_HEADER.size:
+            raise ValueError("Truncated chunk header.")
+        kind, length = CHUNK_HEADER.unpack(header)
+        data = fd.read(length)
+        if len(data) < length:
+            raise ValueError(f"Truncated {kind.decode('latin-1')} chunk.")
+        yield kind, data
+
+
+def iter_events(data: bytes):
+    """Yields the events of the bytes of a track chunk.
+
+    Running status is resolved, and system exclusive events skipped.
+
+    Yields:
+        The absolute tick, the status byte, and the two data bytes of a
+        channel event, the second None for program changes and channel
+        pressure, or 0xFF, the type and the bytes of a meta event.
+    """
+    i = tick = 0
+    status = None
+    while i < len(data):
+        delta, i = read_variable(data, i)
+        tick += delta
+        check_length(data, i, 1, tick)
+        if data[i] & 0x80:
+            status = data[i]
+            i += 1
+        elif status is None:
+            raise ValueError(f"Expected a status byte at tick {tick}.")
+        if status == 0xFF:
+            check_length(data, i, 1, tick)
+            kind = data[i]
+            length, i = read_variable(data, i + 1)
+            check_length(data, i, length, tick)
+            yield tick, status, kind, data[i : i + length]
+            i += length
+            status = None
+        elif status in (0xF0, 0xF7):
+            length, i = read_variable(data, i)
+            check_length(data, i, length, tick)
+            i += length
+            status = None
+        elif 0xC0 <= status < 0xE0:
+            check_length(data, i, 1, tick)
+            yield tick, status, data[i], None
+            i += 1
+        else:
+            check_length(data, i, 2, tick)
+            yield tick, status, data[i], data[i + 1]
+            i += 2
+
+
+class TimeMap(object):
+    """The time and key signatures of a file, in the order they are read.
+
+    Attributes:
+        division: The ticks per quarter note.
+        meters: The tick, the bar starting there, counted from 0, and
+            the ticks per bar of every time signature.
+        keys: The tick and the key, e.g. 'Bb major', of every key
+            signature.
+    """
+
+    __slots__ = ["division", "meters", "keys"]
+
+    def __init__(self, division: int):
+        self.division: int = division
+        self.meters: list = [(0, 0, 4 * division)]
+        self.keys: list = [(0, None)]
+
+    def add_meter(self, tick: int, numerator: int, denominator: int):
+        """Add a time signature, its denominator as a power of two.
+
+        A time signature within a bar ends the bar early. Signatures are
+        merged by tick, so one restated by a later track, as many files
+        do at tick 0, keeps the changes read after it.
+        """
+        length = numerator * 4 * self.division >> denominator
+        lengths = {x[0]: x[2] for x in self.meters}
+        lengths[tick] = length
+        self.meters = []
+        for tick, length in sorted(lengths.items()):
+            if not self.meters:
+                self.meters.append((tick, 0, length))
+                continue
+            start, bar, last = self.meters[-1]
+            bar += -(-(tick - start) // last)
+            if length != last or (tick - start) % last:
+                self.meters.append((tick, bar, length))
+
+    def add_key(self, tick: int, fifths: int, minor: bool):
+        """Add a key signature, in sharps, negative for flats.
+
+        Key signatures are merged by tick, see add_meter.
+        """
+        if not -7 <= fifths <= 7:
+            raise ValueError(f"Expected a key signature of -7 to 7, got {fifths}.")
+        keys = dict(self.keys)
+        keys[tick] = format_key(fifths, minor)
+        self.keys = sorted(keys.items())
+
+    def get_tick(self, bar: int) -> int:
+        """Returns the first tick of a bar, counted from 1."""
+        if bar < 1:
+            raise ValueError(f"Expected a bar counted from 1, got {bar}.")
+        tick, first, length = [x for x in self.meters if x[1] < bar][-1]
+        return tick + (bar - 1 - first) * length
+
+    def get_key(self, tick: int) -> str:
+        """Returns the key at a tick, or None if unknown."""
+        return [x for x in self.keys if x[0] <= tick][-1][1]
+
+
+def decode(text: bytes) -> str:
+    """Returns the text of a meta event, UTF-8 or else Latin-1."""
+    try:
+        return text.decode("utf-8").strip()
+    except UnicodeDecodeError:
+        return text.decode("latin-1").strip()
+
+
+def get_dynamic(velocity: int) -> str:
+    """Returns the dynamic of a note on velocity."""
+    return [x for lowest, x in DYNAMICS if velocity >= lowest][-1]
+
+
+def get_instrument(track_name: str, program: int) -> str:
+    """Returns the instrument of a track name and program.
+
+    The track name is used if it names an instrument of a section and
+    is not a key of the information of ChordInfo, e.g. 'Key'.
+    """
+    name = " ".join(re.split(r"[\s:|]+", track_name or "")).strip()
+    if name.lower() in ChordInfo.long + ChordInfo.short:
+        name = ""
+    if name and SECTIONS[get_section(name)] != "other":
+        return name
+    return PROGRAMS.get(program, name or f"program {program + 1}")
+
+
+def read_track(data: bytes, time_map: TimeMap, bars: list) -> tuple:
+    """Returns the notes sounding at the first tick of bars of a track.
+
+    Time and key signatures are added to time_map as they are read.
+    Notes sounding at a tick are those started at or before it and
+    not stopped by then.
+
+    Args:
+        data: The bytes of the track chunk.
+        time_map: The time and key signatures read so far.
+        bars: The increasing bars counted from 1, or None for the final
+            chord, i.e. the notes sounding at the last note on.
+
+    Returns:
+        The name of the track, or None, and the tick and the list of
+        (channel, program, midi number, velocity) notes of every bar.
+    """
+    name = None
+    sounding = {}
+    programs = [0] * 16
+    chords = []
+    pending = list(bars or [])
+    target = time_map.get_tick(pending[0]) if pending else None
+
+    def get_notes():
+        return [(k[0], v[0], k[1], v[1]) for k, v in sounding.items()]
+
+    for tick, status, a, b in iter_events(data):
+        while target is not None and tick > target:
+            chords.append((target, get_notes()))
+            if bars is None:
+                target = None
+            else:
+                pending.pop(0)
+                target = time_map.get_tick(pending[0]) if pending else None
+        channel = status & 0x0F
+        if status == 0xFF:
+            if a == 0x58 and len(b) >= 2:
+                time_map.add_meter(tick, b[0], b[1])
+                target = time_map.get_tick(pending[0]) if pending else target
+            elif a == 0x59 and len(b) >= 2:
+                time_map.add_key(tick, struct.unpack("b", b[:1])[0], bool(b[1]))
+            elif a == 0x03 and name is None:
+                name = decode(b) or None
+        elif channel == PERCUSSION_CHANNEL:
+            continue
+        elif status & 0xF0 == 0x90 and b:
+            sounding[channel, a] = (programs[channel], b)
+            if bars is None:
+                chords = []
+                target = tick
+        elif status & 0xF0 in (0x80, 0x90):
+            sounding.pop((channel, a), None)
+        elif status & 0xF0 == 0xC0:
+            programs[channel] = a
+    # Notes never stopped sound until the end.
+    if bars is None and target is not None:
+        chords.append((target, get_notes()))
+    for bar in pending:
+        chords.append((time_map.get_tick(bar), get_notes()))
+    return name, chords
+
+
+def read_midi(fd, bars: list = None, info: dict = None) -> list:
+    """Returns the chords of bars of a Standard MIDI File.
+
+    Time and key signatures are taken from the tracks read before or,
+    up to the bar, within a track, as in format 0 files and format 1
+    files with a leading conductor track.
+
+    Args:
+        fd: The file opened in binary mode.
+        bars: The bars of the chords, counted from 1 with a pickup as
+            bar 1, or None for the final chord of every track.
+        info: Values of ChordInfo.long fields of every chord, e.g. the
+            composer, as written in an entry.
+
+    Returns:
+        A ChordInfo per bar in increasing order, or of the final chord,
+        with the name of the first track, the measure and the key.
+    """
+    chunks = iter_chunks(fd)
+    kind, header = next(chunks, (None, b""))
+    if kind != b"MThd" or len(header) < FILE_HEADER.size:
+        raise ValueError("Not a Standard MIDI File.")
+    _, _, division = FILE_HEADER.unpack(header[: FILE_HEADER.size])
+    if division <= 0:
+        raise ValueError("SMPTE time division is not supported.")
+    time_map = TimeMap(division)
+    bars = None if bars is None else sorted(set(bars))
+    if bars and bars[0] < 1:
+        raise ValueError(f"Expected bars counted from 1, got {bars[0]}.")
+    targets = [None] if bars is None else bars
+    found = [[] for _ in targets]
+    ticks = [0] * len(targets)
+    names = []
+    for kind, data in chunks:
+        if kind != b"MTrk":
+            continue
+        name, chords = read_track(data, time_map, bars)
+        names.append(name)
+        for i, (tick, notes) in enumerate(chords):
+            found[i] += [(len(names) - 1,) + x for x in notes]
+            ticks[i] = max(ticks[i], tick)
+
+    chords = []
+    for bar, notes, tick in zip(targets, found, ticks):
+        chord = ChordInfo()
+        for k, v in (info or {}).items():
+            setattr(chord, *ChordInfo.parse_info(k, str(v)))
+        if names and names[0] and not hasattr(chord, "name"):
+            chord.name = names[0]
+        if bar is not None:
+            chord.measure = bar
+        key = time_map.get_key(tick)
+        if key:
+            chord.key = key
+        notes.sort()
+        spelled = spell_notes([0] * len(notes), [x[3] for x in notes], key, 1)
+        parts = {}
+        for (track, channel, program, _, velocity), note in zip(notes, spelled):
+            instrument = get_instrument(names[track], program)
+            part = parts.setdefault((track, channel, program), [instrument, [], 0])
+            part[1].append(note)
+            part[2] = max(part[2], velocity)
+        for instrument, written, velocity in parts.values():
+            dynamic = get_dynamic(velocity)
+            chord.instruments.append((instrument, "treble", written, dynamic, None))
+        chords.append(chord)
+    return chords
@@ -0,0 +1,281 @@
+"""Import tutti chords from MusicXML scores.
+
+Scores are streamed with xml.etree.ElementTree.iterparse and every
+measure is cleared once read, so only one measure of one part is held
+in memory whatever the size of the score. The chord of a measure is
+the notes sounding on its downbeat in every part, and without a
+measure, the final chord of every part.
+
+Parts are named after their part name or else their MIDI program, see
+midi.get_instrument, and keep their clef. Written notes of transposing
+instruments are transposed to sounding, as detection blocks are by
+ChordInfo.parse_instrument. Compressed .mxl scores are read from their
+zip archive, see read_mxl.
+"""
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+from orchestral_tutti_chord_database.midi import get_instrument
+from orchestral_tutti_chord_database.parser import ChordInfo
+from orchestral_tutti_chord_database.pitch import PITCHCLASSES
+from orchestral_tutti_chord_database.pitch import PITCHID
+from orchestral_tutti_chord_database.pitch import get_accidental
+from orchestral_tutti_chord_database.spelling import format_key
+
+
+CLEFS = {"G": "treble", "F": "bass", "C": "alto"}
+DYNAMICS = ("ppp", "pp", "p", "mp", "mf", "f", "ff", "fff", "sfz", "sf", "fp")
+# Techniques by their element, the first marked on any note is kept.
+TECHNIQUES = {"fermata": "fermata", "tremolo": "trem."}
+
+
+def get_number(element, path: str, default: float = 0) -> float:
+    """Returns the number of the text of a subelement, or a default."""
+    text = element.findtext(path)
+    return float(text) if text and text.strip() else default
+
+
+def get_sounding(step: str, alter: int, octave: int, transpose: tuple) -> tuple:
+    """Returns the sounding midi number and note of a written pitch.
+
+    Args:
+        step: The written letter, C to B.
+        alter: The written accidental in semitones, e.g. -1 for flat.
+        octave: The written octave.
+        transpose: The diatonic steps and chromatic semitones from
+            written to sounding, e.g. (-1, -2) for a clarinet in Bb.
+    """
+    steps, semitones = transpose
+    letter = PITCHCLASSES.index(step)
+    midinum = octave * 12 + PITCHID[letter] + alter + semitones
+    octave, letter = divmod(octave * 7 + letter + steps, 7)
+    alter = midinum - octave * 12 - PITCHID[letter]
+    return midinum, PITCHCLASSES[letter] + get_accidental(alter) + str(octave)
+
+
+class Part(object):
+    """A part of a score, read measure by measure.
+
+    Attributes:
+        instrument: The instrument name, see midi.get_instrument.
+        transpose: The diatonic steps and chromatic semitones from
+            written to sounding.
+        key: The written key, e.g. 'Bb major', or None if unknown.
+        clefs: The clef, e.g. 'bass', of every staff by number.
+        dynamic: The last dynamic marked, or None.
+        last: The final chord read so far, see read_measure.
+    """
+
+    __slots__ = ["instrument", "transpose", "key", "clefs", "dynamic", "last"]
+
+    def __init__(self, instrument: str):
+        self.instrument: str = instrument
+        self.transpose: tuple = (0, 0)
+        self.key: str = None
+        self.clefs: dict = {"1": "treble"}
+        self.dynamic: str = None
+        self.last: tuple = None
+
+    def read_attributes(self, attributes):
+        """Update the key, transposition and clefs of the part."""
+        key = attributes.find("key")
+        if key is not None and key.findtext("fifths"):
+            minor = key.findtext("mode", "").strip() == "minor"
+            self.key = format_key(int(get_number(key, "fifths")), minor)
+        transpose = attributes.find("transpose")
+        if transpose is not None:
+            octaves = int(get_number(transpose, "octave-change"))
+            self.transpose = (
+                int(get_number(transpose, "diatonic")) + 7 * octaves,
+                int(get_number(transpose, "chromatic")) + 12 * octaves,
+            )
+        for clef in attributes.iter("clef"):
+            sign = clef.findtext("sign", "G").strip()
+            self.clefs[clef.get("number", "1")] = CLEFS.get(sign, sign.lower())
+
+    def read_measure(self, measure) -> tuple:
+        """Returns the chord on the downbeat of a measure element.
+
+        The final chord of the part is updated if any note starts in
+        the measure.
+
+        Returns:
+            The instrument tuple, see ChordInfo.parse_instrument, of the
+            notes sounding on the downbeat, or None if there are none.
+        """
+        position = onset = 0.0
+        dynamic = self.dynamic
+        # The (onset, end, midi number, note, staff, techniques) of notes.
+        notes = []
+        # The position and dynamic of the dynamics marked.
+        dynamics = []
+        for element in measure:
+            if element.tag == "attributes":
+                self.read_attributes(element)
+            elif element.tag == "direction":
+                for mark in element.iterfind(".//dynamics/*"):
+                    if mark.tag in DYNAMICS:
+                        dynamics.append((position, mark.tag))
+            elif element.tag == "backup":
+                position -= get_number(element, "duration")
+            elif element.tag == "forward":
+                position += get_number(element, "duration")
+            elif element.tag == "note":
+                if element.find("grace") is not None:
+                    continue
+                if element.find("chord") is None:
+                    onset = position
+                    position += get_number(element, "duration")
+                pitch = element.find("pitch")
+                if pitch is None or element.find("cue") is not None:
+                    continue
+                techniques = tuple(
+                    TECHNIQUES[x.tag] for x in element.iter() if x.tag in TECHNIQUES
+                )
+                notes.append(
+                    (onset, position)
+                    + get_sounding(
+                        pitch.findtext("step", "C").strip(),
+                        int(get_number(pitch, "alter")),
+                        int(get_number(pitch, "octave")),
+                        self.transpose,
+                    )
+                    + (element.findtext("staff", "1").strip(), techniques)
+                )
+
+        def get_chord(time):
+            sounding = sorted({x[2:] for x in notes if x[0] <= time < x[1]})
+            if not sounding:
+                return None
+            marked = [x for start, x in dynamics if start <= time]
+            techniques = [y for x in sounding for y in x[3]]
+            return (
+                self.instrument,
+                self.clefs.get(sounding[0][2], "treble"),
+                list(dict.fromkeys(x[1] for x in sounding)),
+                marked[-1] if marked else dynamic,
+                techniques[0] if techniques else None,
+            )
+
+        if notes:
+            self.last = get_chord(max(x[0] for x in notes)) or self.last
+        if dynamics:
+            self.dynamic = dynamics[-1][1]
+        return get_chord(0.0)
+
+
+def read_info(element, info: dict):
+    """Add the piece information of a child of the score to info."""
+    if element.tag == "work" and element.findtext("work-title"):
+        info["name"] = element.findtext("work-title").strip()
+    elif element.tag == "movement-title" and element.text:
+        info.setdefault("name", element.text.strip())
+        if info["name"] != element.text.strip():
+            info["movement"] = element.text.strip()
+    elif element.tag == "identification":
+        for creator in element.iter("creator"):
+            if creator.get("type") == "composer" and creator.text:
+                info["composer"] = creator.text.strip()
+
+
+def read_musicxml(fd, measures: list = None, info: dict = None) -> list:
+    """Returns the chords of measures of a partwise MusicXML score.
+
+    Args:
+        fd: The score file, opened in binary mode.
+        measures: The numbers of the measures, as in the score, or None
+            for the final chord of every part.
+        info: Values of ChordInfo.long fields of every chord, e.g. the
+            composer, as written in an entry, over those of the score.
+
+    Returns:
+        A ChordInfo per measure, in the order given, or of the final
+        chord, with the piece information, the measure and the concert
+        key, i.e. of the first part without transposition, set.
+    """
+    numbers = None if measures is None else list(dict.fromkeys(map(str, measures)))
+    parts = {}
+    found = {x: {} for x in numbers or [None]}
+    keys = {}
+    score = {}
+    root = part = container = None
+    depth = 0
+    for event, element in iterparse(fd, ("start", "end")):
+        if event == "start":
+            depth += 1
+            if depth == 1 and element.tag != "score-partwise":
+                raise ValueError(f"Expected a score-partwise score, got {element.tag}.")
+            if depth == 1:
+                root = element
+            elif depth == 2 and element.tag == "part":
+                name = element.get("id")
+                part = parts.setdefault(name, Part(get_instrument(name, -1)))
+                container = element
+            continue
+        depth -= 1
+        if depth == 2 and element.tag == "measure" and part is not None:
+            number = element.get("number", "").strip()
+            chord = part.read_measure(element)
+            if number in found:
+                if chord is not None:
+                    found[number][id(part)] = chord
+                if part.transpose == (0, 0):
+                    keys.setdefault(number, part.key)
+            # Only the measure being read is held.
+            container.clear()
+        elif depth == 1:
+            if element.tag == "part-list":
+                for score_part in element.iter("score-part"):
+                    program = get_number(score_part, ".//midi-program")
+                    name = score_part.findtext("part-name")
+                    instrument = get_instrument(name, int(program) - 1)
+                    parts[score_part.get("id")] = Part(instrument)
+            elif element.tag == "part":
+                part = None
+            else:
+                read_info(element, score)
+            root.clear()
+    if numbers is None:
+        found[None] = {id(x): x.last for x in parts.values() if x.last}
+        concert = [x.key for x in parts.values() if x.transpose == (0, 0)]
+        keys[None] = concert[0] if concert else None
+
+    chords = []
+    for number, chord_parts in found.items():
+        chord = ChordInfo()
+        for k, v in list(score.items()) + list((info or {}).items()):
+            setattr(chord, *ChordInfo.parse_info(k, str(v)))
+        if number is not None:
+            chord.measure = ChordInfo.parse_info("measure", number)[1]
+        if keys.get(number):
+            chord.key = keys[number]
+        order = [id(x) for x in parts.values()]
+        chord.instruments = [chord_parts[x] for x in order if x in chord_parts]
+        chords.append(chord)
+    return chords
+
+
+def read_mxl(path: str, measures: list = None, info: dict = None) -> list:
+    """Returns the chords of measures of a compressed MusicXML score.
+
+    The score is the root file of META-INF/container.xml, or else the
+    first .xml file of the archive, and is decompressed as it is read.
+    See read_musicxml.
+    """
+    with zipfile.ZipFile(path) as archive:
+        names = archive.namelist()
+        score = None
+        if "META-INF/container.xml" in names:
+            with archive.open("META-INF/container.xml") as fd:
+                for _, element in iterparse(fd):
+                    if element.tag.endswith("rootfile"):
+                        score = element.get("full-path")
+                        break
+        if score is None:
+            score = next(
+                (x for x in names if x.endswith(".xml") and "META-INF" not in x), None
+            )
+        if score is None:
+            raise ValueError("No MusicXML score in the archive.")
+        with archive.open(score) as fd:
+            return read_musicxml(fd, measures, info)
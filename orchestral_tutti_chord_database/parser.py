@@ -1,4 +1,10 @@
-from orchestral_tutti_chord_database.pitch import Pitch
+from orchestral_tutti_chord_database.balance import SECTIONS
+from orchestral_tutti_chord_database.balance import get_section
+from orchestral_tutti_chord_database.lazy import lazy_import
+
+
+pitch = lazy_import("orchestral_tutti_chord_database.pitch")
+
 
 class ChordInfo(object):
     long = [
@@ -19,19 +25,88 @@ class ChordInfo(object):
 
     clefs = {"treble": 4, "t": 4, "g": 4, "bass": 2, "f": 2, "c": 3, "alto": 3}
 
+    fields = ["instrument", "clef", "notes", "dynamic", "technique"]
+
     def __init__(self):
         self.instruments = []
 
     def parse_line(self, line: str):
+        if ":" not in line:
+            raise ValueError(f"Expected 'key: value', got {line!r}.")
         k, v = line.split(":", 1)
         v = v.strip()
         if not v:
             return
-        k = k.strip().lower()
-        if any(k not in x for x in (self.long, self.short)):
-            setattr(self, *self.parse_info(k, v))
+        k = k.strip()
+        if k.lower() in self.long or k.lower() in self.short:
+            setattr(self, *self.parse_info(k.lower(), v))
         else:
-            self.instruments.append(k, self.parse_instrument(k, v))
+            self.instruments.append(self.parse_instrument(k, v))
+
+    @classmethod
+    def parse_lines(cls, lines) -> "ChordInfo":
+        """Returns the chord of an entry, skipping blank and # comment lines."""
+        obj = cls()
+        for line in lines:
+            if line.strip() and not line.lstrip().startswith("#"):
+                obj.parse_line(line)
+        return obj
+
+    def to_dict(self) -> dict:
+        """Returns the information of the chord as a JSON compatible dict.
+
+        Instruments are grouped by the section they belong to, see
+        SECTIONS, in the order of their first appearance.
+        """
+        result = {k: getattr(self, k) for k in self.long if hasattr(self, k)}
+        sections = {}
+        for instrument in self.instruments:
+            section = SECTIONS[get_section(instrument[0])]
+            sections.setdefault(section, []).append(
+                dict(zip(self.fields, instrument))
+            )
+        result["sections"] = sections
+        return result
+
+    def to_lines(self) -> list:
+        """Returns the lines of an entry of the chord, see parse_lines.
+
+        Notes are written as sounding, in a detection block of their
+        clef if it is not treble, see parse_instrument.
+        """
+        lines = []
+        for k in self.long:
+            if hasattr(self, k):
+                v = getattr(self, k)
+                if k == "composer":
+                    v = " ".join(str(v).split(",_")[::-1])
+                lines.append(f"{k.capitalize()}: {v}")
+        for instrument, clef, notes, dynamic, technique in self.instruments:
+            notes = [x for x in notes if x]
+            detection = ""
+            if notes and clef and clef != "treble":
+                detection = f"{{{clef}|}}"
+                base = self.get_clef_octave(*clef.split("v"))
+                notes = [self.get_relative_note(x, base) for x in notes]
+            written = notes[0] if len(notes) == 1 else f"<{' '.join(notes)}>"
+            written = detection + written
+            value = "|".join([written if notes else "", dynamic or "", technique or ""])
+            lines.append(f"{instrument}: {value.rstrip('|') or '|'}")
+        return lines
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ChordInfo":
+        """Returns the chord of a dict as returned by to_dict."""
+        obj = cls()
+        for k in cls.long:
+            if k in data:
+                setattr(obj, k, data[k])
+        for instruments in data.get("sections", {}).values():
+            for instrument in instruments:
+                values = [instrument.get(x) for x in cls.fields]
+                values[2] = list(values[2] or [""])
+                obj.instruments.append(tuple(values))
+        return obj
 
     @classmethod
     def parse_info(cls, k: str, v: str) -> tuple:
@@ -43,16 +118,33 @@ class ChordInfo(object):
             v = v.replace(" ", "").replace("Opus", "Op. ")
         return (k, int(v) if v.lstrip("-").isdigit() else v)
 
+    @classmethod
+    def get_clef_octave(cls, clef: str, adj: str = "") -> int:
+        """Returns the octave of unmarked notes of a detection block clef.
+
+        Example:
+            >>> ChordInfo.get_clef_octave("f", "b8")
+            1
+        """
+        octave = cls.clefs.get(clef, 0)
+        if adj != "":
+            octave += int(adj.replace("a", "").replace("b", "-")) // 8
+        return octave
+
+    @staticmethod
+    def get_relative_note(note: str, octave: int) -> str:
+        """Returns a note, e.g. D3, marked relative to an octave, e.g. D' of 2."""
+        name = note.rstrip("0123456789").rstrip("-")
+        marks = int(note[len(name) :]) - octave
+        return name + ("'" * marks or "," * -marks)
+
     @classmethod
     def parse_instrument(cls, instrument: str, v: str) -> tuple:
         def get_note(note, transpose, clef, adj=''):
             octave: int = note.count("'") - note.count(",")
-            if clef in cls.clefs:
-                octave += cls.clefs[clef]
-            if adj != '':
-                octave += int(adj.replace("a", "").replace("b", "-"))//8
+            octave += cls.get_clef_octave(clef, adj)
             pitch_name = note.replace("'", "").replace(",", "")
-            note = Pitch(pitch_name, octave)
+            note = pitch.Pitch(pitch_name, octave)
             if 'a' in transpose:
                 pass
             elif transpose != '':
@@ -76,3 +168,22 @@ class ChordInfo(object):
         dynamic = values[1] if (len(values) > 1 and values[1]) else None
         technique = values[2] if (len(values) > 2 and values[2]) else None
         return (instrument, clef, notes, dynamic, technique)
+
+
+def iter_entries(lines):
+    """Yields the line lists of the entries of a text, split by blank lines.
+
+    Lines starting with # are comments and skipped. Lines are consumed
+    one at a time, so a file or sys.stdin is parsed as it is read.
+    """
+    entry = []
+    for line in lines:
+        if line.lstrip().startswith("#"):
+            continue
+        if line.strip():
+            entry.append(line.rstrip("\n"))
+        elif entry:
+            yield entry
+            entry = []
+    if entry:
+        yield entry
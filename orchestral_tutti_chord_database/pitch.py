@@ -1,4 +1,5 @@
 import re
+from functools import lru_cache
 from typing import Union, Optional
 
 PITCHCLASSES = "CDEFGAB"
@@ -60,6 +61,8 @@ class Pitch(object):
         pre-defined pitch names from C major with chromatic alternations
         from secondary dominant chords - all sharps except for flat 7th
         degree of V7/IV.
+        To spell midi numbers in the context of a chord and key, see
+        spelling.spell.
 
         A string input is taken as pitch names if it matches the format
         of: (pitch class)(accidental)(octave). Only the pitch class is
@@ -180,6 +183,12 @@ class Pitch(object):
         return diff
 
 
+@lru_cache(maxsize=None)
+def get_pitch(note: str) -> Pitch:
+    """Returns the Pitch of a pitch string, shared between calls."""
+    return Pitch(note)
+
+
 class Interval:
     """An interval, the musical distance, between two musical pitches.
     
@@ -0,0 +1,195 @@
+import functools
+import importlib
+import os
+import time
+import tracemalloc
+from collections import Counter
+
+
+PACKAGE = "orchestral_tutti_chord_database"
+# The module, the class or None for a function, and the attribute of every
+# instrumented hot path.
+TARGETS = (
+    ("pitch", "Pitch", "__init__"),
+    ("pitch", "Pitch", "transpose"),
+    ("pitch", None, "detect_chord"),
+    ("parser", "ChordInfo", "parse_line"),
+    ("parser", "ChordInfo", "parse_instrument"),
+    ("color", None, "make_swatches"),
+)
+CACHES = (
+    ("balance", "get_section"),
+    ("pitch", "get_pitch"),
+    ("color", "_make_swatches"),
+    ("color", "get_hex_digits"),
+    ("lilypond", "get_lilypond_version"),
+)
+TOP_ALLOCATIONS = 10
+
+_active = None
+
+
+def get_owner(module: str, cls: str):
+    """Returns the class, or the module of a function, of a target."""
+    owner = importlib.import_module(f"{PACKAGE}.{module}")
+    return getattr(owner, cls) if cls else owner
+
+
+class Profile(object):
+    """Counts and times calls of the hot paths listed in TARGETS.
+
+    Nothing is instrumented until enable, which replaces every target
+    with a timing wrapper, and disable restores the originals, so the
+    package runs at full speed when not profiled. Times are cumulative,
+    i.e. include nested instrumented calls such as the Pitch.__init__
+    of a Pitch.transpose.
+
+    Example:
+        >>> with Profile() as profile:
+        ...     ChordInfo.parse_lines(lines)
+        >>> print(profile.report())
+
+    Attributes:
+        calls: The number of calls of each target.
+        times: The cumulative time in nanoseconds of each target.
+        caches: The hits and misses of each lru_cache of CACHES since
+            enable.
+        memory: Whether allocations are traced with tracemalloc.
+        snapshot: The tracemalloc snapshot taken by disable.
+        peak: The peak traced memory in bytes.
+    """
+
+    __slots__ = [
+        "calls",
+        "times",
+        "caches",
+        "memory",
+        "snapshot",
+        "peak",
+        "_originals",
+        "_cache_start",
+        "_tracing",
+    ]
+
+    def __init__(self, memory: bool = False):
+        self.calls: Counter = Counter()
+        self.times: Counter = Counter()
+        self.caches: dict = {}
+        self.memory: bool = memory
+        self.snapshot = None
+        self.peak: int = 0
+        self._originals: list = []
+        self._cache_start: dict = {}
+        self._tracing: bool = False
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    @staticmethod
+    def get_key(cls: str, name: str) -> str:
+        return f"{cls}.{name}" if cls else name
+
+    def wrap(self, function, key: str):
+        """Returns function wrapped to count and time its calls under key."""
+        calls, times = self.calls, self.times
+        perf_counter_ns = time.perf_counter_ns
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                times[key] += perf_counter_ns() - start
+                calls[key] += 1
+
+        return wrapper
+
+    def enable(self):
+        """Instrument every target, and start tracing allocations if asked."""
+        global _active
+        if _active is not None:
+            raise RuntimeError("Another profile is already enabled.")
+        _active = self
+        for module, cls, name in TARGETS:
+            owner = get_owner(module, cls)
+            original = owner.__dict__[name]
+            key = self.get_key(cls, name)
+            if isinstance(original, classmethod):
+                wrapper = classmethod(self.wrap(original.__func__, key))
+            else:
+                wrapper = self.wrap(original, key)
+            self._originals.append((owner, name, original))
+            setattr(owner, name, wrapper)
+        for module, name in CACHES:
+            cache = getattr(get_owner(module, None), name)
+            self._cache_start[name] = cache.cache_info()
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+
+    def disable(self):
+        """Restore every target, and record cache and allocation statistics."""
+        global _active
+        for owner, name, original in reversed(self._originals):
+            setattr(owner, name, original)
+        self._originals = []
+        for module, name in CACHES:
+            start = self._cache_start.pop(name)
+            info = getattr(get_owner(module, None), name).cache_info()
+            self.caches[name] = (info.hits - start.hits, info.misses - start.misses)
+        if self.memory and tracemalloc.is_tracing():
+            self.snapshot = tracemalloc.take_snapshot()
+            self.peak = tracemalloc.get_traced_memory()[1]
+            if self._tracing:
+                tracemalloc.stop()
+                self._tracing = False
+        _active = None
+
+    def allocations(self, limit: int = TOP_ALLOCATIONS) -> list:
+        """Returns the lines of the package which allocated the most memory.
+
+        Returns:
+            A list of (file:line, size in bytes, count) tuples.
+        """
+        if self.snapshot is None:
+            return []
+        snapshot = self.snapshot.filter_traces(
+            [
+                tracemalloc.Filter(True, f"*{PACKAGE}*"),
+                tracemalloc.Filter(False, __file__),
+            ]
+        )
+        root = os.path.dirname(os.path.dirname(__file__))
+        return [
+            (
+                f"{os.path.relpath(x.traceback[0].filename, root)}"
+                f":{x.traceback[0].lineno}",
+                x.size,
+                x.count,
+            )
+            for x in snapshot.statistics("lineno")[:limit]
+        ]
+
+    def report(self) -> str:
+        """Returns tables of the calls, caches and allocations recorded."""
+        lines = [f"{'function':<28}{'calls':>10}{'total ms':>11}{'per call us':>13}"]
+        for key, count in self.calls.most_common():
+            total = self.times[key]
+            lines.append(
+                f"{key:<28}{count:>10}{total / 1e6:>11.3f}{total / count / 1e3:>13.3f}"
+            )
+        lines += ["", f"{'cache':<28}{'hits':>10}{'misses':>11}{'hit rate':>13}"]
+        for name, (hits, misses) in self.caches.items():
+            rate = f"{hits / (hits + misses):.1%}" if hits + misses else "-"
+            lines.append(f"{name:<28}{hits:>10}{misses:>11}{rate:>13}")
+        if self.snapshot is not None:
+            lines += ["", f"peak traced memory {self.peak / 1024:.1f} KiB"]
+            lines += [f"{'allocated at':<50}{'KiB':>10}{'blocks':>10}"]
+            for location, size, count in self.allocations():
+                lines.append(f"{location:<50}{size / 1024:>10.1f}{count:>10}")
+        return "\n".join(lines)
@@ -0,0 +1,418 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from urllib.parse import parse_qsl
+from urllib.parse import unquote
+from urllib.parse import urlencode
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from orchestral_tutti_chord_database.analysis import NoteTable
+from orchestral_tutti_chord_database.database import Database
+from orchestral_tutti_chord_database.database import get_summary
+from orchestral_tutti_chord_database.parser import ChordInfo
+from orchestral_tutti_chord_database.settheory import FORTE_INDEX
+from orchestral_tutti_chord_database.settheory import FORTE_NAMES
+from orchestral_tutti_chord_database.settheory import get_mask
+from orchestral_tutti_chord_database.settheory import prime_form
+
+
+RESPONSE_CACHE_SIZE = 1024
+QUERY_LIMIT = 100
+SIMILAR_LIMIT = 10
+HOST = "127.0.0.1"
+PORT = 8000
+
+
+class ChordStore(object):
+    """A read-only database held in memory with its query indexes.
+
+    Attributes:
+        names: The sorted names of the chords.
+        positions: The index in names of every name.
+        chords: The dict of every chord, see ChordInfo.to_dict.
+        summaries: The summary of every chord, see get_summary, with its
+            Forte name.
+        years: The year of every chord, -1 if unknown.
+        by_forte: The indices of the chords of every Forte name.
+        by_mask: The indices of the chords of every pitch-class bitmask.
+        by_chord: The indices of the chords of every chord symbol.
+        by_normal: The indices of the chords of every normal form hash,
+            i.e. the transpositions of every voicing, see
+            voicing.get_normal_form.
+        profiles: The unit-length pitch-class profile of every chord,
+            each pitch class weighted by its balance, see
+            NoteTable.weights, shaped (chords, 12).
+    """
+
+    __slots__ = [
+        "names",
+        "positions",
+        "chords",
+        "summaries",
+        "years",
+        "by_forte",
+        "by_mask",
+        "by_chord",
+        "by_normal",
+        "profiles",
+    ]
+
+    def __init__(self, names: list, chords: list):
+        self.names: list = names
+        self.positions: dict = {x: i for i, x in enumerate(names)}
+        self.chords: list = chords
+        self.summaries: list = [get_summary(x) for x in chords]
+        masks = np.array([x["mask"] for x in self.summaries], dtype=np.int64)
+        forte = np.array(FORTE_NAMES)[FORTE_INDEX[masks]]
+        for summary, name in zip(self.summaries, forte):
+            summary["forte"] = str(name)
+        self.years = np.array(
+            [x["year"] if isinstance(x["year"], int) else -1 for x in self.summaries],
+            dtype=np.int64,
+        )
+        self.by_forte: dict = self.group(forte)
+        self.by_mask: dict = self.group(masks)
+        self.by_chord: dict = self.group([x["chord"] or "" for x in self.summaries])
+        self.by_normal: dict = self.group([x["normal"] for x in self.summaries])
+
+        table = NoteTable.from_chords(ChordInfo.from_dict(x) for x in chords)
+        profiles = np.bincount(
+            table.chord * 12 + table.midinum % 12,
+            weights=table.weights(),
+            minlength=len(chords) * 12,
+        ).reshape(len(chords), 12)
+        norms = np.linalg.norm(profiles, axis=1, keepdims=True)
+        self.profiles = np.divide(
+            profiles, norms, out=np.zeros_like(profiles), where=norms > 0
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    @classmethod
+    def from_database(cls, database: Database) -> "ChordStore":
+        """Load every chord of a database."""
+        names, chords = [], []
+        for name, data in database:
+            names.append(name)
+            chords.append(data)
+        return cls(names, chords)
+
+    @staticmethod
+    def group(keys) -> dict:
+        """Returns the sorted indices of every distinct key."""
+        groups = {}
+        for i, key in enumerate(keys):
+            # NumPy scalars hash like, but are not, builtin str and int.
+            key = key.item() if isinstance(key, np.generic) else key
+            groups.setdefault(key, []).append(i)
+        return {k: np.array(v, dtype=np.int64) for k, v in groups.items()}
+
+    def get(self, name: str) -> dict:
+        """Returns the dict of a chord, raising KeyError if unknown."""
+        return self.chords[self.positions[name]]
+
+    def query(
+        self,
+        composer: str = None,
+        name: str = None,
+        chord: str = None,
+        since: int = None,
+        until: int = None,
+        forte: str = None,
+        pitch_classes: list = None,
+        normal: str = None,
+    ) -> np.ndarray:
+        """Returns the indices of the chords which match every filter.
+
+        Exact filters are looked up in the indexes, and intersected
+        before the year range and the substring filters are applied.
+
+        Args:
+            composer: A part of the composer, case insensitive.
+            name: A part of the piece name, case insensitive.
+            chord: The chord symbol.
+            since: The earliest year.
+            until: The latest year.
+            forte: The Forte name of the set class, e.g. '3-11'.
+            pitch_classes: The exact pitch-class set, e.g. [2, 6, 9].
+            normal: The normal form hash, in any key.
+        """
+        candidates = np.arange(len(self))
+        exact = (
+            (self.by_forte, forte),
+            (self.by_mask, None if pitch_classes is None else get_mask(pitch_classes)),
+            (self.by_chord, chord),
+            (self.by_normal, normal),
+        )
+        for index, key in exact:
+            if key is not None:
+                candidates = np.intersect1d(
+                    candidates, index.get(key, candidates[:0]), assume_unique=True
+                )
+        years = self.years[candidates]
+        if since is not None:
+            candidates = candidates[years >= since]
+            years = self.years[candidates]
+        if until is not None:
+            candidates = candidates[(years >= 0) & (years <= until)]
+        for field, text in (("composer", composer), ("name", name)):
+            if text is not None:
+                text = text.lower()
+                found = [
+                    text in str(self.summaries[i][field] or "").lower()
+                    for i in candidates
+                ]
+                candidates = candidates[np.array(found, dtype=bool)]
+        return candidates
+
+    def transpositions(self, name: str) -> list:
+        """Find the other chords of the same voicing in any key.
+
+        Returns:
+            The (name, interval) tuple of every such chord, the interval
+            in semitones from the chord to it.
+        """
+        i = self.positions[name]
+        summary = self.summaries[i]
+        return [
+            (self.names[x], self.summaries[x]["root"] - summary["root"])
+            for x in self.by_normal[summary["normal"]]
+            if x != i and summary["root"] is not None
+        ]
+
+    def similar(self, name: str, limit: int = SIMILAR_LIMIT) -> list:
+        """Rank the chords by the cosine similarity of their profiles.
+
+        Returns:
+            Up to limit (name, score) tuples of the most similar other
+            chords, most similar first.
+        """
+        i = self.positions[name]
+        scores = self.profiles @ self.profiles[i]
+        scores[i] = -np.inf
+        limit = min(limit, len(self) - 1)
+        if limit <= 0:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.lexsort((top, -scores[top]))]
+        return [(self.names[x], round(float(scores[x]), 6)) for x in top]
+
+
+class ResponseCache(object):
+    """A thread-safe LRU cache of serialized responses with their ETag.
+
+    Attributes:
+        max_size: The maximum number of responses kept.
+        hits: The number of responses served from the cache.
+        misses: The number of responses computed.
+    """
+
+    __slots__ = ["max_size", "hits", "misses", "_entries", "_lock"]
+
+    def __init__(self, max_size: int = RESPONSE_CACHE_SIZE):
+        self.max_size: int = max_size
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def get_etag(body: bytes) -> str:
+        return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    def get(self, key: str):
+        """Returns the (body, etag) of a key, or None if not cached."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, body: bytes) -> tuple:
+        """Cache a body, returning its (body, etag)."""
+        entry = (body, self.get_etag(body))
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+
+class HTTPError(Exception):
+    """An error answered with a status code and a JSON message."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status: HTTPStatus = status
+
+
+def get_int(params: dict, key: str, default: int = None, minimum: int = None) -> int:
+    """Returns an integer query parameter, raising a 400 HTTPError if invalid.
+
+    Integers below minimum, if given, are invalid.
+    """
+    if key not in params:
+        return default
+    try:
+        value = int(params[key])
+    except ValueError:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Expected an integer {key}.")
+    if minimum is not None and value < minimum:
+        raise HTTPError(HTTPStatus.BAD_REQUEST, f"Expected {key} of {minimum} or more.")
+    return value
+
+
+def route(store: ChordStore, path: str, params: dict):
+    """Returns the JSON payload of a GET request.
+
+    Endpoints:
+        /: The number of chords and the endpoints.
+        /chords: The summaries of the chords matching the parameters
+            composer, name, chord, since, until, forte, normal and pcs,
+            a comma separated pitch-class set, paged by limit and offset.
+        /chords/<name>: The full dict of a chord.
+        /sets: The number of chords of every Forte name.
+        /sets/<forte>: The prime form and the chord names of a set class.
+        /similar/<name>: The chords most similar to a chord, up to limit.
+        /transpositions/<name>: The chords of the same voicing as a
+            chord in any key, with the interval to them.
+    """
+    parts = [unquote(x) for x in path.strip("/").split("/") if x]
+    if not parts:
+        return {
+            "chords": len(store),
+            "endpoints": ["/chords", "/chords/<name>", "/sets", "/sets/<forte>"]
+            + ["/similar/<name>", "/transpositions/<name>"],
+        }
+    if parts[0] == "chords" and len(parts) == 1:
+        pitch_classes = params.get("pcs")
+        if pitch_classes is not None:
+            try:
+                pitch_classes = [int(x) for x in pitch_classes.split(",") if x]
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Expected pcs like 0,4,7.")
+        found = store.query(
+            composer=params.get("composer"),
+            name=params.get("name"),
+            chord=params.get("chord"),
+            since=get_int(params, "since"),
+            until=get_int(params, "until"),
+            forte=params.get("forte"),
+            pitch_classes=pitch_classes,
+            normal=params.get("normal"),
+        )
+        offset = get_int(params, "offset", 0, minimum=0)
+        limit = get_int(params, "limit", QUERY_LIMIT, minimum=1)
+        return {
+            "total": len(found),
+            "chords": [
+                dict(store.summaries[i], id=store.names[i])
+                for i in found[offset : offset + limit]
+            ],
+        }
+    if parts[0] in ("chords", "similar", "transpositions") and len(parts) == 2:
+        if parts[1] not in store.positions:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No chord {parts[1]}.")
+        if parts[0] == "chords":
+            return dict(store.get(parts[1]), id=parts[1])
+        if parts[0] == "transpositions":
+            found = store.transpositions(parts[1])
+            return {"transpositions": [{"id": x, "interval": y} for x, y in found]}
+        limit = get_int(params, "limit", SIMILAR_LIMIT, minimum=1)
+        similar = store.similar(parts[1], limit)
+        return {"similar": [{"id": x, "score": score} for x, score in similar]}
+    if parts[0] == "sets" and len(parts) == 1:
+        return {k: len(v) for k, v in sorted(store.by_forte.items())}
+    if parts[0] == "sets" and len(parts) == 2:
+        if parts[1] not in FORTE_NAMES:
+            raise HTTPError(HTTPStatus.NOT_FOUND, f"No set class {parts[1]}.")
+        mask = int(np.flatnonzero(FORTE_INDEX == FORTE_NAMES.index(parts[1]))[0])
+        found = store.by_forte.get(parts[1], [])
+        return {
+            "forte": parts[1],
+            "prime_form": prime_form(mask),
+            "chords": [store.names[i] for i in found],
+        }
+    raise HTTPError(HTTPStatus.NOT_FOUND, f"No endpoint {path}.")
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """Answers GET requests with the JSON of route, cached by URL."""
+
+    server_version = "otcd"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        key = url.path + "?" + urlencode(sorted(params.items()))
+        cache = self.server.responses
+        entry = cache.get(key)
+        status = HTTPStatus.OK
+        if entry is None:
+            try:
+                payload = route(self.server.store, url.path, params)
+            except HTTPError as e:
+                status, payload = e.status, {"error": str(e)}
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            if status == HTTPStatus.OK:
+                entry = cache.put(key, body)
+            else:
+                entry = (body, None)
+        body, etag = entry
+        if etag is not None and etag in self.headers.get("If-None-Match", ""):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class QueryServer(ThreadingHTTPServer):
+    """A threaded HTTP server of the queries of a ChordStore.
+
+    The database is loaded once, and as it is read-only, every
+    serialized response is cached for the life of the server.
+
+    Attributes:
+        store: The ChordStore answering the queries.
+        responses: The ResponseCache of serialized responses.
+        verbose: Whether to log every request to stderr.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        store: ChordStore,
+        address: tuple = (HOST, PORT),
+        cache_size: int = RESPONSE_CACHE_SIZE,
+        verbose: bool = False,
+    ):
+        super().__init__(address, QueryHandler)
+        self.store: ChordStore = store
+        self.responses: ResponseCache = ResponseCache(cache_size)
+        self.verbose: bool = verbose
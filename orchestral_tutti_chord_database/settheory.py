@@ -0,0 +1,151 @@
+import numpy as np
+
+from orchestral_tutti_chord_database.analysis import NoteTable
+
+
+# Forte's set classes of three to six pitch classes by a representative, in
+# the order of their numbers, with a leading Z for Z-related classes.
+FORTE_CATALOG = {
+    3: "012 013 014 015 016 024 025 026 027 036 037 048".split(),
+    4: (
+        "0123 0124 0134 0125 0126 0127 0145 0156 0167 0235 0135 0236 0136 0237 "
+        "Z0146 0157 0347 0147 0148 0158 0246 0247 0257 0248 0268 0358 0258 0369 "
+        "Z0137"
+    ).split(),
+    5: (
+        "01234 01235 01245 01236 01237 01256 01267 02346 01246 01346 02347 Z01356 "
+        "01248 01257 01268 01347 Z01348 Z01457 01367 01378 01458 01478 02357 01357 "
+        "02358 02458 01358 02368 01368 01468 01369 01469 02468 02469 02479 Z01247 "
+        "Z03458 Z01258"
+    ).split(),
+    6: (
+        "012345 012346 Z012356 Z012456 012367 Z012567 012678 023457 012357 Z013457 "
+        "Z012457 Z012467 Z013467 013458 012458 014568 Z012478 012578 Z013478 014589 "
+        "023468 012468 Z023568 Z013468 Z013568 Z013578 013469 Z013569 Z013689 013679 "
+        "013589 024579 023579 013579 02468A Z012347 Z012348 Z012378 Z023458 Z012358 "
+        "Z012368 Z012369 Z012568 Z012569 Z023469 Z012469 Z012479 Z012579 Z013479 "
+        "Z014679"
+    ).split(),
+}
+
+FULL_MASK = (1 << 12) - 1
+BITS = (np.arange(FULL_MASK + 1)[:, None] >> np.arange(12)) & 1
+CARDINALITY = BITS.sum(axis=1)
+
+
+def rotate(masks, t):
+    """Transpose pitch-class bitmasks down by t semitones."""
+    masks = np.asarray(masks)
+    return ((masks >> t) | (masks << (12 - t))) & FULL_MASK
+
+
+def invert(masks):
+    """Invert pitch-class bitmasks around C, i.e. pc -> -pc."""
+    return BITS[masks][..., (12 - np.arange(12)) % 12] @ (1 << np.arange(12))
+
+
+def build_tables() -> tuple:
+    """Compute the set theory of every pitch-class set at once.
+
+    Each set is a 12-bit mask with bit i set for pitch class i. Among
+    sets of equal cardinality, comparing Rahn's normal forms from the
+    last pitch class down is comparing the masks of their rotations to
+    C as integers, so the normal and prime forms are a minimum over the
+    rotations of each mask.
+
+    Returns:
+        The mask of the prime form, the mask and lowest pitch class of
+        the normal form, the interval class vector shaped (4096, 6)
+        and the index in FORTE_NAMES of every mask.
+    """
+    masks = np.arange(FULL_MASK + 1)
+    rotations = np.array([rotate(masks, t) for t in range(12)]).T
+    # Only rotations which bring a member of the set to C are candidates.
+    rotations[BITS == 0] = FULL_MASK + 1
+    normal_root = rotations.argmin(axis=1)
+    normal_form = rotations[masks, normal_root]
+    normal_form[0], normal_root[0] = 0, 0
+    prime_form = np.minimum(normal_form, normal_form[invert(masks)])
+
+    interval_vector = np.array(
+        [(BITS & np.roll(BITS, -i, axis=1)).sum(axis=1) for i in range(1, 7)]
+    ).T
+    interval_vector[:, 5] //= 2
+
+    names = ["0-1", "1-1"] + [f"2-{i}" for i in range(1, 7)]
+    primes = [0, 1] + [1 | 1 << i for i in range(1, 7)]
+    for cardinality in range(3, 7):
+        for number, representative in enumerate(FORTE_CATALOG[cardinality], 1):
+            z = "Z" if representative[0] == "Z" else ""
+            mask = sum(1 << int(x, 12) for x in representative.lstrip("Z"))
+            names.append(f"{cardinality}-{z}{number}")
+            primes.append(prime_form[mask])
+    for name, prime in list(zip(names, primes)):
+        cardinality, number = name.split("-")
+        if int(cardinality) < 6:
+            names.append(f"{12 - int(cardinality)}-{number}")
+            primes.append(prime_form[FULL_MASK ^ prime])
+    forte_index = np.full(FULL_MASK + 1, -1)
+    forte_index[primes] = np.arange(len(primes))
+    forte_index = forte_index[prime_form]
+    return prime_form, normal_form, normal_root, interval_vector, names, forte_index
+
+
+(
+    PRIME_FORM,
+    NORMAL_FORM,
+    NORMAL_ROOT,
+    INTERVAL_VECTOR,
+    FORTE_NAMES,
+    FORTE_INDEX,
+) = build_tables()
+
+
+def get_mask(pitches) -> int:
+    """Returns the pitch-class bitmask of midi numbers or pitch classes."""
+    pitch_classes = np.asarray(pitches, dtype=np.int64) % 12
+    return int(np.bitwise_or.reduce(1 << pitch_classes, initial=0))
+
+
+def get_masks(table: NoteTable) -> np.ndarray:
+    """Returns the pitch-class bitmask of every chord in a table."""
+    present = np.zeros((table.size, 12), dtype=np.int64)
+    present[table.chord, table.midinum % 12] = 1
+    return present @ (1 << np.arange(12))
+
+
+def get_pitch_classes(mask: int, root: int = 0) -> list:
+    """List the pitch classes of a mask, in order from root upwards."""
+    return [(int(root) + i) % 12 for i in range(12) if mask >> i & 1]
+
+
+def normal_form(mask: int) -> list:
+    """Returns the normal form of a mask as a list of pitch classes."""
+    return get_pitch_classes(NORMAL_FORM[mask], NORMAL_ROOT[mask])
+
+
+def prime_form(mask: int) -> list:
+    """Returns the prime form of a mask as a list of pitch classes."""
+    return get_pitch_classes(PRIME_FORM[mask])
+
+
+def interval_vector(masks) -> np.ndarray:
+    """Returns the interval class vectors, shaped (..., 6), of masks."""
+    return INTERVAL_VECTOR[np.asarray(masks)]
+
+
+def forte_name(masks) -> np.ndarray:
+    """Returns the Forte name, e.g. '3-11', of an array of masks."""
+    return np.array(FORTE_NAMES)[FORTE_INDEX[np.asarray(masks)]]
+
+
+def group_by_set_class(masks) -> dict:
+    """Group the indices of an array of masks by their Forte name."""
+    masks = np.asarray(masks)
+    forte_index = FORTE_INDEX[masks]
+    order = np.argsort(forte_index, kind="stable")
+    classes, starts = np.unique(forte_index[order], return_index=True)
+    return {
+        FORTE_NAMES[x]: indices
+        for x, indices in zip(classes, np.split(order, starts[1:]))
+    }
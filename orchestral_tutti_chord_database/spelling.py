@@ -0,0 +1,207 @@
+"""Spell midi numbers as note names, a whole chord at a time.
+
+Spellings are positions on the line of fifths, F=-1, C=0, G=1 and so
+on, where sharpening a note moves it seven fifths up. Any twelve
+consecutive positions spell every pitch class once, so a chord is
+spelled by choosing the window of twelve fifths which costs the least
+for its pitch-class set and key:
+
+* every note outside the seven fifths of the key signature costs its
+  distance from them in fifths, times KEY_COST. Minor keys also admit
+  the three fifths above, which include their raised sixth and
+  seventh degrees;
+* every pair of notes more than five fifths apart, i.e. forming an
+  augmented or diminished interval, costs its excess over five fifths,
+  times INTERVAL_COST. The tritone, six fifths apart either way,
+  therefore costs the same spelled either way.
+
+The best window of every key signature and pitch-class set is computed
+once, so spelling many chords is a table lookup.
+"""
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from orchestral_tutti_chord_database.pitch import PITCHCLASSES
+from orchestral_tutti_chord_database.pitch import PITCHID
+from orchestral_tutti_chord_database.pitch import get_accidental
+
+
+# Positions on the line of fifths, from Fbb to Bx.
+LOWEST, HIGHEST = -15, 19
+# Key signatures in fifths, from seven flats to seven sharps.
+FIFTHS = range(-7, 8)
+KEY_COST = 2
+INTERVAL_COST = 3
+LETTERS = "FCGDAEB"
+# Modes by their lower case name, but for M, major, and m, minor.
+MODES = {
+    "major": False,
+    "maj": False,
+    "M": False,
+    "minor": True,
+    "min": True,
+    "m": True,
+}
+# Fifths added by the accidental of a tonic.
+ACCIDENTALS = {"#": 7, "\u266f": 7, "b": -7, "\u266d": -7, "": 0}
+KEY_PATTERN = re.compile(r"\s*([A-Ga-g])([#b\u266f\u266d]?)\s*([A-Za-z]*)\s*")
+
+POSITIONS = np.arange(LOWEST, HIGHEST + 1)
+NAMES = [
+    LETTERS[(x + 1) % 7] + get_accidental((x + 1) // 7) for x in POSITIONS.tolist()
+]
+# The pitch class index, C=0 to B=6, and the semitones above C of every name.
+LETTER_INDEX = np.array([PITCHCLASSES.index(x[0]) for x in NAMES])
+SEMITONES = np.array(PITCHID)[LETTER_INDEX] + (POSITIONS + 1) // 7
+BITS = (np.arange(1 << 12)[:, None] >> np.arange(12)) & 1
+
+
+def get_positions(start: int) -> np.ndarray:
+    """Returns the position of every pitch class in a window of fifths."""
+    # Seven fifths are one semitone up and 7 * 7 = 1 modulo 12.
+    return start + (7 * np.arange(12) - start) % 12
+
+
+def build_windows() -> np.ndarray:
+    """Compute the cheapest window of every key and pitch-class set.
+
+    Ties go to the window nearest the key signature, and with an
+    unknown key, to the cheapest major key with the fewest accidentals.
+
+    Returns:
+        The start of the window, shaped (2 * len(FIFTHS) + 1, 4096), of
+        the major keys of every signature in FIFTHS, then of the minor
+        keys and, last, of an unknown key.
+    """
+    starts = np.arange(LOWEST, HIGHEST - 10)
+    positions = np.array([get_positions(x) for x in starts])
+    distances = np.abs(positions[:, :, None] - positions[:, None, :])
+    # Halved, as BITS counts every pair of notes twice.
+    pairs = np.maximum(distances - 5, 0) * INTERVAL_COST / 2
+    interval_costs = np.einsum("mi,sij,mj->sm", BITS, pairs, BITS)
+
+    keys = [(x, False) for x in FIFTHS] + [(x, True) for x in FIFTHS]
+    windows = np.empty((len(keys) + 1, len(BITS)), dtype=np.int64)
+    costs = np.empty((len(keys), len(BITS)))
+    for i, (fifths, minor) in enumerate(keys):
+        outside = np.maximum(fifths - 1 - positions, 0)
+        outside += np.maximum(positions - fifths - (8 if minor else 5), 0)
+        total = interval_costs + outside * KEY_COST @ BITS.T
+        # The center of the key signature is two fifths above C or A.
+        order = np.argsort(np.abs(starts + 5.5 - fifths - 2), kind="stable")
+        best = total[order].argmin(axis=0)
+        windows[i] = starts[order][best]
+        costs[i] = total[order[best], np.arange(len(BITS))]
+    order = np.argsort(np.abs(FIFTHS), kind="stable")
+    windows[-1] = windows[order][costs[order].argmin(axis=0), np.arange(len(BITS))]
+    return windows
+
+
+WINDOWS = build_windows()
+
+
+def parse_key(key: str) -> tuple:
+    """Returns the key signature in fifths and whether a key is minor.
+
+    The tonic, with #, b or the signs of sharp and flat, may be
+    followed by a mode in any case, major, maj, M, minor, min or m,
+    defaulting to major, or be lower case for minor, e.g. 'f#'.
+
+    Example:
+        >>> parse_key("C minor")
+        (-3, True)
+
+    Returns:
+        The sharps, negative for flats, and whether the key is minor,
+        or None if the key is unknown.
+    """
+    match = KEY_PATTERN.fullmatch(str(key or ""))
+    if not match:
+        return None
+    tonic, accidental, mode = match.groups()
+    mode = mode if mode in ("M", "m") else mode.lower()
+    if mode and mode not in MODES:
+        return None
+    fifths = LETTERS.index(tonic.upper()) - 1 + ACCIDENTALS[accidental]
+    minor = MODES[mode] if mode else tonic.islower()
+    return fifths - 3 * minor, minor
+
+
+def format_key(fifths: int, minor: bool = False) -> str:
+    """Returns the key of a key signature, e.g. 'C minor' for -3 minor."""
+    tonic = NAMES[fifths + 3 * minor - LOWEST]
+    return f"{tonic} {'minor' if minor else 'major'}"
+
+
+@lru_cache(maxsize=None)
+def get_key_index(key: str) -> int:
+    """Returns the row of WINDOWS of a key, see parse_key.
+
+    Signatures of more than seven sharps or flats are spelled as seven.
+    """
+    parsed = parse_key(key)
+    if parsed is None:
+        return len(WINDOWS) - 1
+    fifths, minor = parsed
+    fifths = min(max(fifths, FIFTHS[0]), FIFTHS[-1])
+    return fifths - FIFTHS[0] + minor * len(FIFTHS)
+
+
+def spell_notes(chord, midinum, keys=None, size: int = None) -> list:
+    """Spell the notes of a batch of chords, see NoteTable.
+
+    Args:
+        chord: The index of the chord of each note.
+        midinum: The midi number of each note.
+        keys: The key of every chord, e.g. 'Bb major', see parse_key,
+            or a single key for all, None if unknown.
+        size: The number of chords, defaults to the highest index + 1.
+
+    Returns:
+        The note names, e.g. 'Eb4', in the order of the notes.
+    """
+    chord = np.asarray(chord, dtype=np.int64)
+    midinum = np.asarray(midinum, dtype=np.int64)
+    if size is None:
+        size = int(chord.max()) + 1 if len(chord) else 0
+    if keys is None or isinstance(keys, str):
+        rows = np.full(size, get_key_index(keys))
+    else:
+        rows = np.array([get_key_index(x) for x in keys], dtype=np.int64)
+    present = np.zeros((size, 12), dtype=np.int64)
+    present[chord, midinum % 12] = 1
+    masks = present @ (1 << np.arange(12))
+
+    starts = WINDOWS[rows[chord], masks[chord]]
+    positions = starts + (7 * midinum - starts) % 12 - LOWEST
+    octaves = (midinum - SEMITONES[positions]) // 12
+    return [NAMES[x] + str(y) for x, y in zip(positions.tolist(), octaves.tolist())]
+
+
+def spell_chords(chords: list, keys=None) -> list:
+    """Spell the midi numbers of many chords, see spell_notes.
+
+    Args:
+        chords: A list of lists of midi numbers.
+        keys: The key of every chord, or a single key for all.
+
+    Returns:
+        The list of note names of every chord.
+    """
+    counts = [len(x) for x in chords]
+    chord = np.repeat(np.arange(len(chords)), counts)
+    midinum = [x for notes in chords for x in notes]
+    names = iter(spell_notes(chord, midinum, keys, len(chords)))
+    return [[next(names) for _ in range(x)] for x in counts]
+
+
+def spell(midinums: list, key=None) -> list:
+    """Returns the note names of the midi numbers of one chord.
+
+    Example:
+        >>> spell([50, 54, 57, 60], "G major")
+        ['D4', 'F#4', 'A4', 'C5']
+    """
+    return spell_chords([midinums], key)[0]
@@ -0,0 +1,346 @@
+import json
+import sqlite3
+from contextlib import contextmanager
+
+from orchestral_tutti_chord_database.balance import SECTIONS
+from orchestral_tutti_chord_database.database import get_summary
+from orchestral_tutti_chord_database.parser import ChordInfo
+from orchestral_tutti_chord_database.pitch import get_pitch
+
+
+EXTENSIONS = (".sqlite", ".sqlite3", ".db")
+PIECE_FIELDS = ("composer", "year", "opus", "name", "movement")
+CHORD_FIELDS = ("measure", "key", "tempo", "orchestra_size", "performer", "imslp")
+CHORD_FIELDS += ("chord",)
+INSTRUMENT_FIELDS = ("instrument", "clef", "dynamic", "technique")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pieces (
+    id INTEGER PRIMARY KEY,
+    identity TEXT NOT NULL UNIQUE,
+    composer, year, opus, name, movement
+);
+CREATE TABLE IF NOT EXISTS chords (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    piece_id INTEGER NOT NULL REFERENCES pieces(id),
+    measure, "key", tempo, orchestra_size, performer, imslp, chord
+);
+CREATE TABLE IF NOT EXISTS instruments (
+    id INTEGER PRIMARY KEY,
+    chord_id INTEGER NOT NULL REFERENCES chords(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    section INTEGER NOT NULL,
+    instrument, clef, dynamic, technique
+);
+CREATE TABLE IF NOT EXISTS notes (
+    instrument_id INTEGER NOT NULL REFERENCES instruments(id) ON DELETE CASCADE,
+    chord_id INTEGER NOT NULL REFERENCES chords(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    section INTEGER NOT NULL,
+    note TEXT NOT NULL,
+    midinum INTEGER
+);
+CREATE TABLE IF NOT EXISTS sources (
+    name TEXT PRIMARY KEY,
+    mtime INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pieces_composer ON pieces(composer, year, id);
+CREATE INDEX IF NOT EXISTS pieces_year ON pieces(year, composer, id);
+CREATE INDEX IF NOT EXISTS chords_piece ON chords(piece_id, name);
+CREATE INDEX IF NOT EXISTS chords_key ON chords("key", piece_id, name);
+CREATE INDEX IF NOT EXISTS chords_chord ON chords(chord, piece_id, name);
+CREATE INDEX IF NOT EXISTS instruments_chord ON instruments(chord_id, position);
+CREATE INDEX IF NOT EXISTS notes_instrument ON notes(instrument_id, position);
+CREATE INDEX IF NOT EXISTS notes_midinum ON notes(midinum, section, chord_id);
+CREATE INDEX IF NOT EXISTS notes_chord ON notes(chord_id, midinum);
+"""
+
+SELECT_RECORDS = f"""
+SELECT c.name, {", ".join(f"p.{x}" for x in PIECE_FIELDS)},
+    {", ".join(f'c."{x}"' for x in CHORD_FIELDS)},
+    s.position, s.section, {", ".join(f"s.{x}" for x in INSTRUMENT_FIELDS)}, n.note
+FROM chords AS c
+JOIN pieces AS p ON p.id = c.piece_id
+LEFT JOIN instruments AS s ON s.chord_id = c.id
+LEFT JOIN notes AS n ON n.instrument_id = s.id
+{{where}}
+ORDER BY c.name, s.position, n.position
+"""
+
+# The bitwise or of the distinct pitch-class bits is their sum.
+SELECT_METADATA = f"""
+SELECT c.name, {", ".join(f"p.{x}" for x in PIECE_FIELDS)},
+    {", ".join(f'c."{x}"' for x in CHORD_FIELDS)},
+    (SELECT COUNT(n.midinum) FROM notes AS n WHERE n.chord_id = c.id),
+    (SELECT COALESCE(SUM(DISTINCT 1 << ((n.midinum % 12 + 12) % 12)), 0)
+        FROM notes AS n WHERE n.chord_id = c.id)
+FROM chords AS c
+JOIN pieces AS p ON p.id = c.piece_id
+ORDER BY c.name
+"""
+# Below the default limit of host parameters of older SQLite versions.
+MAX_PARAMETERS = 999
+
+
+def is_sqlite(path: str) -> bool:
+    """Returns whether a database path names an SQLite file."""
+    return path.endswith(EXTENSIONS)
+
+
+class SQLiteDatabase(object):
+    """A single-file SQLite store of chords, a drop-in for Database.
+
+    Chords are normalized into pieces, chords, instrument entries and
+    notes, each note keeping its sounding midi number and section for
+    the (midinum, section) index. Writes are batched into one
+    transaction with executemany, and the database runs in WAL mode so
+    readers are not blocked by a writer.
+
+    Attributes:
+        path: The path of the database file.
+        connection: The sqlite3 connection, in autocommit mode with
+            explicit transactions.
+    """
+
+    __slots__ = ["path", "connection"]
+
+    def __init__(self, path: str):
+        self.path: str = path
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(SCHEMA)
+
+    def __len__(self):
+        return self.connection.execute("SELECT COUNT(*) FROM chords").fetchone()[0]
+
+    def __contains__(self, name: str):
+        query = "SELECT 1 FROM chords WHERE name = ?"
+        return self.connection.execute(query, (name,)).fetchone() is not None
+
+    def __iter__(self):
+        """Yields the name and the dict of every chord, in name order."""
+        return self.iter_dicts()
+
+    def close(self):
+        self.connection.close()
+
+    @contextmanager
+    def transaction(self):
+        """Run a block in one write transaction, rolled back on errors."""
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.connection
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+    def names(self) -> list:
+        """Returns the sorted names of all chords."""
+        rows = self.connection.execute("SELECT name FROM chords ORDER BY name")
+        return [x[0] for x in rows]
+
+    def iter_dicts(self, names: list = None):
+        """Yields the name and the dict of chords, streamed row by row.
+
+        Args:
+            names: The names of the chords to load, defaults to all,
+                selected MAX_PARAMETERS at a time.
+        """
+        if names is None:
+            cursor = self.connection.execute(SELECT_RECORDS.format(where=""))
+            yield from self.iter_rows(cursor)
+            return
+        names = list(names)
+        for start in range(0, len(names), MAX_PARAMETERS):
+            batch = names[start : start + MAX_PARAMETERS]
+            where = f"WHERE c.name IN ({', '.join('?' * len(batch))})"
+            cursor = self.connection.execute(SELECT_RECORDS.format(where=where), batch)
+            yield from self.iter_rows(cursor)
+
+    @staticmethod
+    def iter_rows(cursor):
+        """Yields the name and the dict of the chords of SELECT_RECORDS rows."""
+        fields = PIECE_FIELDS + CHORD_FIELDS
+        name, data, instrument, position = None, None, None, None
+        for row in cursor:
+            if row[0] != name:
+                if data is not None:
+                    yield name, data
+                name, position = row[0], None
+                values = dict(zip(fields, row[1 : 1 + len(fields)]))
+                data = {
+                    k: values[k] for k in ChordInfo.long if values.get(k) is not None
+                }
+                data["sections"] = {}
+            entry, section, instrument_name, clef, dynamic, technique, note = row[
+                1 + len(fields) :
+            ]
+            if entry is None:
+                continue
+            if entry != position:
+                position = entry
+                instrument = {
+                    "instrument": instrument_name,
+                    "clef": clef,
+                    "notes": [],
+                    "dynamic": dynamic,
+                    "technique": technique,
+                }
+                data["sections"].setdefault(SECTIONS[section], []).append(instrument)
+            if note is not None:
+                instrument["notes"].append(note)
+        if data is not None:
+            yield name, data
+
+    def load_dict(self, name: str) -> dict:
+        """Returns the dict of a chord, raising KeyError if unknown."""
+        for _, data in self.iter_dicts([name]):
+            return data
+        raise KeyError(name)
+
+    def load(self, name: str) -> ChordInfo:
+        """Returns a chord as a ChordInfo object."""
+        return ChordInfo.from_dict(self.load_dict(name))
+
+    def save_dict(self, name: str, data: dict):
+        """Save the dict of a chord, replacing any chord of the same name."""
+        self.save_many([(name, data)])
+
+    def save(self, name: str, chord: ChordInfo):
+        """Save a ChordInfo object."""
+        self.save_dict(name, chord.to_dict())
+
+    def save_many(self, items, index: bool = True):
+        """Save many (name, dict) chords in one transaction.
+
+        Rows are collected per table and inserted with one executemany
+        each, with the ids of new rows allocated up front. Of chords of
+        the same name, the last is saved, as by Database.save_many. The
+        index is always in sync.
+        """
+        items = list(dict(items).items())
+        with self.transaction() as connection:
+            connection.executemany(
+                "DELETE FROM chords WHERE name = ?", [(x[0],) for x in items]
+            )
+            pieces = {}
+            for _, data in items:
+                values = tuple(data.get(x) for x in PIECE_FIELDS)
+                pieces[json.dumps(values)] = values
+            connection.executemany(
+                "INSERT OR IGNORE INTO pieces "
+                f"(identity, {', '.join(PIECE_FIELDS)}) VALUES (?, ?, ?, ?, ?, ?)",
+                [(k,) + v for k, v in pieces.items()],
+            )
+            piece_ids = dict(connection.execute("SELECT identity, id FROM pieces"))
+
+            chord_id = self.next_id("chords")
+            instrument_id = self.next_id("instruments")
+            chords, instruments, notes = [], [], []
+            for name, data in items:
+                identity = json.dumps(tuple(data.get(x) for x in PIECE_FIELDS))
+                chords.append(
+                    (chord_id, name, piece_ids[identity])
+                    + tuple(data.get(x) for x in CHORD_FIELDS)
+                )
+                position = 0
+                for section, entries in data.get("sections", {}).items():
+                    section = SECTIONS.index(section)
+                    for entry in entries:
+                        instruments.append(
+                            (instrument_id, chord_id, position, section)
+                            + tuple(entry.get(x) for x in INSTRUMENT_FIELDS)
+                        )
+                        notes += [
+                            (
+                                instrument_id,
+                                chord_id,
+                                i,
+                                section,
+                                note,
+                                get_pitch(note).midinum if note else None,
+                            )
+                            for i, note in enumerate(entry["notes"])
+                        ]
+                        instrument_id += 1
+                        position += 1
+                chord_id += 1
+            columns = ", ".join(f'"{x}"' for x in CHORD_FIELDS)
+            connection.executemany(
+                f"INSERT INTO chords (id, name, piece_id, {columns}) "
+                f"VALUES ({', '.join('?' * (3 + len(CHORD_FIELDS)))})",
+                chords,
+            )
+            connection.executemany(
+                "INSERT INTO instruments (id, chord_id, position, section, "
+                f"{', '.join(INSTRUMENT_FIELDS)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                instruments,
+            )
+            connection.executemany(
+                "INSERT INTO notes (instrument_id, chord_id, position, section, note, "
+                "midinum) VALUES (?, ?, ?, ?, ?, ?)",
+                notes,
+            )
+            self.remove_orphans()
+
+    def next_id(self, table: str) -> int:
+        """Returns the id following the largest id of a table."""
+        query = f"SELECT COALESCE(MAX(id), 0) + 1 FROM {table}"
+        return self.connection.execute(query).fetchone()[0]
+
+    def remove(self, name: str):
+        """Delete a chord if it exists, and its piece if it has no chord left."""
+        self.remove_many([name])
+
+    def remove_many(self, names, index: bool = True):
+        """Delete the chords of many names in one transaction, see remove."""
+        with self.transaction() as connection:
+            connection.executemany(
+                "DELETE FROM chords WHERE name = ?", [(x,) for x in names]
+            )
+            self.remove_orphans()
+
+    def remove_orphans(self):
+        """Delete the pieces without any chord left."""
+        self.connection.execute(
+            "DELETE FROM pieces WHERE id NOT IN (SELECT piece_id FROM chords)"
+        )
+
+    def load_index(self) -> dict:
+        """Returns the index, see Database.load_index."""
+        return {
+            "chords": {name: get_summary(data) for name, data in self},
+            "sources": dict(self.connection.execute("SELECT name, mtime FROM sources")),
+        }
+
+    def load_metadata(self) -> dict:
+        """Returns the piece and chord information of every chord by name.
+
+        Only the chord and piece tables are read, with the number of
+        sounding notes and the pitch-class bitmask, see get_summary,
+        aggregated by the notes_chord index.
+        """
+        fields = PIECE_FIELDS + CHORD_FIELDS + ("notes", "mask")
+        return {
+            row[0]: dict(zip(fields, row[1:]))
+            for row in self.connection.execute(SELECT_METADATA)
+        }
+
+    def update_index(self, summaries: dict):
+        """Do nothing, as summaries are queried from the tables."""
+
+    def save_index(self, index: dict):
+        """Save the source modification times of an index.
+
+        The summaries of the chords are queried from the tables instead.
+        """
+        with self.transaction() as connection:
+            connection.execute("DELETE FROM sources")
+            connection.executemany(
+                "INSERT INTO sources (name, mtime) VALUES (?, ?)",
+                index["sources"].items(),
+            )
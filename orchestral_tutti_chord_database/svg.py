@@ -0,0 +1,155 @@
+import os
+
+import numpy as np
+
+from orchestral_tutti_chord_database.balance import BALANCE
+from orchestral_tutti_chord_database.balance import get_section
+from orchestral_tutti_chord_database.balance import is_forte
+from orchestral_tutti_chord_database.color import note_colors
+from orchestral_tutti_chord_database.pitch import get_pitch
+from orchestral_tutti_chord_database.voicing import get_voicing
+
+
+# Staff positions count diatonic steps, octave * 7 + pitch class index.
+TREBLE_LINES = (30, 32, 34, 36, 38)
+BASS_LINES = (18, 20, 22, 24, 26)
+MIDDLE_C = 28
+HALF_SPACE = 4.0
+MARGIN = 12.0
+WIDTH = 120.0
+NOTE_X = 72.0
+ACCIDENTALS = {-2: "\U0001D12B", -1: "♭", 1: "♯", 2: "\U0001D12A"}
+
+
+def get_notes(chord) -> tuple:
+    """Collect the distinct sounding notes of a chord with their weights.
+
+    The weight of a note is the sum of the balance weights, see
+    analysis.BALANCE, of every instrument playing it.
+
+    Args:
+        chord: A ChordInfo object, or its list of instruments.
+
+    Returns:
+        The midi number, staff step, accidental index and weight
+        arrays of the notes, sorted from low to high.
+    """
+    weights = {}
+    for instrument in getattr(chord, "instruments", chord):
+        balance = BALANCE["forte" if is_forte(instrument[3]) else "piano"]
+        weight = balance[get_section(instrument[0])]
+        for note in instrument[2]:
+            if note:
+                weights[note] = weights.get(note, 0) + weight
+    pitches = [get_pitch(x) for x in weights]
+    columns = np.array(
+        [
+            [x.midinum, x.octave * 7 + x.pitch_class_index, x.accidental_index]
+            for x in pitches
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 3)
+    weight = np.array(list(weights.values()), dtype=np.float64)
+    order = np.lexsort((columns[:, 0], columns[:, 1]))
+    midinum, step, accidental = columns[order].T
+    return midinum, step, accidental, weight[order]
+
+
+def get_offsets(step: np.ndarray) -> np.ndarray:
+    """Shift every other note of a cluster of seconds to the right."""
+    shifted = np.zeros(len(step), dtype=bool)
+    for i in range(1, len(step)):
+        shifted[i] = step[i] - step[i - 1] <= 1 and not shifted[i - 1]
+    return shifted
+
+
+def render_svg(chord, width: float = WIDTH) -> str:
+    """Draw the balance view of a chord on a grand staff as SVG.
+
+    Noteheads are placed at their staff step, coloured by pitch class
+    and darker and larger with their weight relative to the heaviest
+    note of the chord.
+
+    Args:
+        chord: A ChordInfo object, or its list of instruments.
+        width: The width of the drawing in pixels.
+
+    Returns:
+        The SVG document as a string.
+    """
+    midinum, step, accidental, weight = get_notes(chord)
+    top = max([TREBLE_LINES[-1] + 2] + list(step + 2))
+    bottom = min([BASS_LINES[0] - 2] + list(step - 2))
+    height = (top - bottom) * HALF_SPACE + 2 * MARGIN
+
+    def get_y(steps):
+        return MARGIN + (top - np.asarray(steps)) * HALF_SPACE
+
+    elements = [
+        f'<line x1="{MARGIN:g}" y1="{y:g}" x2="{width - MARGIN:g}" y2="{y:g}"/>'
+        for y in get_y(TREBLE_LINES + BASS_LINES)
+    ]
+
+    relative = weight / weight.max() if len(weight) else weight
+    scale = 0.7 + 0.6 * relative
+    x = NOTE_X + get_offsets(step) * 2.2 * HALF_SPACE
+    colors = note_colors(midinum, relative, hex=True)
+
+    ledger = set()
+    for note_step, note_x in zip(step, x):
+        if note_step > TREBLE_LINES[-1]:
+            steps = range(TREBLE_LINES[-1] + 2, note_step + 1, 2)
+        elif note_step < BASS_LINES[0]:
+            steps = range(BASS_LINES[0] - 2, note_step - 1, -2)
+        else:
+            steps = [MIDDLE_C] if note_step == MIDDLE_C else []
+        ledger.update((s, note_x) for s in steps)
+    elements += [
+        f'<line x1="{lx - 2.2 * HALF_SPACE:g}" y1="{ly:g}" '
+        f'x2="{lx + 2.2 * HALF_SPACE:g}" y2="{ly:g}"/>'
+        for ly, lx in ((get_y(s), lx) for s, lx in sorted(ledger))
+    ]
+
+    elements += [
+        f'<ellipse cx="{cx:g}" cy="{cy:g}" rx="{1.4 * HALF_SPACE * s:.2f}" '
+        f'ry="{HALF_SPACE * s:.2f}" fill="{c}"/>'
+        for cx, cy, s, c in zip(x, get_y(step), scale, colors)
+    ]
+    elements += [
+        f'<text x="{cx - 3.2 * HALF_SPACE:g}" y="{cy + HALF_SPACE:g}" stroke="none">'
+        f"{ACCIDENTALS[a]}</text>"
+        for cx, cy, a in zip(x, get_y(step), accidental)
+        if a in ACCIDENTALS
+    ]
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" '
+        f'width="{width:g}" height="{height:g}" viewBox="0 0 {width:g} {height:g}">'
+        f'<g stroke="#000" stroke-width="1" font-size="{3 * HALF_SPACE:g}">'
+        + "".join(elements)
+        + "</g></svg>"
+    )
+
+
+def write_svg(chords: list, output_dir: str, names: list = None) -> list:
+    """Draw the balance view of many chords into output_dir/<name>.svg.
+
+    Chords of the same spelled voicing, see voicing.get_voicing, look
+    the same and are drawn once.
+
+    Returns:
+        The paths of the written files.
+    """
+    if names is None:
+        names = [f"chord-{i}" for i in range(len(chords))]
+    os.makedirs(output_dir, exist_ok=True)
+    drawings = {}
+    paths = []
+    for chord, name in zip(chords, names):
+        key = get_voicing(chord, spelled=True)
+        if key not in drawings:
+            drawings[key] = render_svg(chord)
+        path = os.path.join(output_dir, f"{name}.svg")
+        with open(path, "w", encoding="utf-8") as fd:
+            fd.write(drawings[key])
+        paths.append(path)
+    return paths
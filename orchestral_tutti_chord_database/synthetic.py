@@ -0,0 +1,242 @@
+import random
+from functools import lru_cache
+
+from orchestral_tutti_chord_database.parser import ChordInfo
+from orchestral_tutti_chord_database.pitch import get_pitch
+
+
+# Kind: (lowest, highest sounding note, detection clef or None to write
+# sounding notes, interval written above sounding, most notes at once).
+INSTRUMENTS = {
+    "picc": ("D5", "C8", "tva8", "", 1),
+    "fl": ("C4", "C7", None, "", 1),
+    "ob": ("Bb3", "A6", None, "", 1),
+    "eng.hn": ("E3", "C6", "t", "5", 1),
+    "cl": ("D3", "Bb6", "t", "2", 1),
+    "b.cl": ("Db2", "F5", "t", "9", 1),
+    "bsn": ("Bb1", "E5", "bass", "", 1),
+    "c.bsn": ("Bb0", "F4", "fvb8", "", 1),
+    "hn": ("B1", "F5", "t", "5", 1),
+    "tp": ("E3", "Bb5", "t", "2", 1),
+    "tb": ("E2", "F5", "bass", "", 1),
+    "b.tb": ("Bb1", "Bb4", "bass", "", 1),
+    "tuba": ("D1", "F4", "bass", "", 1),
+    "timp": ("D2", "A3", "bass", "", 1),
+    "harp-rh": ("C4", "G7", "treble", "", 4),
+    "harp-lh": ("C1", "C5", "bass", "", 4),
+    "vln": ("G3", "E7", None, "", 2),
+    "vla": ("C3", "E6", "alto", "", 2),
+    "vc": ("C2", "A5", "bass", "", 2),
+    "cb": ("E1", "G4", "fvb8", "", 1),
+}
+# Kinds which usually hold the root in the bass.
+BASS = ("b.cl", "bsn", "c.bsn", "b.tb", "tuba", "timp", "harp-lh", "vc", "cb")
+STRINGS = (("vln", 2), ("vla", 1), ("vc", 1), ("cb", 1))
+ORCHESTRAS = {
+    "classical": (("fl", 2), ("ob", 2), ("cl", 2), ("bsn", 2), ("hn", 2))
+    + (("tp", 2), ("timp", 1))
+    + STRINGS,
+    "romantic": (("picc", 1), ("fl", 2), ("ob", 2), ("eng.hn", 1), ("cl", 2))
+    + (("b.cl", 1), ("bsn", 2), ("c.bsn", 1), ("hn", 4), ("tp", 3), ("tb", 2))
+    + (("b.tb", 1), ("tuba", 1), ("timp", 1), ("harp-rh", 1), ("harp-lh", 1))
+    + STRINGS,
+}
+COMPOSERS = (
+    ("Joseph Haydn", 1761, 1802, "classical"),
+    ("Wolfgang Amadeus Mozart", 1773, 1791, "classical"),
+    ("Ludwig van Beethoven", 1795, 1826, "classical"),
+    ("Hector Berlioz", 1830, 1869, "romantic"),
+    ("Johannes Brahms", 1855, 1896, "romantic"),
+    ("Pyotr Ilyich Tchaikovsky", 1866, 1893, "romantic"),
+    ("Antonín Dvořák", 1865, 1904, "romantic"),
+    ("Gustav Mahler", 1884, 1911, "romantic"),
+    ("Richard Strauss", 1886, 1949, "romantic"),
+    ("Jean Sibelius", 1892, 1926, "romantic"),
+    ("Sergei Prokofiev", 1916, 1952, "romantic"),
+    ("Dmitri Shostakovich", 1925, 1975, "romantic"),
+    ("Benjamin Britten", 1932, 1976, "romantic"),
+)
+GENRES = ("Symphony", "Overture", "Concerto", "Suite", "Symphonic Poem", "Serenade")
+MOVEMENTS = ("I", "II", "III", "IV")
+TEMPOS = ("Allegro", "Allegro con brio", "Presto", "Andante", "Adagio", "Maestoso")
+TONICS = ("C", "G", "D", "A", "E", "B", "F#", "F", "Bb", "Eb", "Ab", "Db")
+# Suffix of the chord symbol: intervals above the root and weight.
+QUALITIES = {
+    "": (("3", "5"), 8),
+    "m": (("b3", "5"), 5),
+    "7": (("3", "5", "b7"), 3),
+    "m7": (("b3", "5", "b7"), 1),
+    "Maj7": (("3", "5", "7"), 1),
+    "o": (("b3", "b5"), 1),
+    "sus": (("4", "5"), 1),
+}
+DYNAMICS = (("fff", 2), ("ff", 6), ("f", 4), ("sfz", 1), ("mf", 1), ("p", 1))
+TECHNIQUES = {"vln": "trem.", "vla": "trem.", "vc": "trem.", "timp": "tr"}
+
+
+def get_base_octave(clef: str) -> int:
+    """Returns the octave of unmarked notes of a detection clef."""
+    clef, *ottava = clef.split("v")
+    octave = ChordInfo.clefs[clef]
+    if ottava:
+        octave += int(ottava[0].replace("a", "").replace("b", "-")) // 8
+    return octave
+
+
+def place(rng: random.Random, name: str, low: int, high: int, target: float) -> str:
+    """Returns a pitch class name in the octave nearest a target midi number.
+
+    Args:
+        rng: The random generator, breaking ties between octaves.
+        name: The pitch class name, e.g. 'F#'.
+        low: The lowest midi number allowed.
+        high: The highest midi number allowed.
+        target: The midi number to be near.
+    """
+    # The midi number of the name in octave 0, -1 for Cb and 12 for B#.
+    base = get_pitch(name + "0").midinum
+    octave = round((target - base) / 12 + rng.uniform(-0.1, 0.1))
+    while base + 12 * octave > high:
+        octave -= 1
+    while base + 12 * octave < low:
+        octave += 1
+    return f"{name}{octave}"
+
+
+@lru_cache(maxsize=None)
+def write_note(note: str, clef: str, interval: str) -> str:
+    """Returns a sounding note as written in a detection block.
+
+    Args:
+        note: The sounding note, e.g. 'F#4'.
+        clef: The detection clef, e.g. 'bass' or 'fvb8'.
+        interval: The interval, e.g. '2', the note is written above
+            sounding, or '' for none.
+    """
+    pitch = get_pitch(note)
+    if interval:
+        pitch = pitch.transpose(interval)
+    marks = pitch.octave - get_base_octave(clef)
+    return pitch.name + ("'" * marks if marks > 0 else "," * -marks)
+
+
+def write_notes(notes: list, clef: str, interval: str) -> str:
+    """Returns sounding notes as written, see ChordInfo.parse_instrument.
+
+    Args:
+        notes: The sounding notes, e.g. ['D4', 'F#4'].
+        clef: The detection clef, or None to write the sounding notes
+            with their octave.
+        interval: The interval the notes are written above sounding.
+    """
+    if clef is None:
+        return notes[0] if len(notes) == 1 else f"<{' '.join(notes)}>"
+    written = " ".join(write_note(x, clef, interval) for x in notes)
+    return "{%s|%s}<%s>" % (clef, f"-{interval}" if interval else "", written)
+
+
+@lru_cache(maxsize=None)
+def get_tones(tonic: str, suffix: str) -> tuple:
+    """Returns the pitch class names of a chord, the root first."""
+    root = get_pitch(tonic + "4")
+    return (tonic,) + tuple(root.transpose(x).name for x in QUALITIES[suffix][0])
+
+
+def voice(rng: random.Random, kind: str, tones: tuple) -> list:
+    """Returns the sounding notes of an instrument in a chord.
+
+    Args:
+        rng: The random generator.
+        kind: The kind of the instrument, see INSTRUMENTS.
+        tones: The pitch class names of the chord, the root first.
+    """
+    lowest, highest, _, _, size = INSTRUMENTS[kind]
+    low, high = get_pitch(lowest).midinum, get_pitch(highest).midinum
+    # Tutti chords sit in the middle and upper register of an instrument.
+    target = rng.uniform(low + 0.3 * (high - low), low + 0.8 * (high - low))
+    if kind in BASS and rng.random() < 0.8:
+        tone = tones[0]
+        target -= 0.2 * (high - low)
+    else:
+        tone = rng.choice(tones)
+    notes = [place(rng, tone, low, high, target)]
+    for _ in range(rng.randint(1, size) - 1):
+        tone = tones[(tones.index(tone) + rng.randint(1, 2)) % len(tones)]
+        above = get_pitch(notes[-1]).midinum + 1
+        if above + 12 > high:
+            break
+        notes.append(place(rng, tone, above, above + 11, above))
+    return notes
+
+
+def generate_entry(seed: int, index: int) -> list:
+    """Returns the lines of a random but realistic tutti chord entry.
+
+    Every entry is generated from its own generator, seeded by seed and
+    index, so any range of a corpus is generated alike on any machine,
+    in any order and in any number of processes.
+
+    Args:
+        seed: The seed of the corpus.
+        index: The index of the entry in the corpus.
+    """
+    rng = random.Random(f"{seed}.{index}")
+    composer, first, last, orchestra = rng.choice(COMPOSERS)
+    tonic = rng.choice(TONICS)
+    suffixes = list(QUALITIES)
+    suffix = rng.choices(suffixes, [QUALITIES[x][1] for x in suffixes])[0]
+    tones = get_tones(tonic, suffix)
+    info = [
+        ("Composer", composer),
+        ("Year", rng.randint(first, last)),
+        ("Opus", rng.randint(1, 120)),
+        ("Name", f"{rng.choice(GENRES)} No. {rng.randint(1, 9)}"),
+        ("Movement", rng.choice(MOVEMENTS)),
+        ("Measure", rng.randint(1, 600)),
+        ("Key", f"{tonic} {'minor' if suffix.startswith('m') else 'major'}"),
+        ("Tempo", rng.choice(TEMPOS)),
+        ("Chord", tonic + suffix),
+    ]
+    lines = ["# Synthetic"] if rng.random() < 0.05 else []
+    for k, v in info:
+        if k in ("Composer", "Year", "Chord") or rng.random() < 0.9:
+            # Every short key is the first letter of its long key but b and h.
+            short = ChordInfo.short[ChordInfo.long.index(k.lower())]
+            lines.append(f"{short.upper() if rng.random() < 0.2 else k}: {v}")
+
+    dynamic = rng.choices(*zip(*DYNAMICS))[0]
+    fermata = rng.random() < 0.3
+    for kind, count in ORCHESTRAS[orchestra]:
+        if rng.random() < 0.1:
+            continue
+        _, _, clef, interval, _ = INSTRUMENTS[kind]
+        for player in range(1, count + 1):
+            name = kind if count == 1 else f"{kind}.{player}"
+            value = write_notes(voice(rng, kind, tones), clef, interval)
+            technique = "fermata" if fermata else ""
+            if kind in TECHNIQUES and rng.random() < 0.2:
+                technique = TECHNIQUES[kind]
+            if rng.random() < 0.9 or technique:
+                value += f"|{dynamic if rng.random() < 0.9 else 'ff'}"
+            if technique:
+                value += f"|{technique}"
+            lines.append(f"{name}: {value}")
+    return lines
+
+
+def generate(count: int, seed: int = 0, start: int = 0):
+    """Yields the lines of count entries of a corpus, see generate_entry.
+
+    Args:
+        count: The number of entries.
+        seed: The seed of the corpus.
+        start: The index of the first entry.
+    """
+    for index in range(start, start + count):
+        yield generate_entry(seed, index)
+
+
+def write_corpus(fd, count: int, seed: int = 0, start: int = 0):
+    """Write entries as text, separated by blank lines, to a file object."""
+    for i, lines in enumerate(generate(count, seed, start)):
+        fd.write(("\n" if i else "") + "\n".join(lines) + "\n")
@@ -0,0 +1,86 @@
+import os
+import time
+from contextlib import contextmanager
+
+
+def get_cpu_time() -> float:
+    """Returns the CPU time of this process and of its reaped children."""
+    times = os.times()
+    return time.process_time() + times.children_user + times.children_system
+
+
+class Stage(object):
+    """The wall and CPU time spent in a stage, and what it processed.
+
+    Attributes:
+        name: The name of the stage.
+        wall: The elapsed wall time in seconds.
+        cpu: The CPU time in seconds, including worker processes which
+            exited during the stage.
+        chords: The number of chords processed.
+        notes: The number of notes processed.
+    """
+
+    __slots__ = ["name", "wall", "cpu", "chords", "notes"]
+
+    def __init__(self, name: str):
+        self.name: str = name
+        self.wall: float = 0.0
+        self.cpu: float = 0.0
+        self.chords: int = 0
+        self.notes: int = 0
+
+    def rate(self, count: int) -> float:
+        """Returns the throughput per second of a count over the wall time."""
+        return count / self.wall if self.wall > 0 else 0.0
+
+
+class Timings(object):
+    """Times consecutive stages of a command.
+
+    Example:
+        >>> timings = Timings()
+        >>> with timings.stage("parse") as stage:
+        ...     stage.chords += 1
+    """
+
+    __slots__ = ["stages"]
+
+    def __init__(self):
+        self.stages: list = []
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block of code, yielding its Stage to count the work done."""
+        stage = Stage(name)
+        wall, cpu = time.perf_counter(), get_cpu_time()
+        try:
+            yield stage
+        finally:
+            stage.wall = time.perf_counter() - wall
+            stage.cpu = get_cpu_time() - cpu
+            self.stages.append(stage)
+
+    def total(self) -> Stage:
+        """Returns the sum of all stages, counting the most chords and notes."""
+        total = Stage("total")
+        for stage in self.stages:
+            total.wall += stage.wall
+            total.cpu += stage.cpu
+            total.chords = max(total.chords, stage.chords)
+            total.notes = max(total.notes, stage.notes)
+        return total
+
+    def report(self) -> str:
+        """Returns a table of the time and throughput of every stage."""
+        lines = [
+            f"{'stage':<10}{'wall s':>9}{'cpu s':>9}{'chords':>9}{'chords/s':>11}"
+            f"{'notes':>10}{'notes/s':>12}"
+        ]
+        for stage in self.stages + [self.total()]:
+            lines.append(
+                f"{stage.name:<10}{stage.wall:>9.3f}{stage.cpu:>9.3f}"
+                f"{stage.chords:>9}{stage.rate(stage.chords):>11.1f}"
+                f"{stage.notes:>10}{stage.rate(stage.notes):>12.1f}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,218 @@
+import hashlib
+import struct
+
+from orchestral_tutti_chord_database.balance import get_section
+from orchestral_tutti_chord_database.balance import is_forte
+from orchestral_tutti_chord_database.lazy import lazy_import
+from orchestral_tutti_chord_database.pitch import detect_root
+from orchestral_tutti_chord_database.pitch import get_pitch
+
+
+np = lazy_import("numpy")
+
+HASH_SIZE = 8
+
+
+def iter_instruments(chord):
+    """Yields the instrument tuples of a ChordInfo, list or chord dict."""
+    if isinstance(chord, dict):
+        for instruments in chord.get("sections", {}).values():
+            for x in instruments:
+                yield (x["instrument"], x.get("clef"), x["notes"], x.get("dynamic"))
+    else:
+        yield from getattr(chord, "instruments", chord)
+
+
+def get_voicing(chord, spelled: bool = False) -> tuple:
+    """Returns the canonical voicing of a chord.
+
+    The voicing is the sorted multiset of the sounding notes, each as
+    its concert-pitch midi number, the section of its instrument and
+    whether it is balanced as forte, i.e. all that the balance of the
+    chord depends on. Spelling, instrument names within a section,
+    rests and the piece information are ignored.
+
+    Args:
+        chord: A ChordInfo object, its list of instruments or its dict.
+        spelled: Whether to keep the spelling, e.g. 'F#5', instead of
+            the midi number of each note.
+
+    Returns:
+        A sorted tuple of (midinum or note, section, forte) tuples.
+    """
+    notes = []
+    for instrument in iter_instruments(chord):
+        section, forte = get_section(instrument[0]), int(is_forte(instrument[3]))
+        notes += [
+            (x if spelled else get_pitch(x).midinum, section, forte)
+            for x in instrument[2]
+            if x
+        ]
+    return tuple(sorted(notes))
+
+
+def get_root(chord) -> int:
+    """Returns the root of a chord in the register of its bass.
+
+    The root is detected from the spelled notes, see pitch.detect_root,
+    and placed in the octave at or below the lowest sounding note, so
+    transposing a chord transposes its root by the same interval.
+
+    Args:
+        chord: A ChordInfo object, its list of instruments or its dict.
+
+    Returns:
+        The midi number of the root, or None if no note sounds.
+    """
+    pitches = [
+        get_pitch(x)
+        for instrument in iter_instruments(chord)
+        for x in instrument[2]
+        if x
+    ]
+    if not pitches:
+        return None
+    root = get_pitch(detect_root([(x.name, x.midinum) for x in pitches])).index
+    bass = min(x.midinum for x in pitches)
+    return bass - (bass - root) % 12
+
+
+def get_normal_form(chord, voicing: tuple = None) -> tuple:
+    """Returns the root-relative voicing of a chord.
+
+    The normal form is the voicing, see get_voicing, with every midi
+    number replaced by its interval in semitones above the root, see
+    get_root. Transpositions of a chord share their normal form, and
+    the difference of their roots is the interval between them.
+
+    Args:
+        chord: A ChordInfo object, its list of instruments or its dict.
+        voicing: The voicing of the chord if already known.
+
+    Returns:
+        The midi number of the root, or None if no note sounds, and the
+        sorted tuple of (interval, section, forte) tuples.
+    """
+    root = get_root(chord)
+    if root is None:
+        return None, ()
+    if voicing is None:
+        voicing = get_voicing(chord)
+    return root, tuple((x - root, *rest) for x, *rest in voicing)
+
+
+def get_hash(values: bytes) -> str:
+    """Returns the stable hex digest of canonical bytes."""
+    return hashlib.blake2b(values, digest_size=HASH_SIZE).hexdigest()
+
+
+def pack_hash(voicing: tuple) -> str:
+    """Returns the hash of a voicing as little-endian 64-bit integers."""
+    values = [int(x) for note in voicing for x in note]
+    return get_hash(struct.pack(f"<{len(values)}q", *values))
+
+
+def voicing_hash(chord) -> str:
+    """Returns the stable hash of the canonical voicing of a chord.
+
+    Equal to the hashes of table_hashes.
+    """
+    return pack_hash(get_voicing(chord))
+
+
+def normal_hash(chord) -> str:
+    """Returns the stable hash of the normal form of a chord.
+
+    Equal to the hashes of table_hashes given the roots of the chords.
+    """
+    return pack_hash(get_normal_form(chord)[1])
+
+
+def pitch_hash(chord) -> str:
+    """Returns the stable hash of the distinct sounding midi numbers.
+
+    Chords sharing it but not their voicing hash are near-duplicates,
+    e.g. the same chord with a note doubled, or re-orchestrated.
+    """
+    values = sorted({x[0] for x in get_voicing(chord)})
+    return get_hash(struct.pack(f"<{len(values)}q", *values))
+
+
+def table_hashes(table, roots=None) -> list:
+    """Returns the voicing hash of every chord of a NoteTable.
+
+    Args:
+        table: A NoteTable.
+        roots: The root of every chord, see get_root, to return the
+            normal hashes instead. Chords without notes may have any.
+    """
+    midinum = table.midinum
+    if roots is not None:
+        roots = np.asarray([0 if x is None else x for x in roots], dtype=np.int64)
+        midinum = midinum - roots[table.chord]
+    order = np.lexsort((table.forte, table.section, midinum, table.chord))
+    rows = np.stack(
+        [midinum[order], table.section[order], table.forte[order]], axis=1
+    ).astype("<i8")
+    offsets = np.concatenate(
+        ([0], np.cumsum(np.bincount(table.chord, minlength=table.size)))
+    )
+    return [
+        get_hash(rows[start:end].tobytes())
+        for start, end in zip(offsets[:-1], offsets[1:])
+    ]
+
+
+def unique_voicings(table) -> tuple:
+    """Collect one chord of every distinct voicing of a NoteTable.
+
+    Analyses which only depend on the voicing, such as spacing, set
+    class and roughness, can be computed on the unique table and
+    spread back to every chord with inverse.
+
+    Returns:
+        The NoteTable of the first chord of every distinct voicing, and
+        the index in it of the voicing of every chord.
+    """
+    from orchestral_tutti_chord_database.analysis import NoteTable
+
+    first = {}
+    inverse = np.array(
+        [first.setdefault(x, len(first)) for x in table_hashes(table)], dtype=np.int64
+    )
+    representatives = np.zeros(table.size, dtype=bool)
+    representatives[np.unique(inverse, return_index=True)[1]] = True
+    rows = representatives[table.chord]
+    letter = None if table.letter is None else table.letter[rows]
+    unique = NoteTable(
+        inverse[table.chord[rows]],
+        table.midinum[rows],
+        table.section[rows],
+        len(first),
+        letter,
+        table.forte[rows],
+    )
+    return unique, inverse
+
+
+def find_duplicates(chords: list) -> tuple:
+    """Find the duplicate and near-duplicate voicings of many chords.
+
+    Args:
+        chords: A list of ChordInfo objects, instrument lists or dicts.
+
+    Returns:
+        The index of the first chord of the same voicing of every
+        duplicate, and of the same distinct pitches of every other
+        near-duplicate, as two dicts by index.
+    """
+    voicings, pitches = {}, {}
+    duplicates, near_duplicates = {}, {}
+    for i, chord in enumerate(chords):
+        voicing = voicings.setdefault(voicing_hash(chord), i)
+        pitch = pitches.setdefault(pitch_hash(chord), i)
+        if voicing != i:
+            duplicates[i] = voicing
+        elif pitch != i:
+            near_duplicates[i] = pitch
+    return duplicates, near_duplicates
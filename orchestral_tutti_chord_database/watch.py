@@ -0,0 +1,357 @@
+import asyncio
+import ctypes
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from orchestral_tutti_chord_database.database import Database
+from orchestral_tutti_chord_database.database import get_name
+from orchestral_tutti_chord_database.database import get_source
+from orchestral_tutti_chord_database.database import get_summary
+from orchestral_tutti_chord_database.parser import ChordInfo
+from orchestral_tutti_chord_database.parser import iter_entries
+
+
+EXTENSIONS = (".txt",)
+DEBOUNCE = 0.05
+POLL_INTERVAL = 0.25
+
+# From <sys/inotify.h>. Editors either rewrite a file in place, closing it
+# after writing, or write a new file and move it over the old one.
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_DELETE = 0x200
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o4000
+INOTIFY_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def parse_file(path: str, previews: bool = False) -> list:
+    """Parse every entry of a source text file, in a worker process.
+
+    Returns:
+        The name, the dict and the SVG preview, or None, of every entry.
+    """
+    with open(path, encoding="utf-8") as fd:
+        entries = []
+        for i, lines in enumerate(iter_entries(fd)):
+            name = get_name(path, i)
+            try:
+                entries.append((name, ChordInfo.parse_lines(lines)))
+            except ValueError as e:
+                raise ValueError(f"{name}: {e}") from e
+    if previews:
+        from orchestral_tutti_chord_database.svg import render_svg
+
+    return [
+        (name, chord.to_dict(), render_svg(chord) if previews else None)
+        for name, chord in entries
+    ]
+
+
+class InotifyEvents(object):
+    """Puts the names of the files changed in a directory into a queue.
+
+    Uses the inotify API of Linux through ctypes, read by the event
+    loop whenever the kernel has events, so nothing runs while idle.
+    """
+
+    __slots__ = ["directory", "queue", "fd"]
+
+    def __init__(self, directory: str, queue: asyncio.Queue):
+        self.directory: str = directory
+        self.queue: asyncio.Queue = queue
+        self.fd: int = -1
+
+    def start(self):
+        """Start watching, raising OSError where inotify is unavailable."""
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            inotify_init1, inotify_add_watch = (
+                libc.inotify_init1,
+                libc.inotify_add_watch,
+            )
+        except (AttributeError, OSError) as e:
+            raise OSError("inotify is not available.") from e
+        fd = inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed.")
+        if inotify_add_watch(fd, os.fsencode(self.directory), INOTIFY_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(errno, f"Cannot watch {self.directory}.")
+        self.fd = fd
+        asyncio.get_running_loop().add_reader(fd, self.read)
+
+    def read(self):
+        """Queue the file names of the pending events."""
+        try:
+            data = os.read(self.fd, 1 << 16)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset + INOTIFY_EVENT.size <= len(data):
+            _, _, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if name:
+                self.queue.put_nowait(os.fsdecode(name))
+
+    def close(self):
+        if self.fd >= 0:
+            asyncio.get_running_loop().remove_reader(self.fd)
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingEvents(object):
+    """Puts the names of the files changed in a directory into a queue.
+
+    The portable fallback of InotifyEvents, which compares the
+    modification time and size of every file every interval seconds.
+    """
+
+    __slots__ = ["directory", "queue", "interval", "snapshot", "task"]
+
+    def __init__(self, directory: str, queue: asyncio.Queue, interval: float):
+        self.directory: str = directory
+        self.queue: asyncio.Queue = queue
+        self.interval: float = interval
+        self.snapshot: dict = {}
+        self.task = None
+
+    def scan(self) -> dict:
+        """Returns the modification time and size of every file."""
+        snapshot = {}
+        for entry in os.scandir(self.directory):
+            if entry.is_file():
+                stat = entry.stat()
+                snapshot[entry.name] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def start(self):
+        self.snapshot = self.scan()
+        self.task = asyncio.get_running_loop().create_task(self.poll())
+
+    async def poll(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            snapshot = self.scan()
+            for name in set(snapshot) | set(self.snapshot):
+                if snapshot.get(name) != self.snapshot.get(name):
+                    self.queue.put_nowait(name)
+            self.snapshot = snapshot
+
+    def close(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+
+class Update(object):
+    """What one synchronization of changed source files did.
+
+    Attributes:
+        sources: The names of the source files synchronized.
+        saved: The names of the chords added or changed.
+        removed: The names of the chords deleted.
+        errors: The error message of every source file which failed to
+            parse, whose chords were kept as they were.
+        elapsed: The wall time in seconds.
+    """
+
+    __slots__ = ["sources", "saved", "removed", "errors", "elapsed"]
+
+    def __init__(self, sources: list):
+        self.sources: list = sources
+        self.saved: list = []
+        self.removed: list = []
+        self.errors: dict = {}
+        self.elapsed: float = 0.0
+
+
+class Watcher(object):
+    """Keeps a database in sync with a directory of source text files.
+
+    Changes are detected with inotify where available, polling
+    otherwise. A burst of changes, such as an editor saving several
+    files, is collected until no change happened for debounce seconds,
+    then only the touched files are parsed by a pool of worker
+    processes, and the chords, index and SVG previews of those files
+    are rewritten in place. Chords whose content is unchanged are not
+    rewritten.
+
+    Attributes:
+        source_dir: The directory of the source text files.
+        database: The Database kept in sync.
+        previews: The directory of the SVG previews, or None for none.
+        debounce: The quiet time in seconds which ends a burst.
+        poll_interval: The interval in seconds of polling.
+        inotify: Whether to try inotify before polling.
+        jobs: The number of worker processes, defaulting to the number
+            of cores.
+        on_update: A function called with every Update.
+        index: The index of the database, see Database.load_index.
+    """
+
+    __slots__ = [
+        "source_dir",
+        "database",
+        "previews",
+        "debounce",
+        "poll_interval",
+        "inotify",
+        "jobs",
+        "on_update",
+        "index",
+    ]
+
+    def __init__(
+        self,
+        source_dir: str,
+        database: Database,
+        previews: str = None,
+        debounce: float = DEBOUNCE,
+        poll_interval: float = POLL_INTERVAL,
+        inotify: bool = True,
+        jobs: int = None,
+        on_update=None,
+    ):
+        self.source_dir: str = source_dir
+        self.database: Database = database
+        self.previews: str = previews
+        self.debounce: float = debounce
+        self.poll_interval: float = poll_interval
+        self.inotify: bool = inotify
+        self.jobs: int = jobs
+        self.on_update = on_update
+        self.index: dict = database.load_index()
+        if previews is not None:
+            os.makedirs(previews, exist_ok=True)
+
+    @staticmethod
+    def is_source(name: str) -> bool:
+        return name.endswith(EXTENSIONS) and not name.startswith(".")
+
+    def get_mtime(self, name: str) -> int:
+        """Returns the modification time of a source file, None if deleted."""
+        try:
+            return os.stat(os.path.join(self.source_dir, name)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def stale_sources(self) -> list:
+        """List the source files changed since the index was saved."""
+        names = {x for x in os.listdir(self.source_dir) if self.is_source(x)}
+        names |= set(self.index["sources"])
+        return sorted(
+            x for x in names if self.get_mtime(x) != self.index["sources"].get(x)
+        )
+
+    def events(self, queue: asyncio.Queue):
+        """Returns the started inotify, or else polling, event source."""
+        if self.inotify:
+            events = InotifyEvents(self.source_dir, queue)
+            try:
+                events.start()
+                return events
+            except OSError:
+                pass
+        events = PollingEvents(self.source_dir, queue, self.poll_interval)
+        events.start()
+        return events
+
+    async def sync(self, sources: list, executor) -> Update:
+        """Parse source files and update the chords they define."""
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        update = Update(sources)
+        mtimes = {x: self.get_mtime(x) for x in sources}
+        present = [x for x in sources if mtimes[x] is not None]
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    executor,
+                    parse_file,
+                    os.path.join(self.source_dir, x),
+                    self.previews is not None,
+                )
+                for x in present
+            ),
+            return_exceptions=True,
+        )
+        results = dict(zip(present, results))
+        chords = self.index["chords"]
+        saved, removed = [], []
+        for source in sources:
+            entries = results.get(source, [])
+            if isinstance(entries, BaseException):
+                update.errors[source] = str(entries)
+                continue
+            stem = os.path.splitext(source)[0]
+            old = {x for x in chords if get_source(x) == stem}
+            for name, data, svg in entries:
+                old.discard(name)
+                changed = name not in self.database
+                if changed or self.database.load_dict(name) != data:
+                    saved.append((name, data))
+                    chords[name] = get_summary(data)
+                    update.saved.append(name)
+                    changed = True
+                preview = self.get_preview(name)
+                if svg is not None and (changed or not os.path.exists(preview)):
+                    with open(preview, "w", encoding="utf-8") as fd:
+                        fd.write(svg)
+            for name in sorted(old):
+                removed.append(name)
+                del chords[name]
+                preview = self.get_preview(name)
+                if preview is not None and os.path.exists(preview):
+                    os.remove(preview)
+                update.removed.append(name)
+            if mtimes[source] is None:
+                self.index["sources"].pop(source, None)
+            else:
+                self.index["sources"][source] = mtimes[source]
+        # The index is saved once, with the source modification times.
+        self.database.save_many(saved, index=False)
+        self.database.remove_many(removed, index=False)
+        self.database.save_index(self.index)
+        update.elapsed = time.perf_counter() - start
+        if self.on_update is not None:
+            self.on_update(update)
+        return update
+
+    def get_preview(self, name: str) -> str:
+        """Returns the path of the SVG preview of a chord, None if disabled."""
+        if self.previews is None:
+            return None
+        return os.path.join(self.previews, f"{name}.svg")
+
+    async def run(self):
+        """Synchronize stale sources, then watch until cancelled."""
+        queue = asyncio.Queue()
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            events = self.events(queue)
+            try:
+                stale = self.stale_sources()
+                if stale:
+                    await self.sync(stale, executor)
+                while True:
+                    touched = {await queue.get()}
+                    while True:
+                        try:
+                            touched.add(
+                                await asyncio.wait_for(queue.get(), self.debounce)
+                            )
+                        except asyncio.TimeoutError:
+                            break
+                    touched = sorted(x for x in touched if self.is_source(x))
+                    if touched:
+                        await self.sync(touched, executor)
+            finally:
+                events.close()
@@ -24,6 +24,9 @@ setup(
     long_description=read("README.rst"),
     packages=find_packages(exclude=("tests",)),
     install_requires=[],
+    entry_points={
+        "console_scripts": ["otcd=orchestral_tutti_chord_database.cli:main"]
+    },
     classifiers=[
         "Development Status :: 2 - Pre-Alpha",
         "License :: OSI Approved :: MIT License",
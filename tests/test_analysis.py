@@ -0,0 +1,131 @@
+import numpy as np
+import pytest
+from orchestral_tutti_chord_database import analysis
+from orchestral_tutti_chord_database.analysis import NoteTable
+from orchestral_tutti_chord_database.parser import ChordInfo
+
+
+@pytest.mark.parametrize(
+    "instrument, section",
+    [
+        pytest.param("picc.", "woodwind", id="Piccolo"),
+        pytest.param("bass clarinet", "woodwind", id="Bass_clarinet"),
+        pytest.param("bassoons", "woodwind", id="Bassoons"),
+        pytest.param("cor anglais", "woodwind", id="Cor_anglais"),
+        pytest.param("horns", "horn", id="Horns"),
+        pytest.param("cornet", "brass", id="Cornet"),
+        pytest.param("bass trombone", "brass", id="Bass_trombone"),
+        pytest.param("vln.I", "string", id="Violin_I"),
+        pytest.param("bass", "string", id="Bass"),
+        pytest.param("harp-rh", "other", id="Harp"),
+    ],
+)
+def test_get_section(instrument, section):
+    assert analysis.SECTIONS[analysis.get_section(instrument)] == section
+
+
+@pytest.fixture
+def chords():
+    first = [
+        ChordInfo.parse_instrument("flute", "<F#5 A5>|fff"),
+        ChordInfo.parse_instrument("vln.I", "{tva8|}<D D'>"),
+        ChordInfo.parse_instrument("bass", "{fvb8|}<D D'>"),
+        ChordInfo.parse_instrument("harp-rh", "||fermata"),
+    ]
+    second = [
+        ChordInfo.parse_instrument("horns", "<C4 E4 G4 C3>|ff"),
+    ]
+    return [first, [], second]
+
+
+class TestNoteTable:
+    def test_from_chords(self, chords):
+        table = NoteTable.from_chords(chords)
+        assert table.size == 3
+        assert len(table) == 10
+        assert table.chord.tolist() == [0] * 6 + [2] * 4
+        assert table.midinum.tolist() == [66, 69, 62, 74, 14, 26, 48, 52, 55, 36]
+        assert table.offsets().tolist() == [0, 6, 6, 10]
+
+    def test_from_chord_info(self, chords):
+        obj = ChordInfo()
+        obj.instruments = chords[0]
+        assert NoteTable.from_chords([obj]).midinum.tolist() == [66, 69, 62, 74, 14, 26]
+
+    def test_weights(self, chords):
+        table = NoteTable.from_chords(chords)
+        assert table.weights().tolist() == [1, 1, 2, 2, 2, 2, 2, 2, 2, 2]
+        table.forte[:] = False
+        assert table.weights().tolist() == [1] * 10
+
+    def test_letter(self, chords):
+        table = NoteTable.from_chords(chords)
+        assert table.letter.tolist() == [3, 5, 1, 1, 1, 1, 0, 2, 4, 0]
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 256])
+    def test_iter_pairs(self, chords, chunk_size):
+        table = NoteTable.from_chords(chords)
+        pairs = [
+            (table.chord[lower], table.midinum[lower], table.midinum[upper])
+            for chunk in table.iter_pairs(chunk_size)
+            for lower, upper in zip(*chunk)
+        ]
+        assert len(pairs) == 15 + 6
+        assert all(low <= high for _, low, high in pairs)
+        assert sorted(x[1:] for x in pairs if x[0] == 2) == [
+            (36, 48),
+            (36, 52),
+            (36, 55),
+            (48, 52),
+            (48, 55),
+            (52, 55),
+        ]
+
+
+class TestSpacing:
+    def test_sorted(self, chords):
+        result = analysis.analyze_spacing(NoteTable.from_chords(chords))
+        assert len(result) == 3
+        assert result.chord(0)["midinum"].tolist() == [14, 26, 62, 66, 69, 74]
+        assert result.chord(1)["midinum"].tolist() == []
+        assert result.chord(2)["midinum"].tolist() == [36, 48, 52, 55]
+
+    def test_spacing(self, chords):
+        result = analysis.analyze_spacing(NoteTable.from_chords(chords))
+        assert result.chord(0)["spacing"].tolist() == [12, 36, 4, 3, 5]
+        assert result.chord(1)["spacing"].tolist() == []
+        assert result.chord(2)["spacing"].tolist() == [12, 4, 3]
+
+    def test_wide_gaps_in_middle_register(self):
+        table = NoteTable([0, 0, 0, 1, 1], [10, 40, 60, 36, 49], [3] * 5)
+        result = analysis.analyze_spacing(table)
+        assert result.wide.tolist() == [False, True, True]
+        assert result.wide_count.tolist() == [1, 1]
+
+    def test_doubling(self, chords):
+        result = analysis.analyze_spacing(NoteTable.from_chords(chords))
+        assert result.doubling.shape == (3, len(analysis.SECTIONS), 12)
+        string = analysis.SECTIONS.index("string")
+        horn = analysis.SECTIONS.index("horn")
+        assert result.doubling[0, string, 2] == 4
+        assert result.doubling[0].sum() == 6
+        assert not result.doubling[1].any()
+        assert result.doubling[2, horn, 0] == 2
+        assert np.array_equal(
+            result.doubling[2].sum(axis=0), [2, 0, 0, 0, 1, 0, 0, 1, 0, 0, 0, 0]
+        )
+
+
+@pytest.mark.parametrize(
+    "dynamic, forte",
+    [
+        pytest.param(None, True, id="unmarked"),
+        pytest.param("fff", True, id="fff"),
+        pytest.param("mf", True, id="mf"),
+        pytest.param("sfz", True, id="sfz"),
+        pytest.param("mp", False, id="mp"),
+        pytest.param("pp", False, id="pp"),
+    ],
+)
+def test_is_forte(dynamic, forte):
+    assert analysis.is_forte(dynamic) == forte
@@ -0,0 +1,72 @@
+import copy
+import json
+
+import pytest
+from orchestral_tutti_chord_database import benchmark
+
+
+@pytest.fixture(scope="module")
+def report():
+    return benchmark.run_benchmark([20, 60], seed=1, previews=5, isolate=False)
+
+
+def test_report(report):
+    assert report["version"] == benchmark.REPORT_VERSION
+    assert [x["size"] for x in report["runs"]] == [20, 60]
+    for run in report["runs"]:
+        assert list(run["stages"]) == list(benchmark.STAGES)
+        stages = run["stages"]
+        counted = [x["chords"] for k, x in stages.items() if k != "render"]
+        assert counted == [run["size"]] * (len(stages) - 1)
+        assert stages["render"]["chords"] == 5
+        assert 0 < stages["render"]["notes"] < stages["parse"]["notes"]
+        assert run["total"]["wall"] == pytest.approx(
+            sum(x["wall"] for x in stages.values()), abs=1e-5
+        )
+        assert run["peak_rss"] > 2**20
+    assert set(report["scaling"]) == set(benchmark.STAGES) | {"total"}
+    assert json.loads(json.dumps(report)) == report
+
+
+def test_isolated():
+    run = benchmark.run_benchmark([10], previews=0)["runs"][0]
+    assert run["stages"]["parse"]["chords"] == 10
+    assert run["stages"]["render"]["chords"] == 0
+
+
+@pytest.mark.parametrize(
+    "runs, exponent",
+    [
+        pytest.param([(10, 1.0), (100, 10.0), (1000, 100.0)], 1.0, id="Linear"),
+        pytest.param([(10, 1.0), (100, 100.0)], 2.0, id="Quadratic"),
+        pytest.param([(10, 1.0), (10, 2.0)], None, id="OneSize"),
+    ],
+)
+def test_scaling(runs, exponent):
+    runs = [
+        {"size": size, "stages": {"parse": {"wall": wall}}, "total": {"wall": wall}}
+        for size, wall in runs
+    ]
+    assert benchmark.get_scaling(runs).get("parse") == exponent
+
+
+def slower(report, stage, factor):
+    report = copy.deepcopy(report)
+    for run in report["runs"]:
+        metrics = run["stages"][stage]
+        metrics["wall"] = max(metrics["wall"], benchmark.MIN_WALL) * factor
+        metrics["rate"] = metrics["chords"] / metrics["wall"]
+    return report
+
+
+def test_compare(report):
+    assert all(x[-1] for x in benchmark.compare(report, report))
+    baseline = slower(report, "parse", 1)
+    rows = benchmark.compare(slower(report, "parse", 2), baseline)
+    assert [x[:2] for x in rows if not x[-1]] == [(20, "parse"), (60, "parse")]
+    assert all(x[-1] for x in benchmark.compare(slower(report, "parse", 1.1), baseline))
+    assert not all(x[-1] for x in benchmark.compare(report, baseline, threshold=-0.5))
+    table = benchmark.format_comparison(benchmark.compare(report, baseline, -0.5))
+    assert "FAIL" in table
+    with pytest.raises(ValueError):
+        benchmark.compare(report, dict(report, version=0))
@@ -0,0 +1,57 @@
+import os
+
+import pytest
+from orchestral_tutti_chord_database.cache import RenderCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return RenderCache(str(tmp_path / "cache"), max_size=100)
+
+
+@pytest.fixture
+def output(tmp_path):
+    path = tmp_path / "output"
+    path.mkdir()
+    return path
+
+
+def test_get_key():
+    key = RenderCache.get_key("<c' e' g'>1", {"formats": ["pdf"]}, "2.20.0")
+    assert len(key) == 64
+    assert key == RenderCache.get_key("<c' e' g'>1", {"formats": ["pdf"]}, "2.20.0")
+    assert key != RenderCache.get_key("<c' e' g'>1", {"formats": ["svg"]}, "2.20.0")
+    assert key != RenderCache.get_key("<c' e' g'>1", {"formats": ["pdf"]}, "2.22.0")
+    assert key != RenderCache.get_key("<c' e'>1", {"formats": ["pdf"]}, "2.20.0")
+
+
+def test_store_and_fetch(cache, output):
+    (output / "a.pdf").write_bytes(b"pdf")
+    (output / "a.svg").write_bytes(b"svg")
+    assert not cache.fetch("abc", ["pdf"], str(output), "b")
+    cache.store("abc", ["pdf", "svg"], str(output), "a")
+    assert cache.has("abc", ["pdf", "svg"])
+    assert not cache.has("abc", ["pdf", "png"])
+    assert cache.fetch("abc", ["pdf", "svg"], str(output), "b")
+    assert (output / "b.pdf").read_bytes() == b"pdf"
+    assert cache.size() == 6
+
+
+def test_evict_least_recently_used(cache, output):
+    for i, key in enumerate(["aa", "bb", "cc"]):
+        (output / f"{key}.pdf").write_bytes(b"x" * 40)
+        cache.store(key, ["pdf"], str(output), key)
+        os.utime(cache.get_path(key, "pdf"), (i, i))
+    cache.fetch("aa", ["pdf"], str(output), "aa")
+    cache.evict()
+    assert cache.size() == 80
+    assert cache.has("aa", ["pdf"])
+    assert not cache.has("bb", ["pdf"])
+    assert cache.has("cc", ["pdf"])
+
+
+def test_clear(cache, output):
+    cache.store_text("abc", "ly", "\\book {}")
+    assert cache.size() == 8
+    cache.clear()
+    assert cache.size() == 0
@@ -0,0 +1,97 @@
+import pytest
+from orchestral_tutti_chord_database.catalog import Catalog
+from orchestral_tutti_chord_database.database import open_database
+from orchestral_tutti_chord_database.parser import ChordInfo
+from orchestral_tutti_chord_database.sqlitedb import SQLiteDatabase
+
+
+ENTRIES = {
+    "britten.0": [
+        "Composer: Benjamin Britten",
+        "Year: 1945",
+        "Opus: 33",
+        "Chord: D",
+        "flute: <F#5 A5>|fff",
+        "trumpets: <D5 F#5>|fff",
+    ],
+    "mahler.0": ["Composer: Gustav Mahler", "Year: 1888", "Chord: C", "ob: <C5 E5 G5>"],
+    "unknown.0": ["Chord: Cm", "vc: <C3 Eb3 G3>", "harp: ||fermata"],
+}
+
+
+@pytest.fixture(params=["db", "chords.sqlite"], ids=["JSON", "SQLite"])
+def database(request, tmp_path, monkeypatch):
+    database = open_database(str(tmp_path / request.param))
+    database.save_many(
+        (k, ChordInfo.parse_lines(v).to_dict()) for k, v in ENTRIES.items()
+    )
+    database.update_index({})
+
+    def fail(*args):
+        raise AssertionError("Notes loaded for metadata.")
+
+    # Every note loaded goes through iter_dicts, except the index.
+    monkeypatch.setattr(type(database), "iter_dicts", fail)
+    return database
+
+
+def test_metadata(database):
+    catalog = Catalog(database)
+    assert catalog.names == list(ENTRIES)
+    assert len(catalog) == 3 and "mahler.0" in catalog
+    britten = catalog.get("britten.0")
+    assert britten["composer"] == "Britten,_Benjamin"
+    assert britten["opus"] == 33
+    assert (britten["notes"], britten["mask"]) == (4, (1 << 2) | (1 << 6) | (1 << 9))
+    assert catalog.get("unknown.0")["notes"] == 3
+    assert catalog.columns["year"] == [1945, 1888, None]
+
+
+@pytest.mark.parametrize(
+    "filters, names",
+    [
+        pytest.param({}, list(ENTRIES), id="All"),
+        pytest.param({"composer": "MAHLER"}, ["mahler.0"], id="Composer"),
+        pytest.param({"chord": "Cm"}, ["unknown.0"], id="Chord"),
+        pytest.param({"since": 1900}, ["britten.0"], id="Since"),
+        pytest.param({"until": 1900}, ["mahler.0"], id="Until"),
+        pytest.param(
+            {"forte": "3-11", "since": 1800}, ["britten.0", "mahler.0"], id="Forte"
+        ),
+        pytest.param({"forte": "4-20"}, [], id="Nothing"),
+    ],
+)
+def test_query(database, filters, names):
+    assert Catalog(database).query(**filters) == names
+
+
+def test_saved_and_removed(database):
+    chord = ChordInfo.parse_lines(["Composer: Gustav Mahler", "Chord: G", "ob: G5"])
+    database.save("mahler.1", chord)
+    database.remove("britten.0")
+    catalog = Catalog(database)
+    assert catalog.names == ["mahler.0", "mahler.1", "unknown.0"]
+    assert catalog.query(composer="mahler") == ["mahler.0", "mahler.1"]
+    assert catalog.get("mahler.1")["notes"] == 1
+
+
+def test_load_on_demand(database, monkeypatch):
+    catalog = Catalog(database)
+    monkeypatch.undo()
+    assert catalog.load("mahler.0")["sections"]["woodwind"][0]["notes"] == [
+        "C5",
+        "E5",
+        "G5",
+    ]
+    loaded = dict(catalog.iter_dicts(["britten.0", "unknown.0"]))
+    assert list(loaded) == ["britten.0", "unknown.0"]
+    with pytest.raises(KeyError):
+        catalog.load("missing.0")
+
+
+def test_sqlite_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr("orchestral_tutti_chord_database.sqlitedb.MAX_PARAMETERS", 2)
+    chords = {k: ChordInfo.parse_lines(v).to_dict() for k, v in ENTRIES.items()}
+    database = SQLiteDatabase(str(tmp_path / "chords.db"))
+    database.save_many(chords.items())
+    assert dict(database.iter_dicts(list(ENTRIES))) == chords
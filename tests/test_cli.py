@@ -0,0 +1,273 @@
+import io
+import json
+import os
+import sys
+
+import pytest
+from orchestral_tutti_chord_database import cli
+from orchestral_tutti_chord_database.database import Database
+from orchestral_tutti_chord_database.database import open_database
+
+
+TEXT = """# Two tutti chords
+Composer: Benjamin Britten
+Year: 1945
+Chord: D
+flute: <F#5 A5>|fff
+trumpets: <D5 F#5>|fff
+bass: {fvb8|}<D D'>|ff
+
+Composer: Someone Else
+Year: 1900
+H: C
+oboe: <C5 E5 G5>|p
+cello: <C3 G3>|p
+"""
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "tutti.txt"
+    path.write_text(TEXT)
+    return str(path)
+
+
+def run(capsys, *argv, stdin=None, monkeypatch=None):
+    if stdin is not None:
+        monkeypatch.setattr(sys, "stdin", io.StringIO(stdin))
+    assert cli.main(list(argv)) == 0
+    captured = capsys.readouterr()
+    return [json.loads(x) for x in captured.out.splitlines()], captured.err
+
+
+@pytest.mark.parametrize(
+    "jobs", [pytest.param("1", id="Serial"), pytest.param("2", id="Parallel")]
+)
+def test_parse(capsys, source, jobs):
+    records, _ = run(capsys, "parse", source, "--jobs", jobs)
+    assert [x["id"] for x in records] == ["tutti.0", "tutti.1"]
+    assert records[0]["composer"] == "Britten,_Benjamin"
+    assert records[0]["sections"]["string"][0]["notes"] == ["D1", "D2"]
+
+
+def test_parse_stdin(capsys, monkeypatch):
+    records, _ = run(capsys, "parse", stdin=TEXT, monkeypatch=monkeypatch)
+    assert [x["id"] for x in records] == ["stdin.0", "stdin.1"]
+
+
+def test_parse_error(capsys, monkeypatch):
+    monkeypatch.setattr(sys, "stdin", io.StringIO("Chord: D\nflute <D5>\n"))
+    assert cli.main(["parse"]) == 1
+    assert "stdin.0: Expected 'key: value'" in capsys.readouterr().err
+
+
+def test_timings(capsys, source):
+    _, err = run(capsys, "parse", source, "--timings")
+    lines = err.splitlines()
+    assert lines[0].split()[0] == "stage"
+    assert lines[1].split()[0] == "parse"
+    assert lines[1].split()[3] == "2"
+    assert lines[1].split()[5] == "11"
+
+
+@pytest.mark.parametrize(
+    "jobs", [pytest.param("1", id="Serial"), pytest.param("2", id="Parallel")]
+)
+def test_build_and_analyze(capsys, tmp_path, source, jobs):
+    db = str(tmp_path / "db")
+    run(capsys, "build", db, source)
+    assert Database(db).names() == ["tutti.0", "tutti.1"]
+    results, _ = run(capsys, "analyze", "--db", db, "-j", jobs)
+    assert [x["id"] for x in results] == ["tutti.0", "tutti.1"]
+    assert [x["forte"] for x in results] == ["3-11", "3-11"]
+    assert [x["notes"] for x in results] == [6, 5]
+    assert all(0 < x["harmonicity"] <= 1 for x in results)
+    assert all(len(x["voicing"]) == 16 for x in results)
+    assert [x["root"] for x in results] == [14, 36]
+
+
+@pytest.mark.parametrize(
+    "options, ids",
+    [
+        pytest.param(["--composer", "britten"], ["tutti.0"], id="Composer"),
+        pytest.param(["--until", "1920"], ["tutti.1"], id="Until"),
+        pytest.param(["--instrument", "trump"], ["tutti.0"], id="Instrument"),
+        pytest.param(["--forte", "3-11"], ["tutti.0", "tutti.1"], id="Forte"),
+        pytest.param(["--chord", "C", "--since", "1945"], [], id="Nothing"),
+    ],
+)
+def test_query(capsys, tmp_path, source, options, ids):
+    db = str(tmp_path / "db")
+    run(capsys, "build", db, source)
+    assert cli.main(["query", "--db", db, "--ids"] + options) == 0
+    assert capsys.readouterr().out.split() == ids
+
+
+@pytest.mark.parametrize(
+    "duplicates, names, warnings",
+    [
+        pytest.param("keep", ["a.0", "a.1", "a.2", "a.3"], 0, id="Keep"),
+        pytest.param("warn", ["a.0", "a.1", "a.2", "a.3"], 2, id="Warn"),
+        pytest.param("skip", ["a.0", "a.2", "a.3"], 2, id="Skip"),
+    ],
+)
+def test_build_duplicates(capsys, tmp_path, duplicates, names, warnings):
+    chord = "Composer: Britten\nflute: <D5 A5>|f\n"
+    text = "\n".join(
+        [
+            chord,
+            chord.replace("D5", "Ebb5"),
+            "Composer: Walton\nflute: <D5 A5>|f\n",
+            chord.replace("flute", "violin"),
+        ]
+    )
+    path = tmp_path / "a.txt"
+    path.write_text(text)
+    db = str(tmp_path / "db")
+    _, err = run(capsys, "build", db, str(path), "--duplicates", duplicates)
+    assert Database(db).names() == names
+    assert err.count("duplicate voicing: ") == warnings
+    assert err.count("near-duplicate pitches: a.3 of a.0") == min(warnings, 1)
+
+
+def test_render_svg(capsys, tmp_path, source, monkeypatch):
+    records, _ = run(capsys, "parse", source)
+    stdin = "".join(json.dumps(x) + "\n" for x in records)
+    output = tmp_path / "out"
+    run(capsys, "render", "-o", str(output), stdin=stdin, monkeypatch=monkeypatch)
+    assert sorted(x.name for x in output.iterdir()) == ["tutti.0.svg", "tutti.1.svg"]
+
+
+def test_render_svg_streams(capsys, tmp_path, source, monkeypatch):
+    records, _ = run(capsys, "parse", source)
+    stdin = "".join(json.dumps(x) + "\n" for x in records * 3)
+    read, rendered = [], []
+    chunked, iter_records = cli.chunked, cli.iter_records
+
+    def counted(args):
+        for record in iter_records(args):
+            read.append(record["id"])
+            yield record
+
+    def render_chunk(chunk, output_dir):
+        # Every chunk is rendered once read, not after the whole input.
+        rendered.append(len(read))
+        return [x["id"] for x in chunk]
+
+    monkeypatch.setattr(cli, "chunked", lambda x: chunked(x, 2))
+    monkeypatch.setattr(cli, "iter_records", counted)
+    monkeypatch.setattr(cli, "render_chunk", render_chunk)
+    output = str(tmp_path / "out")
+    run(capsys, "render", "-o", output, stdin=stdin, monkeypatch=monkeypatch)
+    assert rendered == [2, 4, 6]
+
+
+def test_build_same_stem(capsys, tmp_path, source):
+    other = tmp_path / "other"
+    other.mkdir()
+    (other / os.path.basename(source)).write_text("Chord: C\nflute: C5\n")
+    db = str(tmp_path / "db")
+    assert cli.main(["build", db, source, str(other / os.path.basename(source))]) == 1
+    assert "would name their chords alike" in capsys.readouterr().err
+    assert Database(db).names() == []
+
+
+def test_render_lilypond(capsys, tmp_path, source, monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        "orchestral_tutti_chord_database.lilypond.run_lilypond",
+        lambda path, *args: calls.append((path,) + args),
+    )
+    db = str(tmp_path / "db")
+    run(capsys, "build", db, source)
+    output = str(tmp_path / "out")
+    run(capsys, "render", "--db", db, "-o", output, "--engine", "lilypond")
+    assert len(calls) == 1
+    assert calls[0][1:3] == (output, ["pdf"])
+
+
+def test_generate(capsys, monkeypatch):
+    assert cli.main(["generate", "5", "--seed", "2", "-j", "2"]) == 0
+    text = capsys.readouterr().out
+    assert cli.main(["generate", "3", "--seed", "2", "--start", "2"]) == 0
+    assert text.endswith(capsys.readouterr().out)
+    records, _ = run(capsys, "parse", stdin=text, monkeypatch=monkeypatch)
+    assert len(records) == 5
+
+
+def test_invalid_jobs(capsys):
+    with pytest.raises(SystemExit):
+        cli.main(["parse", "--jobs", "-1"])
+    assert "Expected 0 or more jobs" in capsys.readouterr().err
+
+
+def test_profile(capsys, source):
+    _, err = run(capsys, "parse", source, "--profile")
+    assert "ChordInfo.parse_line" in err
+    assert "get_pitch" in err
+
+
+def test_sqlite(capsys, tmp_path, source):
+    db = str(tmp_path / "db")
+    sqlite = str(tmp_path / "chords.sqlite")
+    run(capsys, "build", db, source)
+    run(capsys, "build", sqlite, "--from", db)
+    assert dict(Database(db)) == dict(open_database(sqlite))
+    results, _ = run(capsys, "analyze", "--db", sqlite)
+    assert [x["forte"] for x in results] == ["3-11", "3-11"]
+
+
+def test_benchmark(capsys, tmp_path):
+    baseline = str(tmp_path / "baseline.json")
+    args = ["benchmark", "--sizes", "10", "20", "--previews", "2"]
+    assert cli.main(args + ["-o", baseline]) == 0
+    assert "slowest stage" in capsys.readouterr().err
+    with open(baseline) as fd:
+        assert [x["size"] for x in json.load(fd)["runs"]] == [10, 20]
+    assert cli.main(args + ["--baseline", baseline, "--threshold", "100"]) == 0
+    out, err = capsys.readouterr()
+    assert json.loads(out)["runs"][0]["stages"]["render"]["chords"] == 2
+    assert "baseline" in err
+    assert cli.main(args + ["--baseline", baseline, "--threshold", "-2"]) == 1
+    assert "regressed" in capsys.readouterr().err
+
+
+def test_import(capsys, tmp_path, monkeypatch):
+    from tests.test_midi import orchestra
+
+    path = tmp_path / "finale.mid"
+    path.write_bytes(orchestra().getvalue())
+    args = ["import", str(path), "--bar", "2", "--bar", "5"]
+    assert cli.main(args + ["--info", "Composer: Gustav Mahler", "-j", "2"]) == 0
+    text = capsys.readouterr().out
+    assert text.startswith(f"# {path}\nComposer: Gustav Mahler\nName: Finale\n")
+    records, _ = run(capsys, "parse", stdin=text, monkeypatch=monkeypatch)
+    assert [(x["measure"], x["key"]) for x in records] == [
+        (2, "D major"),
+        (5, "C minor"),
+    ]
+    assert records[0]["sections"]["string"][0]["notes"] == ["D5", "F#5"]
+    assert cli.main(args + ["--info", "Allegro"]) == 1
+    assert "Expected 'key: value'" in capsys.readouterr().err
+    assert cli.main(["import", str(tmp_path / "finale.txt")]) == 1
+    assert "Expected a .mid" in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        cli.main(["import", str(path), "--bar", "0"])
+    assert "Expected a bar from 1" in capsys.readouterr().err
+    path.write_bytes(orchestra().getvalue()[:-20])
+    assert cli.main(["import", str(path)]) == 1
+    assert f"{path}: Truncated" in capsys.readouterr().err
+
+
+def test_import_musicxml(capsys, tmp_path):
+    from tests.test_musicxml import score
+
+    path = tmp_path / "finale.musicxml"
+    path.write_bytes(score())
+    assert cli.main(["import", str(path), "--bar", "1"]) == 0
+    text = capsys.readouterr().out
+    assert "Measure: 1\nKey: D major\nFlute 1: A5|ff\n" in text
+    assert "cello: {bass|}<D D'>|mf\n" in text
+    path.write_bytes(b"<score-partwise>")
+    assert cli.main(["import", str(path)]) == 1
+    assert f"{path}: no element found" in capsys.readouterr().err
@@ -1,7 +1,13 @@
+import numpy as np
 import pytest
 from orchestral_tutti_chord_database.color import (
+    clear_swatch_cache,
+    hex_colors,
+    make_swatch_grid,
     make_swatches,
+    note_colors,
     pitch_class_index_to_hue,
+    swatch_cache_info,
 )
 
 
@@ -37,6 +43,26 @@ def test_make_swatches_hex():
     ]
 
 
+@pytest.mark.parametrize(
+    "rgb, result",
+    [
+        pytest.param([0, 0, 0], "#000000", id="black"),
+        pytest.param([255, 255, 255], "#FFFFFF", id="white"),
+        pytest.param([121, 116, 202], "#7974CA", id="purple"),
+        pytest.param([1, 16, 171], "#0110AB", id="leading_zero"),
+    ],
+)
+def test_hex_colors(rgb, result):
+    assert hex_colors([rgb]).tolist() == [result]
+
+
+def test_hex_colors_shape():
+    colors = np.zeros((4, 2, 3), dtype=np.uint8)
+    assert hex_colors(colors).shape == (4, 2)
+    with pytest.raises(ValueError, match="Expected RGB"):
+        hex_colors(np.zeros((4, 2)))
+
+
 def test_note_to_color():
     assert [
         make_swatches(
@@ -65,6 +91,31 @@ def test_note_to_color():
     ]
 
 
+def test_note_colors():
+    midinums = np.array([[48, 49], [60, 71]])
+    colors = note_colors(midinums, [[0.0, 0.5], [1.0, 2.0]], buckets=3)
+    assert colors.shape == (2, 2, 3)
+    for midinum, weight, index in [(48, 0.0, 0), (49, 0.5, 1), (60, 1.0, 2)]:
+        palette = make_swatches(
+            start=pitch_class_index_to_hue(midinum),
+            rotations=0,
+            numbers=3,
+            min_sat=1,
+            max_sat=2,
+            min_light=0.2,
+            max_light=0.9,
+            reverse=True,
+        )
+        assert (colors[midinums == midinum][0] == palette[index]).all()
+    assert (colors[1, 1] == note_colors([11], [1.0], buckets=3)[0]).all()
+
+
+def test_note_colors_hex():
+    colors = note_colors(np.arange(12), np.full(12, 0.5), hex=True)
+    assert colors.shape == (12,)
+    assert all(x.startswith("#") and len(x) == 7 for x in colors)
+
+
 def test_color_float():
     scheme = make_swatches(
         start=pitch_class_index_to_hue(0),
@@ -100,3 +151,58 @@ def test_d():
     # print(make_swatches(start=pitch_class_index_to_hue(i), rotations=0.75, numbers=3, min_sat=1, max_sat=2, min_light=0.2, max_light=0.9, float=True)[1])
     # print([tuple(x) for x in make_swatches(start=pitch_class_index_to_hue(2), rotations=0.75, numbers=17, min_sat=1, max_sat=2, min_light=0.2, max_light=0.9,float=True)])
     assert 0
+
+
+def test_make_swatches_cache():
+    clear_swatch_cache()
+    first = make_swatches(start=1, numbers=5)
+    second = make_swatches(start=1.0, numbers=5.0, max_sat=1.2)
+    assert first is second
+    assert swatch_cache_info().hits == 1
+    assert swatch_cache_info().misses == 1
+    with pytest.raises(ValueError):
+        first[0, 0] = 1
+
+
+def test_make_swatches_cache_clipped_key():
+    clear_swatch_cache()
+    assert make_swatches(start=5, numbers=3) is make_swatches(start=3, numbers=3)
+
+
+def test_make_swatches_hex_copy():
+    first = make_swatches(numbers=3, hex=True)
+    first.append("#000000")
+    assert len(make_swatches(numbers=3, hex=True)) == 3
+
+
+def test_make_swatch_grid():
+    hues = [pitch_class_index_to_hue(i) for i in range(12)]
+    grid = make_swatch_grid(
+        start=np.array(hues)[:, None],
+        max_light=[0.8, 1.0],
+        numbers=3,
+        min_sat=1,
+        max_sat=2,
+        reverse=True,
+    )
+    assert grid.shape == (12, 2, 3, 3)
+    for i, hue in enumerate(hues):
+        for j, max_light in enumerate([0.8, 1.0]):
+            assert (
+                grid[i, j]
+                == make_swatches(
+                    start=hue,
+                    max_light=max_light,
+                    numbers=3,
+                    min_sat=1,
+                    max_sat=2,
+                    reverse=True,
+                )
+            ).all()
+
+
+def test_make_swatch_grid_hex():
+    grid = make_swatch_grid(start=[2, 0.5], numbers=3, reverse=True, hex=True)
+    assert grid.shape == (2, 3)
+    assert grid[0].tolist() == ["#FFFFFF", "#7974CA", "#000000"]
+    assert grid[1].tolist() == make_swatches(numbers=3, reverse=True, hex=True)
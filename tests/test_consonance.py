@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+from orchestral_tutti_chord_database import consonance
+from orchestral_tutti_chord_database.analysis import NoteTable
+from orchestral_tutti_chord_database.parser import ChordInfo
+from orchestral_tutti_chord_database.pitch import Pitch
+
+
+class TestIntervalRatios:
+    @pytest.mark.parametrize(
+        "lower, upper, ratio",
+        [
+            pytest.param("C4", "C4", 1, id="unison"),
+            pytest.param("C4", "C5", 1, id="octave"),
+            pytest.param("C4", "G4", 3 / 2, id="5"),
+            pytest.param("C4", "G6", 3 / 2, id="compound_5"),
+            pytest.param("A3", "C4", 6 / 5, id="b3"),
+            pytest.param("C4", "F#4", 25 / 18, id="#4"),
+            pytest.param("C4", "Gb4", 36 / 25, id="b5"),
+            pytest.param("C4", "D#4", 75 / 64, id="#2"),
+            pytest.param("C#4", "Bb4", 5 / 3, id="bb7==6"),
+        ],
+    )
+    def test_spelled(self, lower, upper, ratio):
+        pitches = [Pitch(lower), Pitch(upper)]
+        result, _, _ = consonance.interval_ratios(
+            pitches[0].midinum,
+            pitches[1].midinum,
+            pitches[0].pitch_class_index,
+            pitches[1].pitch_class_index,
+        )
+        assert result == pytest.approx(ratio)
+
+    def test_unspelled(self):
+        ratio, cents, harmonicity = consonance.interval_ratios([0, 0, 0], [6, 7, 15])
+        assert ratio == pytest.approx([25 / 18, 3 / 2, 6 / 5])
+        assert cents == pytest.approx([-31.28, 1.96, 15.64], abs=0.01)
+        assert harmonicity[1] == pytest.approx(1 / (1 + np.log2(6)))
+        assert harmonicity[1] > harmonicity[2] > harmonicity[0]
+
+
+class TestAnalyzeConsonance:
+    def test_batch(self):
+        chords = [
+            [ChordInfo.parse_instrument("horns", "<C4 E4 G4>")],
+            [ChordInfo.parse_instrument("flute", "C5")],
+            [ChordInfo.parse_instrument("horns", "<C4 C#4 D4>")],
+        ]
+        result = consonance.analyze_consonance(NoteTable.from_chords(chords))
+        assert len(result) == 3
+        assert result.pairs.tolist() == [3, 0, 3]
+        assert np.isnan(result.harmonicity[1])
+        assert result.harmonicity[0] > result.harmonicity[2]
+        deviation = (13.69 + 1.96 + 15.64) / 3
+        assert result.deviation[0] == pytest.approx(deviation, abs=0.01)
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 256])
+    def test_chunk_size(self, chunk_size):
+        rng = np.random.default_rng(0)
+        chord = np.sort(rng.integers(0, 5, 40))
+        table = NoteTable(chord, rng.integers(20, 90, 40), np.zeros(40))
+        expected = consonance.analyze_consonance(table)
+        result = consonance.analyze_consonance(table, chunk_size)
+        assert result.pairs.tolist() == expected.pairs.tolist()
+        assert result.harmonicity == pytest.approx(expected.harmonicity, nan_ok=True)
+
+
+class TestRoughness:
+    def test_frequency(self):
+        assert consonance.get_frequency([57, 69, 48]) == pytest.approx(
+            [440, 880, 261.63], abs=0.01
+        )
+
+    def test_pair_roughness(self):
+        roughness = consonance.pair_roughness([48] * 13, np.arange(48, 61))
+        assert roughness.argmax() == 1
+        assert roughness[7] < roughness[6]
+        assert roughness[12] < roughness[7]
+
+    def test_pair_roughness_weights(self):
+        single = consonance.pair_roughness(48, 49)
+        assert consonance.pair_roughness(48, 49, 2, 4) == pytest.approx(8 * single)
+
+    def test_analyze_roughness(self):
+        chords = [
+            [ChordInfo.parse_instrument("horns", "<C4 G4 C5>")],
+            [ChordInfo.parse_instrument("horns", "<C4 C#4 D4>")],
+            [ChordInfo.parse_instrument("horns", "<C4 C#4 D4>|p")],
+            [ChordInfo.parse_instrument("horns", "C4")],
+        ]
+        table = NoteTable.from_chords(chords)
+        roughness = consonance.analyze_roughness(table)
+        assert roughness[1] > roughness[0] > roughness[3] == 0
+        assert roughness[1] == pytest.approx(4 * roughness[2])
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 32])
+    def test_chunk_size(self, chunk_size):
+        rng = np.random.default_rng(0)
+        chord = np.sort(rng.integers(0, 7, 60))
+        table = NoteTable(chord, rng.integers(20, 90, 60), rng.integers(0, 5, 60))
+        weights = table.weights()
+        expected = np.zeros(table.size)
+        for i in range(len(table)):
+            for j in range(i + 1, len(table)):
+                if chord[i] == chord[j]:
+                    low, high = sorted((i, j), key=lambda x: table.midinum[x])
+                    expected[chord[i]] += consonance.pair_roughness(
+                        table.midinum[low],
+                        table.midinum[high],
+                        weights[low],
+                        weights[high],
+                    )
+        result = consonance.analyze_roughness(table, chunk_size=chunk_size)
+        assert result == pytest.approx(expected)
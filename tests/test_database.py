@@ -0,0 +1,64 @@
+import pytest
+from orchestral_tutti_chord_database.database import Database
+from orchestral_tutti_chord_database.database import get_name
+from orchestral_tutti_chord_database.parser import ChordInfo
+from orchestral_tutti_chord_database.voicing import normal_hash
+from orchestral_tutti_chord_database.voicing import voicing_hash
+
+
+@pytest.fixture
+def database(tmp_path):
+    return Database(str(tmp_path / "db"))
+
+
+@pytest.mark.parametrize(
+    "source, index, name",
+    [
+        pytest.param("scores/britten.txt", 0, "britten.0", id="File"),
+        pytest.param("stdin", 3, "stdin.3", id="Stdin"),
+    ],
+)
+def test_get_name(source, index, name):
+    assert get_name(source, index) == name
+
+
+def test_save_and_load(database):
+    chord = ChordInfo.parse_lines(["Chord: D", "flute: <F#5 A5>|fff"])
+    database.save("b.1", chord)
+    database.save_dict("a.0", {"chord": "C", "sections": {}})
+    assert database.names() == ["a.0", "b.1"]
+    assert len(database) == 2
+    assert "b.1" in database
+    assert database.load("b.1").instruments == chord.instruments
+    assert [name for name, _ in database] == ["a.0", "b.1"]
+
+
+def test_remove(database):
+    database.save_dict("a.0", {"chord": "C"})
+    database.remove("a.0")
+    database.remove("missing")
+    assert database.names() == []
+
+
+def test_index(database):
+    data = {
+        "composer": "Britten,_Benjamin",
+        "chord": "D",
+        "sections": {"woodwind": [{"instrument": "fl", "notes": ["D5", "A5", ""]}]},
+    }
+    database.save_dict("a.0", data)
+    index = database.load_index()
+    assert index["chords"]["a.0"] == {
+        **dict.fromkeys(ChordInfo.long),
+        "composer": "Britten,_Benjamin",
+        "chord": "D",
+        "notes": 2,
+        "mask": (1 << 2) | (1 << 9),
+        "voicing": voicing_hash(data),
+        "root": 62,
+        "normal": normal_hash(data),
+    }
+    index["sources"]["a.txt"] = 1
+    database.save_index(index)
+    assert database.names() == ["a.0"]
+    assert database.load_index() == index
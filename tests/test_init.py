@@ -0,0 +1,70 @@
+import subprocess
+import sys
+
+import pytest
+import orchestral_tutti_chord_database as otcd
+from orchestral_tutti_chord_database.parser import ChordInfo
+
+
+def loaded(statement: str) -> list:
+    """Returns the package modules, and numpy if executed, after a statement."""
+    script = (
+        f"import sys; {statement}; "
+        "print(' '.join(sorted(x for x in sys.modules if x.startswith('orch')))); "
+        "print(type(sys.modules.get('numpy')).__name__ == 'module')"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], check=True, capture_output=True, text=True
+    ).stdout.splitlines()
+    return output[0].split(), output[1] == "True"
+
+
+def test_public_api():
+    assert otcd.ChordInfo is ChordInfo
+    assert "ChordInfo" in otcd.__all__
+    assert "make_swatches" in dir(otcd)
+    assert otcd.color.make_swatches is otcd.make_swatches
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError, match="no attribute 'nothing'"):
+        otcd.nothing
+
+
+def test_lazy_package():
+    modules, numpy = loaded("import orchestral_tutti_chord_database")
+    assert modules == ["orchestral_tutti_chord_database"]
+    assert not numpy
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "from orchestral_tutti_chord_database import ChordInfo",
+        "import orchestral_tutti_chord_database.color",
+        "import orchestral_tutti_chord_database.lilypond",
+        "from orchestral_tutti_chord_database.cli import parse_chunk; "
+        "parse_chunk([('a.0', ['Chord: D', 'flute: <D5 F#5>|ff'])])",
+    ],
+)
+def test_no_numpy(statement):
+    assert not loaded(statement)[1]
+
+
+def test_lazy_parser():
+    script = (
+        "import sys; from orchestral_tutti_chord_database.cli import make_parser; "
+        "make_parser(); "
+        "print(type(sys.modules['orchestral_tutti_chord_database.benchmark']))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", script], check=True, capture_output=True, text=True
+    ).stdout
+    # Lazy modules are only of the module type once executed.
+    assert "_LazyModule" in output
+
+
+def test_numpy_on_first_use():
+    statement = "from orchestral_tutti_chord_database import make_swatches"
+    assert not loaded(statement)[1]
+    assert loaded(statement + "; make_swatches(numbers=3)")[1]
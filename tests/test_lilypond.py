@@ -0,0 +1,123 @@
+import re
+import subprocess
+
+import pytest
+from orchestral_tutti_chord_database import lilypond
+from orchestral_tutti_chord_database.cache import RenderCache
+from orchestral_tutti_chord_database.parser import ChordInfo
+
+
+@pytest.mark.parametrize(
+    "note, name",
+    [
+        pytest.param("C4", "c'", id="middle_C"),
+        pytest.param("C3", "c", id="C3"),
+        pytest.param("F#5", "fis''", id="F#5"),
+        pytest.param("Bb1", "bes,,", id="Bb1"),
+        pytest.param("Ex4", "eisis'", id="Ex4"),
+        pytest.param("Abb2", "aeses,", id="Abb2"),
+    ],
+)
+def test_get_note_name(note, name):
+    assert lilypond.get_note_name(note) == name
+
+
+@pytest.fixture
+def chord():
+    obj = ChordInfo()
+    for line in (
+        "Composer: Benjamin Britten",
+        "Name: The Young Person's Guide to the Orchestra",
+        "Measure: -1",
+        "Chord: D",
+    ):
+        obj.parse_line(line)
+    obj.instruments = [
+        ChordInfo.parse_instrument("flute", "<F#5 A5>|fff"),
+        ChordInfo.parse_instrument("vln.I", "{tva8|}<D D'>"),
+        ChordInfo.parse_instrument("vln.II", "<D5 F#4>"),
+        ChordInfo.parse_instrument("bass", "{fvb8|}<D D'>"),
+        ChordInfo.parse_instrument("harp-rh", "||fermata"),
+    ]
+    return obj
+
+
+def test_get_staves(chord):
+    treble, bass = lilypond.get_staves(chord)
+    assert treble == ["F#4", "D5", "F#5", "A5", "D6"]
+    assert bass == ["D1", "D2"]
+
+
+def test_make_chord():
+    assert lilypond.make_chord(["D1", "D2"]) == "<d,, d,>1"
+    assert lilypond.make_chord([]) == "s1"
+
+
+def test_make_book(chord):
+    book = lilypond.make_book(chord, "britten")
+    assert '\\bookOutputName "britten"' in book
+    assert 'composer = "Benjamin Britten"' in book
+    assert 'piece = "m. -1"' in book
+    assert "\\clef treble <fis' d'' fis'' a'' d'''>1" in book
+    assert "\\clef bass <d,, d,>1" in book
+    assert book.count("{") == book.count("}")
+
+
+def test_make_book_quotes(chord):
+    chord.chord = 'D "add6"'
+    book = lilypond.make_book(chord, 'a\\b"c')
+    assert '\\bookOutputName "a\\\\b\\"c"' in book
+    assert '^\\markup { "D \\"add6\\"" }' in book
+
+
+class TestRender:
+    @pytest.fixture
+    def calls(self, monkeypatch):
+        calls = []
+        monkeypatch.setattr(subprocess, "run", lambda *a, **k: calls.append(a[0]))
+        return calls
+
+    def test_one_process_per_batch(self, tmp_path, chord, calls):
+        paths = lilypond.render([chord] * 5, str(tmp_path), batch_size=2, jobs=2)
+        assert len(paths) == 3
+        assert len(calls) == 3
+        assert sorted(x[-1] for x in calls) == sorted(paths)
+        content = (tmp_path / "batch-2.ly").read_text()
+        assert content.startswith('\\version "')
+        assert content.count("\\book {") == 1
+        assert '\\bookOutputName "chord-4"' in content
+
+    def test_formats(self, tmp_path, chord, calls):
+        lilypond.render([chord], str(tmp_path), names=["x"], formats=("svg", "png"))
+        assert "-dbackend=svg" in calls[0] and "--png" in calls[0]
+        with pytest.raises(ValueError, match="Unknown output format"):
+            lilypond.render([chord], str(tmp_path), formats=("gif",))
+
+    def test_cache(self, tmp_path, chord, monkeypatch):
+        calls = []
+
+        def run(command, **kwargs):
+            calls.append(command)
+            if "--version" in command:
+                return subprocess.CompletedProcess(command, 0, "LilyPond 2.20.0\n")
+            content = open(command[-1]).read()
+            for name in re.findall(r'bookOutputName "(.*)"', content):
+                (tmp_path / "output" / f"{name}.pdf").write_text(content)
+
+        monkeypatch.setattr(subprocess, "run", run)
+        lilypond.get_lilypond_version.cache_clear()
+        cache = RenderCache(str(tmp_path / "cache"))
+        other = ChordInfo()
+        other.instruments = [ChordInfo.parse_instrument("horns", "<C4 E4 G4>")]
+        output = str(tmp_path / "output")
+
+        lilypond.render([chord, other], output, names=["a", "b"], cache=cache)
+        assert len(calls) == 2
+        assert cache.size() > 0
+
+        other.composer = "Britten,_Benjamin"
+        lilypond.render([chord, other], output, names=["c", "d"], cache=cache)
+        assert len(calls) == 3
+        assert (tmp_path / "output" / "c.pdf").exists()
+        assert "d" in open(str(tmp_path / "output" / "batch-0.ly")).read()
+        assert '"c"' not in open(str(tmp_path / "output" / "batch-0.ly")).read()
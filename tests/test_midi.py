@@ -0,0 +1,195 @@
+import io
+import struct
+
+import pytest
+from orchestral_tutti_chord_database import midi
+
+
+BAR = 3 * 480
+
+
+def variable(value):
+    data = [value & 0x7F]
+    while value > 0x7F:
+        value >>= 7
+        data.append(value & 0x7F | 0x80)
+    return bytes(data[::-1])
+
+
+def meta(kind, data):
+    data = data.encode() if isinstance(data, str) else bytes(data)
+    return [0xFF, kind] + list(variable(len(data))) + list(data)
+
+
+def notes(channel, *spans, velocity=100):
+    """Returns the (tick, bytes) events of (start, end, midi number) spans."""
+    events = []
+    for start, end, note in spans:
+        events.append((start, [0x90 | channel, note, velocity]))
+        # A note on of velocity 0 stops a note too.
+        events.append((end, [0x90 | channel, note, 0]))
+    return events
+
+
+def track(*events):
+    """Returns a track chunk of (tick, bytes) events."""
+    data, last = b"", 0
+    for tick, event in sorted(events, key=lambda x: x[0]):
+        data += variable(tick - last) + bytes(event)
+        last = tick
+    data += b"\x00\xff\x2f\x00"
+    return b"MTrk" + struct.pack(">I", len(data)) + data
+
+
+def smf(*tracks, division=480):
+    header = b"MThd" + struct.pack(">IHHh", 6, 1, len(tracks), division)
+    return io.BytesIO(header + b"".join(tracks))
+
+
+def raw(data):
+    """Returns a format 0 file of a single track of raw bytes."""
+    header = b"MThd" + struct.pack(">IHHh", 6, 0, 1, 480)
+    return header + b"MTrk" + struct.pack(">I", len(data)) + data
+
+
+def orchestra():
+    """Returns a 3/4 file in D major with a final bar in 4/4 and C minor."""
+    conductor = track(
+        (0, meta(0x03, "Finale")),
+        (0, meta(0x58, [3, 2, 24, 8])),
+        (0, meta(0x59, [2, 0])),
+        (4 * BAR, meta(0x58, [4, 2, 24, 8])),
+        (4 * BAR, meta(0x59, [0xFD, 1])),
+    )
+    flute = track(
+        (0, meta(0x03, "Flute 1")),
+        (0, [0xC0, 73]),
+        *notes(0, (0, BAR, 69), (BAR, 3 * BAR, 74), (4 * BAR, 6 * BAR, 67)),
+    )
+    # Running status: a single status byte for two notes.
+    violins = track(
+        (0, meta(0x03, "Violins I")),
+        (0, [0xC1, 48]),
+        (0, [0x91, 66, 90]),
+        (0, [62, 90]),
+        (2 * BAR, [0x81, 66, 0]),
+        (2 * BAR, [62, 0]),
+        *notes(1, (4 * BAR, 6 * BAR, 63), (4 * BAR, 6 * BAR, 60)),
+    )
+    horn = track(
+        (0, [0xC2, 60]),
+        *notes(2, (BAR, 3 * BAR, 57), velocity=40),
+        *notes(2, (4 * BAR, 6 * BAR, 55), velocity=127),
+        *notes(9, (0, 6 * BAR, 36)),
+    )
+    return smf(conductor, flute, violins, horn)
+
+
+def parts(chord):
+    return [(x[0], x[2], x[3]) for x in chord.instruments]
+
+
+def test_bars():
+    first, second, fifth = midi.read_midi(orchestra(), [5, 2, 1])
+    assert (first.name, first.measure, first.key) == ("Finale", 1, "D major")
+    assert parts(first) == [
+        ("Flute 1", ["A5"], "ff"),
+        ("Violins I", ["D5", "F#5"], "f"),
+    ]
+    assert parts(second) == [
+        ("Flute 1", ["D6"], "ff"),
+        ("Violins I", ["D5", "F#5"], "f"),
+        ("horn", ["A4"], "p"),
+    ]
+    assert (fifth.measure, fifth.key) == (5, "C minor")
+    assert parts(fifth) == [
+        ("Flute 1", ["G5"], "ff"),
+        ("Violins I", ["C5", "Eb5"], "ff"),
+        ("horn", ["G4"], "fff"),
+    ]
+
+
+def test_final_chord():
+    (final,) = midi.read_midi(orchestra(), info={"composer": "Gustav Mahler"})
+    assert not hasattr(final, "measure")
+    assert (final.composer, final.key) == ("Mahler,_Gustav", "C minor")
+    assert parts(final) == parts(midi.read_midi(orchestra(), [5])[0])
+    assert midi.read_midi(orchestra(), [9])[0].instruments == []
+
+
+def test_format_0():
+    data = track(
+        (0, meta(0x58, [2, 2, 24, 8])),
+        (0, [0xC0, 71]),
+        *notes(0, (0, 960, 48), (960, 1920, 49)),
+        (1920, meta(0x58, [6, 3, 24, 8])),
+        *notes(0, (1920, 3360, 50)),
+    )
+    header = b"MThd" + struct.pack(">IHHh", 6, 0, 1, 480)
+    chords = midi.read_midi(io.BytesIO(header + data), [1, 2, 3, 4])
+    assert [x.instruments[0][2] for x in chords[:3]] == [["C4"], ["C#4"], ["D4"]]
+    assert chords[2].instruments[0][0] == "clarinet"
+    assert chords[3].instruments == []
+
+
+def test_restated_meter():
+    conductor = track(
+        (0, meta(0x58, [3, 2, 24, 8])),
+        (0, meta(0x59, [2, 0])),
+        (4 * BAR, meta(0x58, [4, 2, 24, 8])),
+    )
+    # Exporters often repeat the initial signatures in every track.
+    flute = track((0, meta(0x58, [3, 2, 24, 8])), (0, meta(0x59, [2, 0])))
+    violin = track((0, [0xC0, 40]), *notes(0, (4 * BAR + 1920, 4 * BAR + 2400, 62)))
+    (sixth,) = midi.read_midi(smf(conductor, flute, violin), [6])
+    assert (sixth.key, parts(sixth)) == ("D major", [("violin", ["D5"], "ff")])
+
+
+@pytest.mark.parametrize(
+    "data, message",
+    [
+        pytest.param(b"RIFF\x00\x00\x00\x00", "Not a Standard MIDI", id="NotMidi"),
+        pytest.param(
+            b"MThd" + struct.pack(">IHHh", 6, 0, 1, -7680),
+            "SMPTE",
+            id="SMPTE",
+        ),
+        pytest.param(
+            b"MThd" + struct.pack(">IHHh", 6, 0, 1, 480) + b"MTrk\x00\x00\x00\x09",
+            "Truncated",
+            id="Truncated",
+        ),
+        pytest.param(raw(b"\x00\x90\x3c"), "Truncated track", id="CutEvent"),
+        pytest.param(raw(b"\x00\xff\x03\x05Fl"), "Truncated track", id="CutMeta"),
+        pytest.param(raw(b"\x00\xff\x03"), "Truncated track", id="CutMetaType"),
+        pytest.param(raw(b"\x81\x80"), "unterminated", id="CutDelta"),
+        pytest.param(raw(b"\x00\xff\x59\x02\x7f\x00"), "-7 to 7", id="KeySignature"),
+    ],
+)
+def test_invalid(data, message):
+    with pytest.raises(ValueError, match=message):
+        midi.read_midi(io.BytesIO(data))
+
+
+@pytest.mark.parametrize(
+    "bar", [pytest.param(0, id="Zero"), pytest.param(-1, id="Negative")]
+)
+def test_invalid_bar(bar):
+    with pytest.raises(ValueError, match="counted from 1"):
+        midi.read_midi(orchestra(), [bar, 2])
+    with pytest.raises(ValueError, match="counted from 1"):
+        midi.TimeMap(480).get_tick(bar)
+
+
+@pytest.mark.parametrize(
+    "name, program, instrument",
+    [
+        pytest.param("Violins I", 0, "Violins I", id="TrackName"),
+        pytest.param("Track 1", 73, "flute", id="Program"),
+        pytest.param("Key", 41, "viola", id="InfoKey"),
+        pytest.param(None, 2, "program 3", id="Unknown"),
+        pytest.param("Solo: Horn", 0, "Solo Horn", id="Colon"),
+    ],
+)
+def test_get_instrument(name, program, instrument):
+    assert midi.get_instrument(name, program) == instrument
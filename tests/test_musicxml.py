@@ -0,0 +1,137 @@
+import io
+import zipfile
+
+import pytest
+from orchestral_tutti_chord_database import musicxml
+
+
+def note(step, octave, duration, alter=0, chord=False, extra=""):
+    return (
+        f"<note>{'<chord/>' if chord else ''}<pitch><step>{step}</step>"
+        f"<alter>{alter}</alter><octave>{octave}</octave></pitch>"
+        f"<duration>{duration}</duration>{extra}</note>"
+    )
+
+
+def dynamic(mark):
+    return (
+        f"<direction><direction-type><dynamics><{mark}/></dynamics>"
+        "</direction-type></direction>"
+    )
+
+
+def attributes(fifths, clef="G", transpose=""):
+    return (
+        f"<attributes><divisions>2</divisions><key><fifths>{fifths}</fifths></key>"
+        f"<time><beats>3</beats><beat-type>4</beat-type></time>{transpose}"
+        f"<clef><sign>{clef}</sign></clef></attributes>"
+    )
+
+
+FERMATA = "<notations><fermata/></notations>"
+REST = "<note><rest/><duration>2</duration></note>"
+CLARINET = "<transpose><diatonic>-1</diatonic><chromatic>-2</chromatic></transpose>"
+
+
+def score():
+    """Returns a 3/4 score in D major, measure 2 ending with a fermata."""
+    parts = {
+        "P1": [
+            attributes(2) + dynamic("ff") + note("A", 5, 4) + note("D", 6, 2),
+            note("D", 6, 6, extra=FERMATA),
+        ],
+        # Written in E major, sounding in D major.
+        "P2": [
+            attributes(4, transpose=CLARINET) + dynamic("p") + REST + note("C", 5, 4),
+            note("E", 5, 6) + note("G", 5, 6, chord=True),
+        ],
+        # Two voices, a grace note and a measure starting with a rest.
+        "P3": [
+            attributes(2, clef="F")
+            + dynamic("mf")
+            + "<note><grace/><pitch><step>E</step><octave>3</octave></pitch></note>"
+            + note("D", 3, 6)
+            + "<backup><duration>6</duration></backup>"
+            + note("D", 2, 6),
+            "<forward><duration>2</duration></forward>" + note("A", 2, 4),
+        ],
+    }
+    names = {"P1": ("Flute 1", 74), "P2": ("Clarinet in Bb", 72), "P3": ("", 43)}
+    part_list = "".join(
+        f'<score-part id="{k}"><part-name>{name}</part-name><midi-instrument>'
+        f"<midi-program>{program}</midi-program></midi-instrument></score-part>"
+        for k, (name, program) in names.items()
+    )
+    body = "".join(
+        f'<part id="{k}">'
+        + "".join(f'<measure number="{i}">{x}</measure>' for i, x in enumerate(v, 1))
+        + "</part>"
+        for k, v in parts.items()
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><score-partwise version="4.0">'
+        "<work><work-title>Symphony No. 1</work-title></work>"
+        "<movement-title>Finale</movement-title>"
+        '<identification><creator type="composer">Gustav Mahler</creator>'
+        f"</identification><part-list>{part_list}</part-list>{body}</score-partwise>"
+    ).encode()
+
+
+def test_measures():
+    first, second, missing = musicxml.read_musicxml(io.BytesIO(score()), [1, 2, 9])
+    assert (first.composer, first.name, first.movement) == (
+        "Mahler,_Gustav",
+        "Symphony No. 1",
+        "Finale",
+    )
+    assert (first.measure, first.key) == (1, "D major")
+    assert first.instruments == [
+        ("Flute 1", "treble", ["A5"], "ff", None),
+        ("cello", "bass", ["D2", "D3"], "mf", None),
+    ]
+    assert second.instruments == [
+        ("Flute 1", "treble", ["D6"], "ff", "fermata"),
+        ("Clarinet in Bb", "treble", ["D5", "F5"], "p", None),
+    ]
+    assert missing.measure == 9
+    assert missing.instruments == []
+
+
+def test_final_chord():
+    info = {"name": "Titan"}
+    (final,) = musicxml.read_musicxml(io.BytesIO(score()), info=info)
+    assert not hasattr(final, "measure")
+    assert (final.name, final.key) == ("Titan", "D major")
+    assert [x[2] for x in final.instruments] == [["D6"], ["D5", "F5"], ["A2"]]
+
+
+def test_mxl(tmp_path):
+    path = tmp_path / "finale.mxl"
+    container = (
+        '<container><rootfiles><rootfile full-path="score/finale.musicxml"/>'
+        "</rootfiles></container>"
+    )
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("META-INF/container.xml", container)
+        archive.writestr("score/finale.musicxml", score())
+    (chord,) = musicxml.read_mxl(str(path), [2])
+    assert chord.instruments[0][2] == ["D6"]
+
+
+def test_timewise():
+    with pytest.raises(ValueError, match="score-partwise"):
+        musicxml.read_musicxml(io.BytesIO(b"<score-timewise/>"))
+
+
+@pytest.mark.parametrize(
+    "written, transpose, sounding",
+    [
+        pytest.param(("C", 0, 5), (0, 0), (60, "C5"), id="Concert"),
+        pytest.param(("C", 0, 5), (-1, -2), (58, "Bb4"), id="ClarinetInBb"),
+        pytest.param(("F", 1, 4), (-5, -9), (45, "A3"), id="AltoSax"),
+        pytest.param(("B", -1, 4), (-4, -7), (51, "Eb4"), id="HornInF"),
+        pytest.param(("C", 0, 5), (7, 12), (72, "C6"), id="Piccolo"),
+    ],
+)
+def test_get_sounding(written, transpose, sounding):
+    assert musicxml.get_sounding(*written, transpose) == sounding
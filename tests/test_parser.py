@@ -1,5 +1,6 @@
 import pytest
 from orchestral_tutti_chord_database.parser import ChordInfo
+from orchestral_tutti_chord_database.parser import iter_entries
 
 
 class TestParseInfo:
@@ -150,3 +151,85 @@ class TestParseInstrument:
     )
     def test_parse_instrument_detection(self, line, result):
         assert ChordInfo.parse_instrument(*line.split(':')) == result
+
+
+class TestParseEntries:
+    lines = [
+        "Composer: Benjamin Britten",
+        "Year: 1945",
+        "Chord: D",
+        "flute: <F#5 A5>|fff",
+        "vln.I: {t|}<D' F#'>|fff|fermata",
+        "bass: {fvb8|}<D D'>|ff",
+    ]
+
+    def test_parse_line_instrument(self):
+        obj = ChordInfo()
+        obj.parse_line("Vln.I: <D5 F#5>|fff")
+        assert obj.instruments == [("Vln.I", "treble", ["D5", "F#5"], "fff", None)]
+        assert not hasattr(obj, "vln.i")
+
+    def test_parse_line_without_key(self):
+        with pytest.raises(ValueError, match="Expected 'key: value'"):
+            ChordInfo().parse_line("flute <D5>")
+
+    def test_parse_lines(self):
+        obj = ChordInfo.parse_lines(["# a comment", ""] + self.lines)
+        assert (obj.composer, obj.year, obj.chord) == ("Britten,_Benjamin", 1945, "D")
+        assert [x[0] for x in obj.instruments] == ["flute", "vln.I", "bass"]
+        assert obj.instruments[2][2] == ["D1", "D2"]
+
+    def test_dict_round_trip(self):
+        obj = ChordInfo.parse_lines(self.lines)
+        data = obj.to_dict()
+        assert list(data["sections"]) == ["woodwind", "string"]
+        assert data["sections"]["string"][0] == {
+            "instrument": "vln.I",
+            "clef": "t",
+            "notes": ["D5", "F#5"],
+            "dynamic": "fff",
+            "technique": "fermata",
+        }
+        copy = ChordInfo.from_dict(data)
+        assert copy.to_dict() == data
+        assert copy.instruments == obj.instruments
+
+    def test_lines_round_trip(self):
+        obj = ChordInfo.parse_lines(self.lines + ["Opus: 33", "harp: ||fermata"])
+        lines = obj.to_lines()
+        assert lines[:4] == [
+            "Composer: Benjamin Britten",
+            "Year: 1945",
+            "Opus: 33",
+            "Chord: D",
+        ]
+        assert lines[5:] == [
+            "vln.I: {t|}<D' F#'>|fff|fermata",
+            "bass: {fvb8|}<D D'>|ff",
+            "harp: ||fermata",
+        ]
+        copy = ChordInfo.parse_lines(lines)
+        info = obj.to_dict()
+        del info["sections"]
+        assert {k: v for k, v in copy.to_dict().items() if k != "sections"} == info
+        assert copy.instruments == obj.instruments
+
+    @pytest.mark.parametrize(
+        "clef, notes, line",
+        [
+            pytest.param("bass", ["D2", "D3"], "vc: {bass|}<D D'>", id="Bass"),
+            pytest.param("alto", ["Bb2"], "va: {alto|}Bb,", id="Alto"),
+            pytest.param("treble", ["F#5"], "va: F#5", id="Treble"),
+            pytest.param("bass", [""], "va: |", id="Rest"),
+        ],
+    )
+    def test_lines_clef(self, clef, notes, line):
+        obj = ChordInfo()
+        obj.instruments.append((line.split(":")[0], clef, notes, None, None))
+        assert obj.to_lines() == [line]
+        if notes != [""]:
+            assert ChordInfo.parse_lines([line]).instruments == obj.instruments
+
+    def test_iter_entries(self):
+        text = ["# header\n", "\n", "Chord: D\n", "fl: D5\n", "\n", "\n", "Chord: C\n"]
+        assert list(iter_entries(text)) == [["Chord: D", "fl: D5"], ["Chord: C"]]
@@ -0,0 +1,60 @@
+import pytest
+from orchestral_tutti_chord_database import color
+from orchestral_tutti_chord_database.parser import ChordInfo
+from orchestral_tutti_chord_database.pitch import Pitch
+from orchestral_tutti_chord_database.profiling import Profile
+
+
+LINES = ["Chord: D", "flute: <F#5 A5>|fff", "inst: {t|-3}<D D'>"]
+
+
+def test_counts_and_restores():
+    init, parse_instrument = Pitch.__init__, ChordInfo.__dict__["parse_instrument"]
+    with Profile() as profile:
+        assert Pitch.__init__ is not init
+        ChordInfo.parse_lines(LINES)
+        Pitch("C4").transpose("2")
+    assert Pitch.__init__ is init
+    assert ChordInfo.__dict__["parse_instrument"] is parse_instrument
+    assert profile.calls["ChordInfo.parse_line"] == 3
+    assert profile.calls["ChordInfo.parse_instrument"] == 2
+    assert profile.calls["Pitch.transpose"] == 3
+    assert profile.calls["Pitch.__init__"] >= 6
+    assert all(profile.times[x] > 0 for x in profile.calls)
+    assert ChordInfo.parse_instrument("flute", "D5") == (
+        "flute",
+        "treble",
+        ["D5"],
+        None,
+        None,
+    )
+
+
+def test_cache_hits():
+    with Profile() as profile:
+        color.make_swatches(numbers=7, start=0.123)
+        color.make_swatches(numbers=7, start=0.123)
+    assert profile.calls["make_swatches"] == 2
+    hits, misses = profile.caches["_make_swatches"]
+    assert hits >= 1 and hits + misses == 2
+    report = profile.report()
+    assert "make_swatches" in report
+    assert "peak traced memory" not in report
+
+
+def test_memory():
+    with Profile(memory=True) as profile:
+        [ChordInfo.parse_lines(LINES) for _ in range(10)]
+    assert profile.peak > 0
+    allocations = profile.allocations()
+    assert allocations
+    assert all(not x[0].endswith("profiling.py") for x in allocations)
+    assert "peak traced memory" in profile.report()
+
+
+def test_single_profile():
+    with Profile():
+        with pytest.raises(RuntimeError, match="already enabled"):
+            Profile().enable()
+    with Profile():
+        pass
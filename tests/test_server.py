@@ -0,0 +1,156 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+from orchestral_tutti_chord_database.database import Database
+from orchestral_tutti_chord_database.parser import ChordInfo
+from orchestral_tutti_chord_database.server import ChordStore
+from orchestral_tutti_chord_database.server import QueryServer
+from orchestral_tutti_chord_database.server import ResponseCache
+
+
+ENTRIES = {
+    "britten.0": [
+        "Composer: Benjamin Britten",
+        "Year: 1945",
+        "Chord: D",
+        "flute: <F#5 A5>|fff",
+        "trumpets: <D5 F#5>|fff",
+    ],
+    "britten.1": [
+        "Composer: Benjamin Britten",
+        "Year: 1945",
+        "Chord: E",
+        "vln: <E4 G#4 B4>",
+    ],
+    "mahler.0": ["Composer: Gustav Mahler", "Year: 1888", "Chord: C", "ob: <C5 E5 G5>"],
+    "unknown.0": ["Chord: Cm", "vc: <C3 Eb3 G3>"],
+}
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    database = Database(str(tmp_path_factory.mktemp("db")))
+    for name, lines in ENTRIES.items():
+        database.save(name, ChordInfo.parse_lines(lines))
+    return ChordStore.from_database(database)
+
+
+@pytest.fixture(scope="module")
+def url(store):
+    server = QueryServer(store, ("127.0.0.1", 0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield "http://127.0.0.1:%d" % server.server_address[1]
+    server.shutdown()
+    server.server_close()
+
+
+def get(url, headers=None):
+    request = urllib.request.Request(url, headers=headers or {})
+    with urllib.request.urlopen(request) as response:
+        return response.status, dict(response.headers), json.loads(response.read())
+
+
+ALL = list(ENTRIES)
+
+
+@pytest.mark.parametrize(
+    "filters, names",
+    [
+        pytest.param({}, ALL, id="All"),
+        pytest.param({"composer": "BRITTEN"}, ALL[:2], id="Composer"),
+        pytest.param({"forte": "3-11"}, ALL, id="Forte"),
+        pytest.param({"pitch_classes": [0, 4, 7]}, ["mahler.0"], id="Pitch_classes"),
+        pytest.param({"chord": "E", "composer": "britten"}, ["britten.1"], id="Chord"),
+        pytest.param({"since": 1900}, ["britten.0", "britten.1"], id="Since"),
+        pytest.param({"until": 1900}, ["mahler.0"], id="Until"),
+        pytest.param({"forte": "4-20"}, [], id="Nothing"),
+    ],
+)
+def test_query(store, filters, names):
+    assert [store.names[i] for i in store.query(**filters)] == names
+
+
+def test_similar(store):
+    similar = store.similar("mahler.0", limit=2)
+    assert similar[0] == ("unknown.0", pytest.approx(2 / 3))
+    assert len(similar) == 2
+    assert len(store.similar("mahler.0", limit=10)) == 3
+
+
+def test_transpositions():
+    lines = [["ob: <C5 E5 G5>"], ["ob: <A4 C#5 E5>"], ["ob: <C5 E5 A5>"], ["vc: <D3>"]]
+    chords = [ChordInfo.parse_lines(x).to_dict() for x in lines]
+    store = ChordStore(["c", "a", "am", "d"], chords)
+    assert store.transpositions("c") == [("a", -3)]
+    assert store.transpositions("a") == [("c", 3)]
+    assert store.transpositions("am") == []
+    normal = store.summaries[0]["normal"]
+    assert [store.names[i] for i in store.query(normal=normal)] == ["c", "a"]
+
+
+def test_response_cache():
+    cache = ResponseCache(max_size=2)
+    body, etag = cache.put("a", b"1")
+    assert cache.get("a") == (b"1", etag)
+    cache.put("b", b"2")
+    cache.put("c", b"3")
+    assert cache.get("a") is None
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_chords(url):
+    status, headers, payload = get(url + "/chords?composer=britten&limit=1")
+    assert status == 200
+    assert headers["Content-Type"].startswith("application/json")
+    assert payload["total"] == 2
+    assert payload["chords"][0]["id"] == "britten.0"
+    assert payload["chords"][0]["forte"] == "3-11"
+    _, _, payload = get(url + "/chords?pcs=0,4,7")
+    assert [x["id"] for x in payload["chords"]] == ["mahler.0"]
+
+
+def test_chord_and_sets(url):
+    _, _, payload = get(url + "/chords/mahler.0")
+    assert payload["composer"] == "Mahler,_Gustav"
+    assert payload["sections"]["woodwind"][0]["notes"] == ["C5", "E5", "G5"]
+    _, _, payload = get(url + "/sets")
+    assert payload == {"3-11": 4}
+    _, _, payload = get(url + "/sets/3-11")
+    assert payload["prime_form"] == [0, 3, 7]
+    _, _, payload = get(url + "/similar/mahler.0?limit=1")
+    assert payload["similar"][0]["id"] == "unknown.0"
+    _, _, payload = get(url + "/transpositions/mahler.0")
+    assert payload == {"transpositions": []}
+
+
+def test_etag(url):
+    _, headers, _ = get(url + "/sets")
+    etag = headers["ETag"]
+    with pytest.raises(urllib.error.HTTPError) as error:
+        get(url + "/sets", {"If-None-Match": etag})
+    assert error.value.code == 304
+    assert error.value.headers["ETag"] == etag
+
+
+@pytest.mark.parametrize(
+    "path, status",
+    [
+        pytest.param("/chords/missing", 404, id="Chord"),
+        pytest.param("/sets/13-1", 404, id="Set"),
+        pytest.param("/nothing", 404, id="Endpoint"),
+        pytest.param("/chords?limit=ten", 400, id="Parameter"),
+        pytest.param("/chords?offset=-5&limit=5", 400, id="NegativeOffset"),
+        pytest.param("/chords?limit=0", 400, id="ZeroLimit"),
+        pytest.param("/similar/mahler.0?limit=-1", 400, id="NegativeLimit"),
+    ],
+)
+def test_errors(url, path, status):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        get(url + path)
+    assert error.value.code == status
+    assert "error" in json.loads(error.value.read())
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+from orchestral_tutti_chord_database import settheory
+from orchestral_tutti_chord_database.analysis import NoteTable
+from orchestral_tutti_chord_database.parser import ChordInfo
+
+
+def mask(pitch_classes):
+    return settheory.get_mask(pitch_classes)
+
+
+class TestTables:
+    def test_forte_catalog(self):
+        assert len(settheory.FORTE_NAMES) == 224
+        assert (settheory.FORTE_INDEX >= 0).all()
+        assert len(np.unique(settheory.PRIME_FORM)) == 224
+
+    @pytest.mark.parametrize(
+        "first, second",
+        [
+            pytest.param("4-Z15", "4-Z29", id="4-Z15"),
+            pytest.param("5-Z12", "5-Z36", id="5-Z12"),
+            pytest.param("6-Z3", "6-Z36", id="6-Z3"),
+            pytest.param("6-Z29", "6-Z50", id="6-Z29"),
+        ],
+    )
+    def test_z_relation(self, first, second):
+        vectors = [
+            settheory.INTERVAL_VECTOR[
+                settheory.FORTE_INDEX == settheory.FORTE_NAMES.index(x)
+            ][0]
+            for x in (first, second)
+        ]
+        assert vectors[0].tolist() == vectors[1].tolist()
+
+    def test_complement(self):
+        assert settheory.forte_name(settheory.FULL_MASK ^ mask([0, 4, 7])) == "9-11"
+        assert settheory.forte_name(settheory.FULL_MASK) == "12-1"
+
+
+class TestSetClass:
+    @pytest.mark.parametrize(
+        "pitch_classes, normal, prime, vector, name",
+        [
+            pytest.param([], [], [], [0] * 6, "0-1", id="empty"),
+            pytest.param([2, 2, 2], [2], [0], [0] * 6, "1-1", id="unison"),
+            pytest.param(
+                [0, 4, 7], [0, 4, 7], [0, 3, 7], [0, 0, 1, 1, 1, 0], "3-11", id="C"
+            ),
+            pytest.param(
+                [9, 0, 4], [9, 0, 4], [0, 3, 7], [0, 0, 1, 1, 1, 0], "3-11", id="Am"
+            ),
+            pytest.param(
+                [7, 11, 2, 5],
+                [11, 2, 5, 7],
+                [0, 2, 5, 8],
+                [0, 1, 2, 1, 1, 1],
+                "4-27",
+                id="G7",
+            ),
+            pytest.param(
+                [5, 6, 8, 0, 1],
+                [0, 1, 5, 6, 8],
+                [0, 1, 5, 6, 8],
+                [2, 1, 1, 2, 3, 1],
+                "5-20",
+                id="5-20",
+            ),
+        ],
+    )
+    def test_single(self, pitch_classes, normal, prime, vector, name):
+        testee = mask(pitch_classes)
+        assert settheory.normal_form(testee) == normal
+        assert settheory.prime_form(testee) == prime
+        assert settheory.interval_vector(testee).tolist() == vector
+        assert settheory.forte_name(testee) == name
+
+    def test_batch(self):
+        chords = [
+            [ChordInfo.parse_instrument("horns", "<C4 E4 G4 C3>")],
+            [ChordInfo.parse_instrument("horns", "<A3 C4 E5>")],
+            [ChordInfo.parse_instrument("vln.I", "{tva8|}<D F# A>")],
+            [ChordInfo.parse_instrument("horns", "<C4 Db4 D4>")],
+        ]
+        masks = settheory.get_masks(NoteTable.from_chords(chords))
+        assert masks.tolist() == [
+            mask([0, 4, 7]),
+            mask([9, 0, 4]),
+            mask([2, 6, 9]),
+            mask([0, 1, 2]),
+        ]
+        assert settheory.forte_name(masks).tolist() == ["3-11"] * 3 + ["3-1"]
+        groups = settheory.group_by_set_class(masks)
+        assert {x: y.tolist() for x, y in groups.items()} == {
+            "3-1": [3],
+            "3-11": [0, 1, 2],
+        }
@@ -0,0 +1,68 @@
+import random
+
+import pytest
+from orchestral_tutti_chord_database import spelling
+from orchestral_tutti_chord_database.pitch import get_pitch
+
+
+@pytest.mark.parametrize(
+    "key, expected",
+    [
+        pytest.param("D major", (2, False), id="Major"),
+        pytest.param("Bb minor", (-5, True), id="Minor"),
+        pytest.param("Eb", (-3, False), id="Tonic"),
+        pytest.param("Dm", (-1, True), id="Suffix"),
+        pytest.param("f#", (3, True), id="LowerCase"),
+        pytest.param("A Minor", (0, True), id="CapitalizedMode"),
+        pytest.param("F# Minor", (3, True), id="CapitalizedSharp"),
+        pytest.param("Bb Minor", (-5, True), id="CapitalizedFlat"),
+        pytest.param("E\u266d major", (-3, False), id="FlatSign"),
+        pytest.param("c\u266f", (4, True), id="SharpSign"),
+        pytest.param("CM", (0, False), id="CapitalM"),
+        pytest.param("D major, con brio", None, id="TrailingText"),
+        pytest.param("Allegro", None, id="Unknown"),
+        pytest.param(None, None, id="None"),
+    ],
+)
+def test_parse_key(key, expected):
+    assert spelling.parse_key(key) == expected
+
+
+@pytest.mark.parametrize(
+    "key, midinums, expected",
+    [
+        pytest.param("C major", [48, 51, 55], "C4 Eb4 G4", id="Minor"),
+        pytest.param("D major", [50, 54, 57], "D4 F#4 A4", id="Sharps"),
+        pytest.param("Db major", [49, 53, 56], "Db4 F4 Ab4", id="Flats"),
+        pytest.param("D major", [46, 50, 53], "Bb3 D4 F4", id="Borrowed"),
+        pytest.param("E major", [47, 51, 54, 57], "B3 D#4 F#4 A4", id="Dominant"),
+        pytest.param("A minor", [56, 59, 62, 65], "G#4 B4 D5 F5", id="LeadingTone"),
+        pytest.param("Eb minor", [50, 53, 56], "D4 F4 Ab4", id="FlatLeadingTone"),
+        pytest.param("Cb major", [47, 51, 54], "Cb4 Eb4 Gb4", id="Octave"),
+        pytest.param(None, [56, 60, 63, 44], "Ab4 C5 Eb5 Ab3", id="NoKey"),
+        pytest.param(
+            None,
+            list(range(48, 60)),
+            "C4 C#4 D4 Eb4 E4 F4 F#4 G4 Ab4 A4 Bb4 B4",
+            id="Chromatic",
+        ),
+    ],
+)
+def test_spell(key, midinums, expected):
+    assert spelling.spell(midinums, key) == expected.split()
+
+
+def test_spell_chords():
+    rng = random.Random(0)
+    chords = [
+        [rng.randint(20, 100) for _ in range(rng.randint(0, 8))] for _ in range(500)
+    ]
+    keys = [rng.choice(["C major", "a", "Gb major", "c# minor", None]) for _ in chords]
+    spelled = spelling.spell_chords(chords, keys)
+    assert spelled == [spelling.spell(x, y) for x, y in zip(chords, keys)]
+    for midinums, names in zip(chords, spelled):
+        assert [get_pitch(x).midinum for x in names] == midinums
+        # Every pitch class of a chord is spelled alike.
+        assert len({x[:-1] for x in names}) == len({x % 12 for x in midinums})
+    assert spelling.spell_chords([[49], [54]], "Gb major") == [["Db4"], ["Gb4"]]
+    assert spelling.spell_notes([], [], size=0) == []
@@ -0,0 +1,118 @@
+import pytest
+from orchestral_tutti_chord_database.database import Database
+from orchestral_tutti_chord_database.database import open_database
+from orchestral_tutti_chord_database.parser import ChordInfo
+from orchestral_tutti_chord_database.sqlitedb import SQLiteDatabase
+
+
+ENTRIES = {
+    "britten.0": [
+        "Composer: Benjamin Britten",
+        "Year: 1945",
+        "Opus: Opus 34",
+        "Measure: -1",
+        "Chord: D",
+        "flute: <F#5 A5>|fff",
+        "vln.I: {t|}<D' F#'>|fff|fermata",
+        "trumpets: <D5 F#5>|fff",
+        "harp:||fermata",
+    ],
+    "britten.1": ["Composer: Benjamin Britten", "Year: 1945", "Opus: Opus 34"]
+    + ["Chord: E", "vln: <E4 G#4 B4>"],
+    "mahler.0": ["Composer: Gustav Mahler", "Key: C major", "ob: <C5 E5 G5>|p"],
+}
+DICTS = {k: ChordInfo.parse_lines(v).to_dict() for k, v in ENTRIES.items()}
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = SQLiteDatabase(str(tmp_path / "chords.sqlite"))
+    database.save_many(DICTS.items())
+    yield database
+    database.close()
+
+
+def test_round_trip(database):
+    assert database.names() == sorted(DICTS)
+    assert len(database) == 3
+    assert dict(database) == DICTS
+    assert database.load_dict("mahler.0") == DICTS["mahler.0"]
+    assert database.load("britten.0").instruments == ChordInfo.from_dict(
+        DICTS["britten.0"]
+    ).instruments
+    with pytest.raises(KeyError):
+        database.load_dict("missing")
+
+
+def test_normalized(database):
+    count = database.connection.execute
+    assert count("SELECT COUNT(*) FROM pieces").fetchone()[0] == 2
+    assert count("SELECT COUNT(*) FROM instruments").fetchone()[0] == 6
+    rows = count("SELECT note, midinum FROM notes WHERE note = ''").fetchall()
+    assert rows == [("", None)]
+
+
+def test_replace_and_remove(database):
+    database.save_dict("britten.0", DICTS["mahler.0"])
+    assert database.load_dict("britten.0") == DICTS["mahler.0"]
+    database.remove("britten.1")
+    database.remove("missing")
+    assert "britten.1" not in database
+    assert database.names() == ["britten.0", "mahler.0"]
+    pieces = database.connection.execute("SELECT COUNT(*) FROM pieces").fetchone()
+    assert pieces[0] == 1
+
+
+def test_same_name_in_batch(database, tmp_path):
+    items = [("new.0", DICTS["britten.0"]), ("new.0", DICTS["mahler.0"])]
+    database.save_many(items)
+    directory = Database(str(tmp_path / "db"))
+    directory.save_many(items)
+    assert database.load_dict("new.0") == directory.load_dict("new.0")
+    assert database.load_dict("new.0") == DICTS["mahler.0"]
+
+
+def test_transaction_rollback(database):
+    broken = dict(DICTS["mahler.0"], sections={"keyboard": []})
+    with pytest.raises(ValueError):
+        database.save_many([("new.0", DICTS["mahler.0"]), ("new.1", broken)])
+    assert "new.0" not in database
+
+
+def test_index(database):
+    index = database.load_index()
+    assert index["chords"]["mahler.0"]["mask"] == 1 | 1 << 4 | 1 << 7
+    assert index["sources"] == {}
+    database.save_index({"chords": {}, "sources": {"britten.txt": 42}})
+    assert database.load_index()["sources"] == {"britten.txt": 42}
+
+
+@pytest.mark.parametrize(
+    "query, index",
+    [
+        pytest.param(
+            "SELECT chord_id FROM notes WHERE midinum = 50 AND section = 3",
+            "notes_midinum",
+            id="Midinum_section",
+        ),
+        pytest.param(
+            "SELECT id FROM pieces WHERE composer = 'x' AND year > 1900",
+            "pieces_composer",
+            id="Composer_year",
+        ),
+        pytest.param(
+            "SELECT name FROM chords WHERE chord = 'D'", "chords_chord", id="Chord"
+        ),
+        pytest.param(
+            'SELECT name FROM chords WHERE "key" = \'C major\'', "chords_key", id="Key"
+        ),
+    ],
+)
+def test_covering_indexes(database, query, index):
+    plan = database.connection.execute("EXPLAIN QUERY PLAN " + query).fetchall()
+    assert f"USING COVERING INDEX {index}" in plan[0][-1]
+
+
+def test_open_database(tmp_path):
+    assert isinstance(open_database(str(tmp_path / "a.sqlite")), SQLiteDatabase)
+    assert isinstance(open_database(str(tmp_path / "db")), Database)
@@ -0,0 +1,60 @@
+import re
+import xml.etree.ElementTree as ET
+
+import pytest
+from orchestral_tutti_chord_database import svg
+from orchestral_tutti_chord_database.parser import ChordInfo
+
+
+@pytest.fixture
+def chord():
+    return [
+        ChordInfo.parse_instrument("flute", "<F#5 A5>|fff"),
+        ChordInfo.parse_instrument("trumpet", "<A5>|fff"),
+        ChordInfo.parse_instrument("horns", "<C4 D4>|ff"),
+        ChordInfo.parse_instrument("bass", "{fvb8|}<D>"),
+        ChordInfo.parse_instrument("harp-rh", "||fermata"),
+    ]
+
+
+def test_get_notes(chord):
+    midinum, step, accidental, weight = svg.get_notes(chord)
+    assert midinum.tolist() == [14, 48, 50, 66, 69]
+    assert step.tolist() == [8, 28, 29, 38, 40]
+    assert accidental.tolist() == [0, 0, 0, 1, 0]
+    assert weight.tolist() == [2, 2, 2, 1, 5]
+
+
+def test_get_offsets():
+    assert svg.get_offsets([28, 29, 30, 32, 33]).tolist() == [
+        False,
+        True,
+        False,
+        False,
+        True,
+    ]
+
+
+def test_render_svg(chord):
+    root = ET.fromstring(svg.render_svg(chord))
+    namespace = "{http://www.w3.org/2000/svg}"
+    noteheads = root.findall(f".//{namespace}ellipse")
+    assert len(noteheads) == 5
+    # D1 and D4 share pitch class and weight.
+    assert len(set(x.get("fill") for x in noteheads)) == 4
+    radii = [float(x.get("rx")) for x in noteheads]
+    assert radii[-1] == max(radii)
+    assert [x.text for x in root.findall(f".//{namespace}text")] == ["♯"]
+    # Ten staff lines, one ledger above for A5, five below for D1, middle C.
+    assert len(root.findall(f".//{namespace}line")) == 10 + 1 + 5 + 1
+
+
+def test_render_empty():
+    root = ET.fromstring(svg.render_svg([]))
+    assert not root.findall(".//{http://www.w3.org/2000/svg}ellipse")
+
+
+def test_write_svg(tmp_path, chord):
+    paths = svg.write_svg([chord, chord], str(tmp_path), names=["a", "b"])
+    assert [re.sub(r".*/", "", x) for x in paths] == ["a.svg", "b.svg"]
+    assert (tmp_path / "b.svg").read_text().startswith("<svg")
@@ -0,0 +1,49 @@
+import io
+import random
+
+import pytest
+from orchestral_tutti_chord_database import synthetic
+from orchestral_tutti_chord_database.balance import SECTIONS
+from orchestral_tutti_chord_database.balance import get_section
+from orchestral_tutti_chord_database.parser import ChordInfo
+from orchestral_tutti_chord_database.parser import iter_entries
+from orchestral_tutti_chord_database.pitch import get_pitch
+
+
+def write(count, seed=0, start=0):
+    fd = io.StringIO()
+    synthetic.write_corpus(fd, count, seed, start)
+    return fd.getvalue()
+
+
+def test_deterministic():
+    assert write(20, seed=1) == write(20, seed=1)
+    assert write(20, seed=1) != write(20, seed=2)
+    entries = list(iter_entries(io.StringIO(write(20, seed=1))))
+    tail = synthetic.generate(5, seed=1, start=15)
+    assert [[x for x in y if x[0] != "#"] for y in tail] == entries[15:]
+
+
+@pytest.mark.parametrize("kind", [pytest.param(x, id=x) for x in synthetic.INSTRUMENTS])
+def test_write_notes(kind):
+    _, _, clef, interval, _ = synthetic.INSTRUMENTS[kind]
+    for seed, tones in enumerate([("D", "F#", "A"), ("Eb", "Gb", "Bb", "Db")] * 5):
+        notes = synthetic.voice(random.Random(seed), kind, tones)
+        value = synthetic.write_notes(notes, clef, interval)
+        assert ChordInfo.parse_instrument(kind, value)[2] == notes
+
+
+def test_corpus():
+    chords = [ChordInfo.parse_lines(x) for x in synthetic.generate(200, seed=3)]
+    sections = set()
+    for chord in chords:
+        assert chord.composer and chord.year and chord.chord
+        for instrument, _, notes, _, _ in chord.instruments:
+            kind = instrument.rsplit(".", 1)[0]
+            kind = kind if kind in synthetic.INSTRUMENTS else instrument
+            low, high = synthetic.INSTRUMENTS[kind][:2]
+            low, high = get_pitch(low).midinum, get_pitch(high).midinum
+            assert all(low <= get_pitch(x).midinum <= high for x in notes)
+            sections.add(SECTIONS[get_section(instrument)])
+    assert sections == set(SECTIONS)
+    assert len({x.composer for x in chords}) == len(synthetic.COMPOSERS)
@@ -0,0 +1,29 @@
+from orchestral_tutti_chord_database.timing import Timings
+
+
+def test_timings():
+    timings = Timings()
+    with timings.stage("parse") as stage:
+        stage.chords, stage.notes = 10, 100
+        sum(range(100000))
+    with timings.stage("write") as stage:
+        stage.chords = 10
+    assert [x.name for x in timings.stages] == ["parse", "write"]
+    assert timings.stages[0].wall > 0
+    assert timings.stages[0].cpu >= 0
+    total = timings.total()
+    assert (total.chords, total.notes) == (10, 100)
+    assert total.wall == sum(x.wall for x in timings.stages)
+    lines = timings.report().splitlines()
+    assert lines[0].split() == [
+        "stage",
+        "wall",
+        "s",
+        "cpu",
+        "s",
+        "chords",
+        "chords/s",
+        "notes",
+        "notes/s",
+    ]
+    assert [x.split()[0] for x in lines[1:]] == ["parse", "write", "total"]
@@ -0,0 +1,165 @@
+import numpy as np
+import pytest
+from orchestral_tutti_chord_database import voicing
+from orchestral_tutti_chord_database.analysis import NoteTable
+from orchestral_tutti_chord_database.consonance import analyze_roughness
+from orchestral_tutti_chord_database.parser import ChordInfo
+
+
+def make_chord(*instruments, **info):
+    chord = ChordInfo()
+    for k, v in info.items():
+        setattr(chord, k, v)
+    chord.instruments = [ChordInfo.parse_instrument(k, v) for k, v in instruments]
+    return chord
+
+
+CHORD = make_chord(("flute", "<F#5 A5>|fff"), ("bass", "{fvb8|}<D D'>|ff"))
+
+
+@pytest.mark.parametrize(
+    "other, equal",
+    [
+        pytest.param(
+            make_chord(("flute", "<Gb5 A5>|fff"), ("bass", "{fvb8|}<D D'>|ff")),
+            True,
+            id="Spelling",
+        ),
+        pytest.param(
+            make_chord(("bass", "{fvb8|}<D' D>|f"), ("piccolo", "<A5 F#5>|ff")),
+            True,
+            id="Order",
+        ),
+        pytest.param(
+            make_chord(
+                ("flute", "<F#5 A5>|fff"),
+                ("bass", "{fvb8|}<D D'>|ff"),
+                composer="Britten",
+                chord="D",
+            ),
+            True,
+            id="Metadata",
+        ),
+        pytest.param(
+            make_chord(("oboe", "<F#5 A5>|fff"), ("bass", "{fvb8|}<D D'>|ff")),
+            True,
+            id="Same section",
+        ),
+        pytest.param(
+            make_chord(("violin", "<F#5 A5>|fff"), ("bass", "{fvb8|}<D D'>|ff")),
+            False,
+            id="Section",
+        ),
+        pytest.param(
+            make_chord(("flute", "<F#5 A5>|p"), ("bass", "{fvb8|}<D D'>|ff")),
+            False,
+            id="Dynamic",
+        ),
+        pytest.param(
+            make_chord(("flute", "<F#5 A6>|fff"), ("bass", "{fvb8|}<D D'>|ff")),
+            False,
+            id="Octave",
+        ),
+    ],
+)
+def test_voicing_hash(other, equal):
+    assert (voicing.voicing_hash(other) == voicing.voicing_hash(CHORD)) == equal
+
+
+def test_voicing_hash_of_dict():
+    assert voicing.voicing_hash(CHORD.to_dict()) == voicing.voicing_hash(CHORD)
+
+
+def test_get_voicing():
+    assert voicing.get_voicing(CHORD) == (
+        (14, 3, 1),
+        (26, 3, 1),
+        (66, 0, 1),
+        (69, 0, 1),
+    )
+    assert voicing.get_voicing(CHORD, spelled=True)[-1] == ("F#5", 0, 1)
+
+
+@pytest.mark.parametrize(
+    "chord, root",
+    [
+        pytest.param(CHORD, 14, id="Root position"),
+        pytest.param(make_chord(("vc", "<E3 G3 C4>")), 36, id="Inversion"),
+        pytest.param(make_chord(("harp", "||fermata")), None, id="Silent"),
+    ],
+)
+def test_get_root(chord, root):
+    assert voicing.get_root(chord) == root
+
+
+@pytest.mark.parametrize(
+    "other, equal",
+    [
+        pytest.param(
+            make_chord(("flute", "<G#5 B5>|fff"), ("bass", "{fvb8|}<E E'>|ff")),
+            True,
+            id="Up",
+        ),
+        pytest.param(
+            make_chord(("flute", "<E5 G5>|fff"), ("bass", "{fvb8|}<C C'>|ff")),
+            True,
+            id="Down",
+        ),
+        pytest.param(
+            make_chord(("flute", "<Eb5 G5>|fff"), ("bass", "{fvb8|}<C C'>|ff")),
+            False,
+            id="Minor",
+        ),
+        pytest.param(
+            make_chord(("flute", "<E6 G6>|fff"), ("bass", "{fvb8|}<C C'>|ff")),
+            False,
+            id="Register",
+        ),
+    ],
+)
+def test_normal_hash(other, equal):
+    assert (voicing.normal_hash(other) == voicing.normal_hash(CHORD)) == equal
+
+
+def test_get_normal_form():
+    root, form = voicing.get_normal_form(CHORD)
+    assert root == 14
+    assert [x[0] for x in form] == [0, 12, 52, 55]
+
+
+def test_table_hashes():
+    chords = [
+        CHORD,
+        make_chord(("oboe", "<C5 E5 G5>|p"), ("cello", "<C3 G3>|p")),
+        make_chord(("harp", "||fermata")),
+    ]
+    table = NoteTable.from_chords(chords)
+    assert voicing.table_hashes(table) == [voicing.voicing_hash(x) for x in chords]
+    roots = [voicing.get_root(x) for x in chords]
+    normal = [voicing.normal_hash(x) for x in chords]
+    assert voicing.table_hashes(table, roots) == normal
+
+
+def test_unique_voicings():
+    chords = [
+        CHORD,
+        make_chord(("oboe", "<C5 E5 G5>|p"), ("cello", "<C3 G3>|p")),
+        make_chord(("flute", "<Gb5 A5>|fff"), ("bass", "{fvb8|}<D D'>|ff")),
+    ]
+    table = NoteTable.from_chords(chords)
+    unique, inverse = voicing.unique_voicings(table)
+    assert unique.size == 2
+    assert inverse.tolist() == [0, 1, 0]
+    np.testing.assert_allclose(
+        analyze_roughness(unique)[inverse], analyze_roughness(table)
+    )
+
+
+def test_find_duplicates():
+    chords = [
+        CHORD,
+        make_chord(("flute", "<Gb5 A5>|fff"), ("bass", "{fvb8|}<D D'>|ff")),
+        make_chord(("violin", "<F#5 A5>|fff"), ("bass", "{fvb8|}<D D'>|ff")),
+        make_chord(("oboe", "<C5 E5 G5>|p")),
+    ]
+    assert voicing.find_duplicates(chords) == ({1: 0}, {2: 0})
@@ -0,0 +1,123 @@
+import asyncio
+import os
+
+import pytest
+from orchestral_tutti_chord_database.database import Database
+from orchestral_tutti_chord_database.watch import PollingEvents
+from orchestral_tutti_chord_database.watch import Watcher
+from orchestral_tutti_chord_database.watch import parse_file
+
+
+BRITTEN = "Composer: Benjamin Britten\nChord: D\nflute: <F#5 A5>|fff\n"
+TWO = BRITTEN + "\nChord: C\noboe: <C5 E5 G5>|p\n"
+
+
+@pytest.fixture
+def directories(tmp_path):
+    sources = tmp_path / "sources"
+    sources.mkdir()
+    return sources, Database(str(tmp_path / "db")), str(tmp_path / "previews")
+
+
+def test_parse_file(tmp_path):
+    path = tmp_path / "tutti.txt"
+    path.write_text(TWO)
+    entries = parse_file(str(path), previews=True)
+    assert [x[0] for x in entries] == ["tutti.0", "tutti.1"]
+    assert entries[1][1]["chord"] == "C"
+    assert entries[0][2].startswith("<svg")
+    path.write_text("Chord: D\nflute <D5>\n")
+    with pytest.raises(ValueError, match="tutti.0: Expected"):
+        parse_file(str(path))
+
+
+async def wait_for_update(updates, count, timeout=5.0):
+    for _ in range(int(timeout / 0.01)):
+        if len(updates) >= count:
+            return updates[count - 1]
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Only {len(updates)} of {count} updates happened.")
+
+
+@pytest.mark.parametrize(
+    "inotify", [pytest.param(True, id="Inotify"), pytest.param(False, id="Polling")]
+)
+def test_watch(directories, inotify):
+    sources, database, previews = directories
+    (sources / "a.txt").write_text(TWO)
+    (sources / "notes.md").write_text("not a source")
+    updates = []
+    watcher = Watcher(
+        str(sources),
+        database,
+        previews=previews,
+        debounce=0.02,
+        poll_interval=0.02,
+        inotify=inotify,
+        jobs=1,
+        on_update=updates.append,
+    )
+
+    async def main():
+        task = asyncio.create_task(watcher.run())
+        try:
+            update = await wait_for_update(updates, 1)
+            assert update.sources == ["a.txt"]
+            assert update.saved == ["a.0", "a.1"]
+
+            (sources / "a.txt").write_text(BRITTEN)
+            (sources / "b.txt").write_text(BRITTEN)
+            update = await wait_for_update(updates, 2)
+            assert update.sources == ["a.txt", "b.txt"]
+            assert update.saved == ["b.0"]
+            assert update.removed == ["a.1"]
+
+            (sources / "b.txt").write_text("Chord: D\nflute <D5>\n")
+            update = await wait_for_update(updates, 3)
+            assert "b.0: Expected" in update.errors["b.txt"]
+
+            os.remove(sources / "a.txt")
+            update = await wait_for_update(updates, 4)
+            assert update.removed == ["a.0"]
+        finally:
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(main())
+    assert database.names() == ["b.0"]
+    assert sorted(os.listdir(previews)) == ["b.0.svg"]
+    index = database.load_index()
+    assert list(index["chords"]) == ["b.0"]
+    assert index["chords"]["b.0"]["mask"] == (1 << 6) | (1 << 9)
+    assert list(index["sources"]) == ["b.txt"]
+
+
+def test_stale_sources(directories):
+    sources, database, _ = directories
+    (sources / "a.txt").write_text(BRITTEN)
+    (sources / "b.txt").write_text(BRITTEN)
+    watcher = Watcher(str(sources), database, jobs=1)
+    assert watcher.stale_sources() == ["a.txt", "b.txt"]
+
+    async def main():
+        await watcher.sync(watcher.stale_sources(), None)
+
+    asyncio.run(main())
+    assert Watcher(str(sources), database).stale_sources() == []
+    (sources / "b.txt").write_text(TWO)
+    os.remove(sources / "a.txt")
+    assert Watcher(str(sources), database).stale_sources() == ["a.txt", "b.txt"]
+
+
+def test_polling_events(tmp_path):
+    async def main():
+        queue = asyncio.Queue()
+        events = PollingEvents(str(tmp_path), queue, 0.01)
+        events.start()
+        (tmp_path / "a.txt").write_text("Chord: D")
+        name = await asyncio.wait_for(queue.get(), 1)
+        events.close()
+        return name
+
+    assert asyncio.run(main()) == "a.txt"